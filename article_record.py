@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑的文章记录（代替状态中每篇文章一个 dict）
+
+使用 __slots__ 存储字段，没有每个实例的 __dict__；状态存为小整数编码。
+记录支持 dict 风格的访问（record['status']、record.get(...)、record.copy() 等），
+现有代码无需修改；只在加载和保存状态时与 JSON 结构互相转换。
+键的插入顺序与 dict 相同（保存的状态文件键顺序不变），顺序元组在记录之间共享。
+"""
+
+import sys
+
+# 状态编码（按出现频率排列）
+STATUS_VALUES = ('pending', 'completed', 'failed')
+_STATUS_CODES = {status: code for code, status in enumerate(STATUS_VALUES)}
+
+# 已知字段（使用 __slots__ 存储）
+ARTICLE_FIELDS = ('index', 'title', 'url', 'preview', 'publish_time', 'read_count', 'status',
+                  'file_path', 'error_message', 'processed_time', 'retry_count', 'discovered_time',
+                  'error_class', 'near_duplicate_of', 'list_publish_time')
+_FIELD_SET = frozenset(ARTICLE_FIELDS)
+
+# 取值大量重复的字符串字段，驻留后相同取值只保存一份
+_INTERNED_FIELDS = frozenset(('error_message', 'error_class'))
+
+_MISSING = object()
+
+# 键顺序元组驻留表：同一种插入顺序的记录共享一个元组，每条记录只多一个引用
+_KEY_ORDERS = {}
+
+def _intern_order(order):
+    return _KEY_ORDERS.setdefault(order, order)
+
+class ArticleRecord:
+    """
+    单篇文章的状态记录
+
+    未设置的字段不占用额外内存，转换为 dict 时也不会输出；
+    不在 ARTICLE_FIELDS 中的键存放在 _extra 中，保证读写状态文件时不丢失字段；
+    _order 记录键的插入顺序
+    """
+
+    __slots__ = tuple(field for field in ARTICLE_FIELDS if field != 'status') + ('_status', '_extra', '_order')
+
+    def __init__(self, **fields):
+        self._extra = None
+        self._order = ()
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """由状态文件中的 dict 创建记录"""
+        record = cls.__new__(cls)
+        record._extra = None
+        record._order = ()
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    def to_dict(self):
+        """转换为保存到状态文件的 dict（键顺序与插入顺序相同）"""
+        return {key: self._get(key) for key in self._order}
+
+    def _get(self, key):
+        if key == 'status':
+            code = getattr(self, '_status', _MISSING)
+            if code is _MISSING or not isinstance(code, int):
+                return code
+            return STATUS_VALUES[code]
+        if key in _FIELD_SET:
+            return getattr(self, key, _MISSING)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        return _MISSING
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._order:
+            self._order = _intern_order(self._order + (key,))
+        if key == 'status':
+            # 未知状态按原字符串保存
+            self._status = _STATUS_CODES.get(value, value)
+        elif key in _FIELD_SET:
+            if key in _INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if self._get(key) is _MISSING:
+            raise KeyError(key)
+        self._order = _intern_order(tuple(k for k in self._order if k != key))
+        if key == 'status':
+            del self._status
+        elif key in _FIELD_SET:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        return self._get(key) is not _MISSING
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._order)
+
+    def __eq__(self, other):
+        if isinstance(other, ArticleRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ArticleRecord({self.to_dict()!r})"
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def setdefault(self, key, default=None):
+        value = self._get(key)
+        if value is _MISSING:
+            self[key] = default
+            return default
+        return value
+
+    def pop(self, key, *default):
+        value = self._get(key)
+        if value is _MISSING:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        del self[key]
+        return value
+
+    def update(self, other=(), **fields):
+        items = other.items() if hasattr(other, 'items') else other
+        for key, value in items:
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def keys(self):
+        return list(self._order)
+
+    def values(self):
+        return list(self.to_dict().values())
+
+    def items(self):
+        return list(self.to_dict().items())
+
+    def copy(self):
+        """浅拷贝"""
+        return ArticleRecord.from_dict(self.to_dict())
+
+def to_article_records(articles):
+    """把状态中的文章列表转换为 ArticleRecord 列表（已经是记录的保持不变）"""
+    return [article if isinstance(article, ArticleRecord) else ArticleRecord.from_dict(article)
+            for article in articles]
+
+def json_default(obj):
+    """json.dump 的 default 回调：把 ArticleRecord 转换为 dict"""
+    if isinstance(obj, ArticleRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
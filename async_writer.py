@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+后台文件写入（原子写入 + 状态保存合并）
+
+文章文件和状态快照交给后台线程写入，抓取线程不再等待磁盘；
+写入顺序与提交顺序一致，状态快照总是在它引用的文章文件之后落盘。
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+
+from config import STATE_FLUSH_EVERY, STATE_FLUSH_INTERVAL
+from utils import write_file_atomic
+
+class AtomicFileWriter:
+    """
+    后台写入线程
+
+    提交后尚未落盘的文件记录在 pending 中，exists()/read() 会把它们视为已存在，
+    保证文件名冲突检查和去重在写入完成前也能得到正确结果
+    """
+
+    def __init__(self, max_queue=1000):
+        """
+        Args:
+            max_queue (int): 队列上限，磁盘跟不上时提交会阻塞，避免内存无限增长
+        """
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.errors = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name='atomic-file-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                path, content = item
+                try:
+                    write_file_atomic(path, content)
+                except Exception as e:
+                    self.errors += 1
+                    logging.error(f"后台写入文件失败: {path}, 错误: {e}")
+                with self.lock:
+                    # 同一路径在写入期间又被提交时保留较新的内容
+                    if self.pending.get(path) is content:
+                        del self.pending[path]
+            finally:
+                self.queue.task_done()
+
+    def submit(self, path, content):
+        """
+        提交写入
+
+        Args:
+            path (str): 文件路径
+            content (str or bytes): 文件内容
+        """
+        if self.closed:
+            write_file_atomic(path, content)
+            return
+        with self.lock:
+            self.pending[path] = content
+        self.queue.put((path, content))
+
+    def exists(self, path):
+        """文件已存在或已提交但尚未写入"""
+        with self.lock:
+            if path in self.pending:
+                return True
+        return os.path.exists(path)
+
+    def read(self, path):
+        """读取文件内容（优先返回尚未写入的内容）"""
+        with self.lock:
+            content = self.pending.get(path)
+        if content is not None:
+            return content if isinstance(content, str) else content.decode('utf-8')
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def flush(self):
+        """等待已提交的写入全部完成"""
+        if not self.closed:
+            self.queue.join()
+
+    def close(self):
+        """写完全部已提交的内容并结束后台线程（可重复调用）"""
+        if self.closed:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.closed = True
+        if self.errors:
+            logging.warning(f"后台写入共失败 {self.errors} 次")
+
+class CoalescedFlusher:
+    """
+    合并频繁的保存请求：每 every_n 次变更或每 interval 秒最多真正保存一次
+
+    变更只调用 mark_dirty()；运行结束、中断时调用 flush() 保存剩余变更
+    """
+
+    def __init__(self, flush_func, every_n=STATE_FLUSH_EVERY, interval=STATE_FLUSH_INTERVAL):
+        self.flush_func = flush_func
+        self.every_n = every_n
+        self.interval = interval
+        self.dirty = 0
+        self.last_flush = time.monotonic()
+        self.flushes = 0
+
+    def mark_dirty(self):
+        """记录一次变更，达到次数或时间阈值时保存"""
+        self.dirty += 1
+        if self.dirty >= self.every_n or time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self, force=False):
+        """保存尚未保存的变更"""
+        if not self.dirty and not force:
+            return
+        self.flush_func()
+        self.dirty = 0
+        self.last_flush = time.monotonic()
+        self.flushes += 1
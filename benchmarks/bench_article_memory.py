@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+文章记录内存占用基准：比较 dict 与 ArticleRecord 保存同一份状态时的内存，
+以及 load_json_state 逐篇流式转换时的峰值
+
+用法:
+    python benchmarks/bench_article_memory.py [--articles 200000]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_record import to_article_records
+from utils import load_json_state
+
+def make_state_text(count):
+    """生成模拟的状态文件文本（约 2/3 已完成，少量失败）"""
+    articles = []
+    for i in range(count):
+        status = 'completed' if i % 3 else 'pending'
+        if i % 50 == 0:
+            status = 'failed'
+        articles.append({
+            'index': i + 1,
+            'title': f"文章标题 {i} " + '测' * 20,
+            'url': f"https://mp.weixin.qq.com/s/{i:022d}",
+            'preview': ('这是文章的预览内容，' * 10)[:100] + '...',
+            'status': status,
+            'file_path': f"articles/2024-01-{i % 28 + 1:02d}_{i}.txt" if status == 'completed' else None,
+            'error_message': '页面加载超时: Message: timeout' if status == 'failed' else None,
+            'processed_time': '2024-01-15T10:30:00.123456' if status != 'pending' else None,
+            'retry_count': 0,
+        })
+    return json.dumps({'album_title': '测试专辑', 'articles': articles}, ensure_ascii=False)
+
+def measure(text, compact):
+    """解析状态文本并返回 (常驻内存字节数, 峰值字节数)"""
+    tracemalloc.start()
+    data = json.loads(text)
+    if compact:
+        data['articles'] = to_article_records(data['articles'])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current, peak
+
+def measure_streaming(text):
+    """把状态文本写入临时文件，用 load_json_state 加载并返回 (常驻内存字节数, 峰值字节数)"""
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.json', delete=False) as f:
+        f.write(text)
+    try:
+        tracemalloc.start()
+        data = load_json_state(f.name)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        return current, peak
+    finally:
+        os.remove(f.name)
+
+def main():
+    parser = argparse.ArgumentParser(description='文章记录内存占用基准')
+    parser.add_argument('--articles', type=int, default=200000, help='文章数量')
+    args = parser.parse_args()
+
+    text = make_state_text(args.articles)
+    print(f"状态文件大小: {len(text.encode('utf-8')) / 1024 / 1024:.1f} MB, 文章数: {args.articles}")
+
+    dict_current, dict_peak = measure(text, compact=False)
+    record_current, record_peak = measure(text, compact=True)
+    stream_current, stream_peak = measure_streaming(text)
+
+    print(f"dict:          常驻 {dict_current / 1024 / 1024:8.1f} MB  峰值 {dict_peak / 1024 / 1024:8.1f} MB")
+    print(f"ArticleRecord: 常驻 {record_current / 1024 / 1024:8.1f} MB  峰值 {record_peak / 1024 / 1024:8.1f} MB")
+    print(f"流式加载:      常驻 {stream_current / 1024 / 1024:8.1f} MB  峰值 {stream_peak / 1024 / 1024:8.1f} MB")
+    print(f"常驻内存减少: {(1 - record_current / dict_current) * 100:.1f}%")
+
+if __name__ == '__main__':
+    main()
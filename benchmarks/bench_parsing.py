@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+解析函数微基准：比较 parsing.py 与原实现（每次调用编译正则、对页面依次运行多个正则）的吞吐量
+
+语料依次取自：--pages 指定目录下的 .html 文件、原始页面归档（page_archive/）、生成的模拟页面。
+
+用法:
+    python benchmarks/bench_parsing.py [--pages DIR] [--limit 500] [--repeat 5]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import hashlib
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsing
+
+# ---------- 原实现（用于对比） ----------
+
+def old_extract_url_hash(url):
+    if not url:
+        return ""
+    import re
+    match = re.search(r'https?://mp\.weixin\.qq\.com/s\?.*?(sn=[^&#]+)', url)
+    if match:
+        return match.group(1)
+    return hashlib.md5(url.encode()).hexdigest()[:8]
+
+def old_parse_wechat_time_text(time_text):
+    import re
+    from datetime import datetime
+    time_text = time_text.strip()
+    patterns = [
+        r'(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})',
+        r'(\d{4})-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})',
+        r'^(\d{10,13})$'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, time_text)
+        if match:
+            try:
+                if pattern == patterns[2]:
+                    timestamp = int(match.group(1))
+                    if timestamp > 10**12:
+                        timestamp = timestamp // 1000
+                    dt = datetime.fromtimestamp(timestamp)
+                else:
+                    year, month, day, hour, minute = map(int, match.groups())
+                    dt = datetime(year, month, day, hour, minute)
+                return dt.strftime('%Y-%m-%d %H:%M:%S')
+            except Exception:
+                continue
+    return None
+
+def old_extract_publish_time_from_html(page_source):
+    time_patterns = [
+        r'(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})',
+        r'(\d{4}-\d{1,2}-\d{1,2}\s*\d{1,2}:\d{2})',
+        r'"ct":"(\d+)"',
+        r'time.*?(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})',
+    ]
+    for pattern in time_patterns:
+        match = re.search(pattern, page_source)
+        if match:
+            parsed_time = old_parse_wechat_time_text(match.group(1))
+            if parsed_time:
+                return parsed_time
+    return None
+
+def old_clean_content(content):
+    if not content:
+        return content
+    match = re.search(r'\n?收录于', content)
+    if match:
+        return content[:match.start()].rstrip()
+    return content
+
+def old_extract_real_title_from_content(content):
+    if not content:
+        return ""
+    lines = content.split('\n')
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line and len(line) > 5 and len(line) < 100:
+            if not re.match(r'^[0-9\s,\.，。、]+$', line) and not line.startswith('http'):
+                return line
+    for line in lines[:10]:
+        line = line.strip()
+        if line and any(char in line for char in '【】「」《》""'''):
+            return line
+    for line in lines[:5]:
+        line = line.strip()
+        if line and len(line) > 10:
+            return line[:50] + "..." if len(line) > 50 else line
+    return ""
+
+# ---------- 语料 ----------
+
+def load_pages_from_dir(pages_dir, limit):
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(pages_dir, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+            if len(pages) >= limit:
+                break
+    return pages
+
+def load_pages_from_archive(limit):
+    try:
+        from config import PAGE_ARCHIVE_DIR
+        from page_archive import PageArchive
+    except ImportError:
+        return []
+    if not os.path.isdir(PAGE_ARCHIVE_DIR):
+        return []
+    archive = PageArchive(PAGE_ARCHIVE_DIR)
+    pages = []
+    for record in list(archive.load_index().values())[:limit]:
+        try:
+            pages.append(archive.load(record['digest'], record['codec']))
+        except OSError:
+            continue
+    return pages
+
+def generate_pages(count):
+    """生成模拟的微信文章页面（约60KB，脚本变量中含 ct 时间戳，部分页面正文含中文日期）"""
+    rng = random.Random(0)
+    filler = '<div class="rich_media_content"><p>' + '这是一段正文内容，用于模拟文章页面。' * 40 + '</p></div>\n'
+    pages = []
+    for i in range(count):
+        timestamp = 1700000000 + i * 3600
+        body = filler * rng.randint(20, 40)
+        date_text = f'<em id="publish_time">2024年{i % 12 + 1}月{i % 28 + 1}日 10:{i % 60:02d}</em>' if i % 3 else ''
+        pages.append(f'<html><head><script>var biz = "x"; var ct = "{timestamp}";'
+                     f'window.appmsg = {{"ct":"{timestamp}"}};</script></head><body>'
+                     f'<h1>文章标题 {i}</h1>{body}{date_text}'
+                     f'<p>收录于合集 #专辑 {i}</p></body></html>')
+    return pages
+
+def bench(label, func, items, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='解析函数微基准')
+    parser.add_argument('--pages', help='页面HTML目录（*.html）')
+    parser.add_argument('--limit', type=int, default=500, help='最多使用的页面数')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数，取最短耗时')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages, source = load_pages_from_dir(args.pages, args.limit), args.pages
+    else:
+        pages, source = load_pages_from_archive(args.limit), '原始页面归档'
+        if not pages:
+            pages, source = generate_pages(args.limit), '生成的模拟页面'
+    if not pages:
+        print("没有可用的页面")
+        return 1
+
+    total_mb = sum(len(page) for page in pages) / 1024 / 1024
+    print(f"语料: {source}, {len(pages)} 个页面, {total_mb:.1f} MB\n")
+
+    contents = [re.sub(r'<[^>]+>', '\n', page) for page in pages]
+    urls = [f"https://mp.weixin.qq.com/s?__biz=MzA{i}==&mid={i}&idx=1&sn={i:032x}#rd" for i in range(len(pages))]
+    time_texts = [f"2024年{i % 12 + 1}月{i % 28 + 1}日 {i % 24}:{i % 60:02d}" for i in range(len(pages))]
+
+    cases = [
+        ('extract_publish_time_from_html', old_extract_publish_time_from_html,
+         parsing.extract_publish_time_from_html, pages),
+        ('clean_content', old_clean_content, parsing.clean_content, contents),
+        ('extract_real_title_from_content', old_extract_real_title_from_content,
+         parsing.extract_real_title_from_content, contents),
+        ('extract_url_hash', old_extract_url_hash, parsing.extract_url_hash, urls),
+        ('parse_wechat_time_text', old_parse_wechat_time_text, parsing.parse_wechat_time_text, time_texts),
+    ]
+
+    print(f"{'函数':<34}{'原实现(ms)':>12}{'parsing(ms)':>13}{'加速':>8}{'结果不同':>10}")
+    for name, old_func, new_func, items in cases:
+        mismatches = sum(1 for item in items if old_func(item) != new_func(item))
+        old_seconds = bench(name, old_func, items, args.repeat)
+        new_seconds = bench(name, new_func, items, args.repeat)
+        print(f"{name:<34}{old_seconds * 1000:>12.1f}{new_seconds * 1000:>13.1f}"
+              f"{old_seconds / new_seconds:>7.1f}x{mismatches:>10}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准：用 python -X importtime 统计入口模块的导入耗时，并检查重量级依赖是否被提前加载
+
+Selenium（包括 selenium.common.exceptions）、bs4、requests、webdriver_manager 等只应在真正开始抓取时加载，
+入口脚本的 --help、交互提示和离线命令不需要它们。tests/test_startup.py 在测试中执行同样的检查。
+
+用法:
+    python benchmarks/bench_startup.py            输出各入口的导入耗时和加载的重量级模块
+    python benchmarks/bench_startup.py --check    作为回归检查：加载了重量级模块或超出耗时预算时返回1
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块
+ENTRY_MODULES = ['run', 'crawler', 'toutiao_crawler', 'manage']
+
+# 只应在开始抓取后加载的模块
+HEAVY_MODULES = ['selenium', 'bs4', 'requests', 'webdriver_manager', 'pyarrow']
+
+# 每个入口的导入耗时预算（毫秒），取多次运行的最小值比较
+IMPORT_BUDGET_MS = 150
+
+def measure_import(module, repeat):
+    """
+    在子进程中导入模块并解析 -X importtime 输出
+
+    Returns:
+        tuple: (最小累计导入耗时毫秒数, 加载的全部模块名集合)
+    """
+    best_ms = None
+    loaded = set()
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=PROJECT_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+        total_us = None
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not cumulative.strip().isdigit():
+                continue  # 表头
+            name = name.strip()
+            loaded.add(name)
+            if name == module:
+                total_us = int(cumulative)
+        elapsed_ms = (total_us or 0) / 1000
+        best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+    return best_ms, loaded
+
+def find_heavy(loaded):
+    """返回已加载的重量级模块（包括其子模块）"""
+    return sorted(heavy for heavy in HEAVY_MODULES
+                  if any(name == heavy or name.startswith(heavy + '.') for name in loaded))
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时基准')
+    parser.add_argument('--check', action='store_true', help='回归检查模式，不满足要求时返回1')
+    parser.add_argument('--repeat', type=int, default=5, help='每个入口导入的次数')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help='每个入口的导入耗时预算（毫秒）')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'入口':<18}{'导入耗时(ms)':>14}  提前加载的重量级模块")
+    for module in ENTRY_MODULES:
+        elapsed_ms, loaded = measure_import(module, args.repeat)
+        heavy = find_heavy(loaded)
+        print(f"{module:<18}{elapsed_ms:>14.1f}  {', '.join(heavy) or '-'}")
+        if heavy:
+            failures.append(f"{module}: 导入时加载了 {', '.join(heavy)}")
+        if elapsed_ms > args.budget:
+            failures.append(f"{module}: 导入耗时 {elapsed_ms:.1f} ms 超出预算 {args.budget:.0f} ms")
+
+    if args.check:
+        if failures:
+            print("\n启动耗时检查未通过:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("\n启动耗时检查通过")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+状态文件格式基准：比较 json / json.gz / msgpack 的文件大小和保存、加载耗时
+
+用法:
+    python benchmarks/bench_state_format.py [--articles 10000 100000] [--repeat 3]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_record import to_article_records
+from state_format import FORMAT_JSON, FORMAT_JSON_GZ, FORMAT_MSGPACK, encode_state, decode_state
+from bench_article_memory import make_state_text
+
+def save_state(data, path, state_format):
+    content = encode_state(data, state_format)
+    with open(path, 'wb') as f:
+        f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+
+def load_state(path):
+    with open(path, 'rb') as f:
+        data = decode_state(f.read())
+    data['articles'] = to_article_records(data['articles'])
+    return data
+
+def best_time(func, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='状态文件格式基准')
+    parser.add_argument('--articles', type=int, nargs='+', default=[10000, 100000], help='文章数量')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数')
+    args = parser.parse_args()
+
+    try:
+        import msgpack  # noqa: F401
+        formats = [FORMAT_JSON, FORMAT_JSON_GZ, FORMAT_MSGPACK]
+    except ImportError:
+        print("未安装 msgpack，跳过 msgpack 格式")
+        formats = [FORMAT_JSON, FORMAT_JSON_GZ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for count in args.articles:
+            data = json.loads(make_state_text(count))
+            data['articles'] = to_article_records(data['articles'])
+            print(f"\n文章数: {count}")
+            print(f"{'格式':<10}{'大小(MB)':>10}{'保存(s)':>10}{'加载(s)':>10}")
+            for state_format in formats:
+                path = os.path.join(temp_dir, f"state_{count}.{state_format}")
+                save_seconds = best_time(lambda: save_state(data, path, state_format), args.repeat)
+                load_seconds = best_time(lambda: load_state(path), args.repeat)
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                print(f"{state_format:<10}{size_mb:>10.1f}{save_seconds:>10.3f}{load_seconds:>10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+按主机和错误类型熔断的断路器
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+
+from config import (CIRCUIT_BREAKER_THRESHOLDS, CIRCUIT_BREAKER_COOLDOWN,
+                    CIRCUIT_BREAKER_EVENT_FILE)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    断路器：同一主机上某类错误连续失败达到阈值后熔断，冷却期内不再请求该主机；
+    冷却结束后只放行一个探测请求，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, thresholds=None, cooldown=CIRCUIT_BREAKER_COOLDOWN,
+                 event_file=CIRCUIT_BREAKER_EVENT_FILE):
+        """
+        初始化断路器
+
+        Args:
+            thresholds (dict): 各错误类型的熔断阈值 {错误类型: 连续失败次数}
+            cooldown (float): 熔断冷却时长（秒）
+            event_file (str): 熔断事件记录文件（JSON Lines），为None时不落盘
+        """
+        self.thresholds = dict(CIRCUIT_BREAKER_THRESHOLDS if thresholds is None else thresholds)
+        self.cooldown = cooldown
+        self.event_file = event_file
+        self.events = []
+        self._failures = {}  # (主机, 错误类型) -> 连续失败次数
+        self._hosts = {}  # 主机 -> {'state', 'error_class', 'opened_at'}
+
+    def _record_event(self, host, event, error_class=None):
+        """记录熔断/恢复事件"""
+        record = {
+            'time': datetime.now().isoformat(),
+            'host': host,
+            'event': event,
+            'error_class': error_class,
+        }
+        self.events.append(record)
+
+        if self.event_file:
+            try:
+                os.makedirs(os.path.dirname(self.event_file), exist_ok=True)
+                with open(self.event_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            except Exception as e:
+                logging.warning(f"保存熔断事件失败: {e}")
+
+    def _open(self, host, error_class):
+        self._hosts[host] = {'state': STATE_OPEN, 'error_class': error_class, 'opened_at': time.time()}
+        self._record_event(host, 'open', error_class)
+        logging.warning(f"熔断器打开: {host} (错误类型: {error_class})，暂停 {self.cooldown} 秒")
+
+    def get_state(self, host):
+        """获取主机当前的熔断状态"""
+        return self._hosts.get(host, {}).get('state', STATE_CLOSED)
+
+    def before_request(self, host):
+        """
+        请求前检查是否允许访问该主机
+
+        Args:
+            host (str): 主机名
+
+        Returns:
+            float: 0 表示允许请求，否则为建议等待的秒数
+        """
+        circuit = self._hosts.get(host)
+        if not circuit or circuit['state'] == STATE_CLOSED:
+            return 0
+
+        if circuit['state'] == STATE_HALF_OPEN:
+            # 探测请求尚未返回结果
+            return self.cooldown
+
+        remaining = circuit['opened_at'] + self.cooldown - time.time()
+        if remaining > 0:
+            return remaining
+
+        # 冷却结束，放行一个探测请求
+        circuit['state'] = STATE_HALF_OPEN
+        self._record_event(host, 'half_open', circuit['error_class'])
+        logging.info(f"熔断器半开: {host}，发送探测请求")
+        return 0
+
+    def record_success(self, host):
+        """记录一次成功请求"""
+        for key in [key for key in self._failures if key[0] == host]:
+            del self._failures[key]
+
+        circuit = self._hosts.get(host)
+        if circuit and circuit['state'] != STATE_CLOSED:
+            self._record_event(host, 'close', circuit['error_class'])
+            logging.info(f"熔断器关闭: {host}，恢复正常请求")
+            circuit['state'] = STATE_CLOSED
+
+    def record_failure(self, host, error_class):
+        """
+        记录一次失败请求
+
+        Args:
+            host (str): 主机名
+            error_class (str): 错误类型
+        """
+        circuit = self._hosts.get(host)
+        threshold = self.thresholds.get(error_class)
+
+        if circuit and circuit['state'] == STATE_HALF_OPEN:
+            if threshold:
+                # 探测失败，重新熔断
+                self._open(host, error_class)
+            else:
+                # 与熔断原因无关的失败（如浏览器崩溃），允许立即再次探测
+                circuit['state'] = STATE_OPEN
+                circuit['opened_at'] = time.time() - self.cooldown
+            return
+
+        if not threshold:
+            return
+
+        # 其他错误类型的连续计数被打断
+        for key in [key for key in self._failures if key[0] == host and key[1] != error_class]:
+            del self._failures[key]
+
+        key = (host, error_class)
+        self._failures[key] = self._failures.get(key, 0) + 1
+        if self._failures[key] >= threshold and self.get_state(host) == STATE_CLOSED:
+            self._failures[key] = 0
+            self._open(host, error_class)
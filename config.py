@@ -13,24 +13,123 @@ TOUTIAO_ARTICLES_DIR = os.path.join(BASE_DIR, "toutiao_article")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 JSON_FILE = os.path.join(BASE_DIR, "wechat_articles.json")
 TOUTIAO_JSON_FILE = os.path.join(BASE_DIR, "toutiao_articles.json")
+LAYOUT_CACHE_FILE = os.path.join(BASE_DIR, "layout_cache.json")  # 各专辑页面版本检测结果缓存
+DRIVER_CACHE_FILE = os.path.join(BASE_DIR, "driver_cache.json")  # 解析出的浏览器驱动路径缓存
+HTTP_CACHE_DIR = os.path.join(BASE_DIR, "http_cache")  # HTTP响应缓存目录
+PAGE_ARCHIVE_DIR = os.path.join(BASE_DIR, "page_archive")  # 原始页面归档目录
+SEARCH_INDEX_FILE = os.path.join(BASE_DIR, "search_index.db")  # 全文检索索引（SQLite FTS5）
+EXPORT_DIR = os.path.join(BASE_DIR, "exports")  # 语料导出目录（Parquet / JSONL）
+PACKED_ARCHIVE_DIR = os.path.join(BASE_DIR, "packed_articles")  # 打包归档输出目录
 
 # Selenium配置
-CHROME_DRIVER_PATH = None  # 如果为None，使用系统PATH中的chromedriver
+CHROME_DRIVER_PATH = None  # 如果为None，依次使用缓存、系统PATH中的chromedriver、Selenium内置驱动管理
+EDGE_DRIVER_PATH = None  # 如果为None，依次使用缓存、系统PATH中的msedgedriver、Selenium内置驱动管理
+BROWSER_CANDIDATES = ['chrome', 'edge']  # 同时启动的候选浏览器，使用最先启动成功的一个
+DRIVER_STARTUP_TIMEOUT = 45  # 等待任一浏览器启动成功的最长时间（秒）
 # HEADLESS = False  # 是否无头模式运行
 HEADLESS = True
 WINDOW_SIZE = (1280, 720)  # 浏览器窗口大小
+DRIVER_RECYCLE_NAVIGATIONS = 200  # 每个浏览器实例最多访问多少个页面后重建
+DRIVER_RECYCLE_MEMORY_MB = 2048  # 浏览器进程（驱动进程及其子进程）常驻内存超过该值（MB）时重建浏览器，需要安装 psutil
+DRIVER_MEMORY_CHECK_INTERVAL = 10  # 每访问多少个页面检查一次内存
 
 # 抓取配置
 DEFAULT_DELAY = 5  # 默认延时（秒）
 DELAY_RANGE = (2, 5)  # 随机延时范围（秒）
 SCROLL_PAUSE_TIME = 2  # 滚动暂停时间（秒）
+LIST_GROWTH_TIMEOUT = 10  # 滚动后等待列表追加新文章的最长时间（秒），超时视为没有更多
+LIST_MAX_LOAD_ROUNDS = 500  # 专辑列表最多滚动加载的轮数
 PAGE_LOAD_TIMEOUT = 30  # 页面加载超时时间（秒）
 ELEMENT_WAIT_TIMEOUT = 30  # 元素等待超时时间（秒）
 
+# HTTP抓取配置（--http 模式下文章页面直接通过HTTP请求获取）
+HTTP_TIMEOUT = 30  # HTTP请求超时时间（秒）
+HTTP_CACHE_TTL = 7 * 24 * 3600  # 缓存有效期（秒），过期后使用条件请求重新验证
+HTTP_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 缓存总大小上限（字节），超过时按最近最少使用淘汰
+
 # 重试配置
 MAX_RETRY_TIMES = 3  # 最大重试次数
 RETRY_DELAY = 5  # 重试间隔时间（秒）
 
+# 运行内重试配置（按错误类型分类，指数退避 + 随机抖动）
+IN_RUN_MAX_RETRIES = 3  # 单次运行内每篇文章的最大重试次数
+RETRY_BACKOFF_BASE = {  # 各错误类型的退避基数（秒），未列出的类型不重试
+    'timeout': 10,
+    'empty_content': 30,
+    'driver_crash': 5,
+    'anti_bot': 120,
+}
+RETRY_BACKOFF_MAX = 600  # 单次退避的最大时长（秒）
+RETRY_JITTER = 0.5  # 抖动比例，实际延时在 [delay*(1-jitter), delay] 之间
+ANTI_BOT_MARKERS = ['wappoc_appmsgcaptcha', '环境异常', '完成验证后即可继续访问']  # 验证页面特征
+
+# 熔断配置（按 主机 + 错误类型 统计连续失败次数）
+CIRCUIT_BREAKER_THRESHOLDS = {  # 各错误类型连续失败多少次后熔断，未列出的类型不参与熔断
+    'anti_bot': 2,
+    'timeout': 5,
+    'empty_content': 5,
+}
+CIRCUIT_BREAKER_COOLDOWN = 300  # 熔断后暂停该主机的时长（秒），之后放行一个探测请求
+CIRCUIT_BREAKER_EVENT_FILE = os.path.join(LOGS_DIR, "circuit_breaker.jsonl")  # 熔断/恢复事件记录
+
+# 调度配置
+# 待处理文章的优先级规则，按顺序比较：
+#   'new'          - 上次运行之后新发现的文章优先
+#   'publish_time' - 发布时间越新越优先（待处理文章使用专辑列表中的发布日期，未知的排在最后并保持列表顺序）
+#   'retry_count'  - 重试次数越少越优先
+SCHEDULE_PRIORITY = ['new', 'publish_time', 'retry_count']
+
+# 原始页面归档配置
+PAGE_ARCHIVE_ENABLED = False  # 是否在抓取时归档原始HTML（也可通过 --archive 参数开启）
+
+# 重复文章配置（按规范化正文的SHA-256判断）
+#   'hardlink'  - 重复文章按正常规则命名，文件以硬链接指向已保存的文件（不支持硬链接时写入副本）
+#   'reference' - 不写新文件，状态中的 file_path 直接引用已保存的文件
+#   'off'       - 不检测重复（默认）
+# 启用前注意：硬链接的多个文件共享同一份内容，用编辑器直接修改其中一个文件会影响所有链接
+CONTENT_DEDUP_MODE = 'off'
+
+# 近似重复配置（SimHash指纹，用于识别轻微改动后转载的文章）
+#   'flag' - 正常保存，在状态中记录 near_duplicate_of
+#   'skip' - 不保存，状态中的 file_path 引用相似的已保存文件
+#   'off'  - 不检测（默认）
+# 启用后抓取时维护与状态文件放在一起的 *_simhash.jsonl 指纹索引；已有语料可先运行 python manage.py near-dups --rebuild-index
+NEAR_DUP_MODE = 'off'
+NEAR_DUP_MAX_DISTANCE = 3  # 指纹汉明距离不超过该值视为近似重复（64位指纹）
+
+# 全文检索配置
+SEARCH_INDEX_ENABLED = False  # 是否在保存文章时同步更新全文检索索引（需要SQLite支持FTS5；也可以抓取后用 manage.py index 建立）
+
+# 导出配置
+EXPORT_ROW_GROUP_SIZE = 10000  # Parquet 每个行组的最大行数（同一专辑同一月份的文章放在同一行组）
+
+# 文章目录布局（文章数很多时，单个目录下文件过多会拖慢文件检查和目录列举）
+#   'flat'       - 所有文章直接放在文章目录下
+#   'album_date' - 按 专辑/年/月 分目录，如 articles/专辑名称/2024/01/
+#   'hash'       - 按文件名MD5的前两位分256个目录，如 articles/3f/
+# 修改后运行 python manage.py migrate-layout 移动已有文件
+OUTPUT_LAYOUT = 'flat'
+
+# 文件写入配置
+# 是否由后台线程写入文章文件和状态快照（默认关闭，在抓取线程中直接原子写入）；
+# 磁盘较慢、写入拖慢抓取时可设为 True，后台写入失败会记录在错误日志中，运行结束时等待全部写完
+ASYNC_WRITER_ENABLED = False
+STATE_FLUSH_EVERY = 10  # 每处理多少篇文章保存一次状态和日期计数器
+STATE_FLUSH_INTERVAL = 30  # 距上次保存超过该时间（秒）时也保存一次；运行结束或中断时总会保存
+
+# 状态文件格式（读取时自动识别，修改后下次保存即使用新格式，文件名不变）
+#   'json'    - 缩进排版的JSON，可直接查看和编辑
+#   'json.gz' - 紧凑JSON + gzip压缩
+#   'msgpack' - MessagePack 二进制（需要 pip install msgpack，未安装时使用 'json.gz'）
+STATE_FORMAT = 'json'
+
+# 文章输出方式
+#   'files'  - 每篇文章保存为一个 .md 文件
+#   'packed' - 追加写入滚动的压缩归档分段（文章数很多时节省inode、便于备份），
+#              状态中的 file_path 为 "packed:<URL哈希>"，可用 python manage.py extract 解包为 .md 文件
+OUTPUT_SINK = 'files'
+PACKED_SEGMENT_MAX_BYTES = 256 * 1024 * 1024  # 每个归档分段的大小上限（字节）
+
 # 文件配置
 MAX_TITLE_LENGTH = 100  # 文件名中标题的最大长度
 SUPPORTED_EXTENSIONS = ['.md']  # 支持的文件扩展名
@@ -48,6 +147,7 @@ SELECTORS = {
     'album_items': '.album-item',
     'article_link': 'data-link',
     'article_title': '.desc js_content',
+    'article_time': '.js_article_create_time',  # 列表项中的发布日期（时间戳或日期文本）
     'loading_element': '#js_tag_loading',
     'no_more_element': '#js_tag_no_more_articles',
     'article_content': '#js_content',
@@ -60,6 +160,7 @@ SELECTORS = {
         'article_link': '.album__item',
         'article_title': '.album__item-title-wrp a',
         'article_title_text': '.album__item-title-text',  # 新页面中实际的标题文本元素
+        'article_time': '.album__item-info-item',  # 列表项信息栏（包含发布日期）
         'loading_element': '.loading',
         'no_more_element': '.no-more',
         'article_content': '#js_content',
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+文章正文内容哈希索引（用于跨专辑、跨URL的重复文章检测）
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+
+CONTENT_INDEX_FILE = 'content_index.jsonl'
+
+def normalize_content_for_hash(content):
+    """
+    规范化正文用于计算哈希：合并所有空白字符，去掉首尾空白
+
+    Args:
+        content (str): 文章正文
+
+    Returns:
+        str: 规范化后的正文
+    """
+    return re.sub(r'\s+', ' ', content or '').strip()
+
+def compute_content_hash(content):
+    """计算规范化正文的SHA-256"""
+    return hashlib.sha256(normalize_content_for_hash(content).encode('utf-8')).hexdigest()
+
+def compute_file_hash(file_path):
+    """计算已保存文件正文的SHA-256，读取失败返回None"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return compute_content_hash(f.read())
+    except OSError:
+        return None
+
+class ContentIndex:
+    """
+    正文哈希索引，保存在文章目录下的 content_index.jsonl
+
+    每保存一篇文章追加一行 {哈希, 文件路径, URL}，同一哈希以最后一条记录为准；
+    查询时会确认文件仍然存在，文件被删除或移走的记录视为不存在
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.index_file = os.path.join(output_dir, CONTENT_INDEX_FILE)
+        self.entries = self._load()
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.index_file):
+            return entries
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 中断时可能留下不完整的最后一行
+                entries[record['hash']] = record
+        return entries
+
+    def lookup(self, content_hash, exists=os.path.exists):
+        """
+        查找已保存的相同正文
+
+        Args:
+            content_hash (str): 规范化正文的SHA-256
+            exists (callable): 判断文件是否存在（使用后台写入时需把尚未落盘的文件视为存在）
+
+        Returns:
+            dict: 索引记录（含 file_path、url），不存在返回None
+        """
+        record = self.entries.get(content_hash)
+        if record and exists(record['file_path']):
+            return record
+        return None
+
+    def add(self, content_hash, file_path, url):
+        """记录一篇已保存的文章"""
+        record = {'hash': content_hash, 'file_path': file_path, 'url': url}
+        self.entries[content_hash] = record
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logging.warning(f"写入内容哈希索引失败: {e}")
+
+    def update_paths(self, path_mapping):
+        """
+        文件移动后更新索引中的路径，并重写索引文件（合并重复记录）
+
+        Args:
+            path_mapping (dict): {旧路径: 新路径}
+        """
+        for record in self.entries.values():
+            new_path = path_mapping.get(record['file_path'])
+            if new_path:
+                record['file_path'] = new_path
+
+        temp_file = self.index_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for record in self.entries.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(temp_file, self.index_file)
@@ -6,25 +6,20 @@
 
 import os
 import sys
-import json
 import time
 import argparse
 import logging
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-
-from config import (BASE_DIR, ARTICLES_DIR, TOUTIAO_ARTICLES_DIR, LOGS_DIR, JSON_FILE,
+from config import (ARTICLES_DIR, TOUTIAO_ARTICLES_DIR, LOGS_DIR, JSON_FILE,
                    DEFAULT_DELAY, get_random_delay, SELECTORS, SCROLL_PAUSE_TIME,
-                   HEADLESS, WINDOW_SIZE)
-from utils import (setup_driver, setup_logging, load_json_state, save_json_state,
-                   validate_url, get_article_status, update_article_status,
-                   save_article_content, scroll_to_bottom, clean_filename,
+                   HEADLESS, WINDOW_SIZE, ANTI_BOT_MARKERS,
+                   LIST_GROWTH_TIMEOUT, LIST_MAX_LOAD_ROUNDS, PAGE_ARCHIVE_ENABLED,
+                   NEAR_DUP_MODE, SEARCH_INDEX_ENABLED, ASYNC_WRITER_ENABLED, OUTPUT_SINK)
+from utils import (setup_logging, load_json_state, save_json_state,
+                   validate_url, update_article_status, change_article_status,
+                   scroll_to_bottom, clean_filename,
                    extract_title_from_preview, format_progress_bar, extract_url_hash,
                    check_article_exists_by_url, smart_save_article_content,
                    extract_real_title_from_content, update_articles_with_url_matching,
@@ -32,17 +27,53 @@ from utils import (setup_driver, setup_logging, load_json_state, save_json_state
                    load_date_counter, save_date_counter,
                    find_element_with_fallback, find_elements_with_fallback,
                    extract_article_link_with_fallback, extract_article_title_with_fallback,
-                   check_loading_with_fallback, check_no_more_with_fallback)
+                   extract_article_list_time_with_fallback,
+                   check_loading_with_fallback, check_no_more_with_fallback,
+                   get_selector_stats, resolve_layout_variant,
+                   scroll_and_wait_for_growth, get_variant_selector_list,
+                   extract_publish_time_from_page, extract_content_from_html,
+                   get_publish_time_stats, clean_content, generate_smart_filename)
+from scheduler import ArticleScheduler
+from retry_policy import RetryPolicy, EmptyContentError, AntiBotError, classify_error, ERROR_DRIVER_CRASH
+from circuit_breaker import CircuitBreaker
+from driver_manager import DriverManager
+from content_index import ContentIndex
+from article_record import ArticleRecord
+from near_duplicate import NearDuplicateIndex, compute_simhash, get_index_file
+from search_index import open_search_index
+from async_writer import AtomicFileWriter, CoalescedFlusher
+from packed_store import PackedArchive, build_binary_index
 
 class WeChatAlbumCrawler:
     """微信公众号专辑文章抓取器"""
 
-    def __init__(self, headless=False, delay=DEFAULT_DELAY):
-        """初始化抓取器"""
+    def __init__(self, headless=False, delay=DEFAULT_DELAY, use_http=False,
+                 archive_pages=PAGE_ARCHIVE_ENABLED):
+        """
+        初始化抓取器
+
+        Args:
+            headless (bool): 是否无头模式运行
+            delay (int): 请求间隔时间（秒）
+            use_http (bool): 文章页面是否直接通过HTTP请求获取（带磁盘缓存），专辑列表仍使用浏览器
+            archive_pages (bool): 是否归档文章原始HTML，用于之后离线重新解析
+        """
         self.headless = headless
         self.delay = delay
         self.driver = None
+        self.driver_manager = DriverManager(headless=headless, window_size=WINDOW_SIZE)
+        self.http_fetcher = None
+        if use_http:
+            from http_fetcher import HttpFetcher
+            self.http_fetcher = HttpFetcher()
+        self.page_archive = None
+        if archive_pages:
+            from page_archive import PageArchive
+            self.page_archive = PageArchive()
         self.articles_data = None
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+        self.last_fetch_error = None  # 最近一次提取文章失败的原始异常，用于错误分类
 
         # 设置日志
         setup_logging(
@@ -56,7 +87,7 @@ class WeChatAlbumCrawler:
     def setup_driver(self):
         """设置浏览器驱动"""
         try:
-            self.driver = setup_driver(headless=self.headless, window_size=WINDOW_SIZE)
+            self.driver = self.driver_manager.start()
             logging.info("浏览器驱动设置成功")
             return True
         except Exception as e:
@@ -81,6 +112,12 @@ class WeChatAlbumCrawler:
                 logging.error("页面加载失败，可能被重定向")
                 return False
 
+            # 出现验证页面时直接失败，避免后续每次元素等待都超时
+            self.check_anti_bot_page()
+
+            # 确定页面版本（优先使用缓存），之后的选择器查找直接使用对应版本
+            resolve_layout_variant(self.driver, album_url)
+
             logging.info("专辑页面加载成功")
             return True
 
@@ -90,6 +127,8 @@ class WeChatAlbumCrawler:
 
     def extract_album_info(self):
         """提取专辑基本信息（向后兼容）"""
+        from selenium.webdriver.common.by import By
+
         try:
             album_title = "未知专辑"
             total_articles = 0
@@ -145,52 +184,49 @@ class WeChatAlbumCrawler:
         """加载所有文章列表（向后兼容）"""
         try:
             logging.info("开始加载所有文章...")
+            start_time = time.time()
+
+            item_selectors = get_variant_selector_list('album_items')
+            no_more_selectors = get_variant_selector_list('no_more_element')
 
-            last_count = 0
-            no_change_count = 0
-            max_no_change = 3  # 连续3次没有变化就停止
-            max_iterations = 20  # 最大迭代次数，防止无限循环
+            no_growth_count = 0
+            max_no_growth = 2  # 连续2次等待超时仍无新文章就停止
             iteration = 0
 
-            while no_change_count < max_no_change and iteration < max_iterations:
+            while no_growth_count < max_no_growth and iteration < LIST_MAX_LOAD_ROUNDS:
                 iteration += 1
-                logging.info(f"第 {iteration} 次加载尝试...")
-
-                # 滚动到底部
-                scroll_to_bottom(self.driver, SCROLL_PAUSE_TIME)
 
-                # 使用向后兼容的方式获取当前文章数量
-                current_articles = find_elements_with_fallback(self.driver, 'album_items')
-                current_count = len(current_articles)
-
-                logging.info(f"当前已加载 {current_count} 篇文章")
-
-                # 检查是否有变化
-                if current_count == last_count:
-                    no_change_count += 1
-                    logging.info(f"文章数量无变化，计数: {no_change_count}/{max_no_change}")
-                else:
-                    no_change_count = 0
-                    last_count = current_count
-                    logging.info("文章数量有更新，重置计数器")
+                # 滚动到底部，等待列表追加新文章或出现"没有更多"标记
+                result = scroll_and_wait_for_growth(
+                    self.driver, item_selectors, no_more_selectors, LIST_GROWTH_TIMEOUT
+                )
 
-                # 使用向后兼容的方式检查是否还有加载更多元素
-                if check_loading_with_fallback(self.driver):
-                    logging.info("检测到加载更多元素，继续等待...")
-                    time.sleep(2)
+                if result is None:
+                    # 浏览器不支持异步脚本时退回到按页面高度判断
+                    scroll_to_bottom(self.driver, SCROLL_PAUSE_TIME)
+                    if check_no_more_with_fallback(self.driver):
+                        logging.info("检测到已加载全部文章")
+                        break
+                    no_growth_count += 1
                     continue
 
-                # 使用向后兼容的方式检查是否到达底部
-                if check_no_more_with_fallback(self.driver):
+                logging.debug(f"第 {iteration} 次加载，当前已加载 {result['count']} 篇文章")
+
+                if result['no_more']:
                     logging.info("检测到已加载全部文章")
                     break
 
-                # 如果文章数量为0，可能页面结构有问题，尝试额外等待
-                if current_count == 0:
-                    logging.warning("未找到任何文章元素，可能页面仍在加载或结构不兼容")
-                    time.sleep(3)
+                if result['grew']:
+                    no_growth_count = 0
+                    continue
 
-                time.sleep(1)
+                no_growth_count += 1
+                if check_loading_with_fallback(self.driver):
+                    logging.info(f"加载更多元素仍在显示但未追加新文章，计数: {no_growth_count}/{max_no_growth}")
+                else:
+                    logging.info(f"文章数量无变化，计数: {no_growth_count}/{max_no_growth}")
+
+            logging.info(f"列表加载共 {iteration} 轮，耗时 {time.time() - start_time:.1f} 秒")
 
             # 使用向后兼容的方式获取最终文章数量
             final_articles = find_elements_with_fallback(self.driver, 'album_items')
@@ -201,6 +237,10 @@ class WeChatAlbumCrawler:
             else:
                 logging.info(f"文章加载完成，共 {final_count} 篇")
 
+            selector_stats = get_selector_stats()
+            logging.info(f"选择器匹配版本: {selector_stats['matched_variants']}，"
+                         f"相比逐个等待节省约 {selector_stats['time_saved']:.0f} 秒")
+
             return final_count
 
         except Exception as e:
@@ -209,6 +249,8 @@ class WeChatAlbumCrawler:
 
     def extract_articles_list(self):
         """提取文章列表，支持URL去重（向后兼容）"""
+        from selenium.webdriver.common.by import By
+
         try:
             new_articles = []
 
@@ -273,17 +315,22 @@ class WeChatAlbumCrawler:
                     if not preview_text:
                         preview_text = title
 
-                    article_info = {
-                        'index': article_index,
-                        'title': title,
-                        'url': article_url,
-                        'preview': preview_text[:100] + "..." if len(preview_text) > 100 else preview_text,
-                        'status': 'pending',
-                        'file_path': None,
-                        'error_message': None,
-                        'processed_time': None,
-                        'retry_count': 0
-                    }
+                    article_info = ArticleRecord(
+                        index=article_index,
+                        title=title,
+                        url=article_url,
+                        preview=preview_text[:100] + "..." if len(preview_text) > 100 else preview_text,
+                        status='pending',
+                        file_path=None,
+                        error_message=None,
+                        processed_time=None,
+                        retry_count=0
+                    )
+
+                    # 列表项中的发布日期，用于抓取前按发布时间调度（抓取成功后以文章页面中的时间为准）
+                    list_publish_time = extract_article_list_time_with_fallback(element)
+                    if list_publish_time:
+                        article_info['list_publish_time'] = list_publish_time
 
                     new_articles.append(article_info)
                     logging.debug(f"成功提取文章 {article_index}: {title[:30]}...")
@@ -314,6 +361,15 @@ class WeChatAlbumCrawler:
 
     def extract_article_content(self, article_url):
         """提取文章正文内容和发布时间"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
+        if self.http_fetcher:
+            return self.extract_article_content_http(article_url)
+
+        self.last_fetch_error = None
         try:
             logging.info(f"开始提取文章内容: {article_url}")
 
@@ -322,13 +378,21 @@ class WeChatAlbumCrawler:
             self.driver.switch_to.window(self.driver.window_handles[-1])
 
             # 访问文章页面
+            self.driver_manager.record_navigation()
             self.driver.get(article_url)
 
             # 等待页面加载
             time.sleep(3)
 
+            # 检查是否被重定向或出现验证页面，尽早失败，避免后续元素等待超时
+            page_source = self.check_anti_bot_page()
+
+            # 归档原始页面
+            if self.page_archive:
+                self.page_archive.store(article_url, page_source)
+
             # 提取发布时间
-            publish_time = extract_publish_time_from_article(self.driver)
+            publish_time = extract_publish_time_from_article(self.driver, page_source)
             logging.info(f"提取到发布时间: {publish_time}")
 
             # 提取文章内容
@@ -379,6 +443,7 @@ class WeChatAlbumCrawler:
 
         except Exception as e:
             logging.error(f"提取文章内容异常: {e}")
+            self.last_fetch_error = e
             # 确保返回主页
             try:
                 if len(self.driver.window_handles) > 1:
@@ -388,18 +453,63 @@ class WeChatAlbumCrawler:
                 pass
             return None, None
 
+    def extract_article_content_http(self, article_url):
+        """通过HTTP请求提取文章正文内容和发布时间（使用磁盘缓存，不打开浏览器标签页）"""
+        self.last_fetch_error = None
+        try:
+            logging.info(f"开始提取文章内容(HTTP): {article_url}")
+            html = self.http_fetcher.fetch(article_url)
+
+            for marker in ANTI_BOT_MARKERS:
+                if marker in html:
+                    raise AntiBotError(f"检测到验证页面: {marker}")
+
+            # 归档原始页面
+            if self.page_archive:
+                self.page_archive.store(article_url, html)
+
+            publish_time = extract_publish_time_from_page(html)
+            logging.info(f"提取到发布时间: {publish_time}")
+
+            content = self.clean_content(extract_content_from_html(html))
+            logging.info(f"文章内容提取成功，长度: {len(content)} 字符")
+            return content, publish_time
+
+        except Exception as e:
+            logging.error(f"提取文章内容异常: {e}")
+            self.last_fetch_error = e
+            return None, None
+
+    def check_anti_bot_page(self):
+        """
+        检查当前页面是否为重定向页或验证页面，是则抛出 AntiBotError
+
+        Returns:
+            str: 当前页面源码
+        """
+        current_url = self.driver.current_url
+        if "mp.weixin.qq.com" not in current_url:
+            raise AntiBotError(f"文章页面被重定向: {current_url}")
+
+        page_source = self.driver.page_source
+        for marker in ANTI_BOT_MARKERS:
+            if marker in current_url or marker in page_source:
+                raise AntiBotError(f"检测到验证页面: {marker}")
+
+        return page_source
+
     def _check_and_append_new_articles(self, album_url):
         """
         检查并追加新文章到现有JSON文件中
         每次启动时自动执行此功能
         """
+        temp_driver = None
         try:
             logging.info("开始检查是否有新文章...")
 
-            # 临时设置驱动（如果还没有设置）
-            temp_driver = None
+            # 临时设置驱动（如果还没有设置），通过驱动管理器创建，检测结束后关闭
             if not self.driver:
-                temp_driver = setup_driver(headless=self.headless, window_size=WINDOW_SIZE)
+                temp_driver = self.driver_manager.start()
                 self.driver = temp_driver
 
             # 加载专辑页面
@@ -412,18 +522,19 @@ class WeChatAlbumCrawler:
             loaded_count = self.load_all_articles()
             logging.info(f"页面加载完成，共找到 {loaded_count} 篇文章")
 
-            # 提取当前页面的文章列表
-            temp_articles_data = self.articles_data.copy() if self.articles_data else {'articles': []}
-            temp_articles_data['articles'] = []  # 清空文章列表，重新提取
-            self.articles_data = temp_articles_data
+            # 提取当前页面的文章列表（临时使用空文章列表，提取后恢复已加载的状态，
+            # 状态文件在本次运行中只解析一次）
+            original_data = self.articles_data
+            self.articles_data = dict(original_data, articles=[]) if original_data else {'articles': []}
+            try:
+                articles = self.extract_articles_list()
+            finally:
+                self.articles_data = original_data
 
-            articles = self.extract_articles_list()
             if not articles:
                 logging.info("未找到任何文章，无法进行新文章检测")
                 return
 
-            # 重新加载原始数据
-            original_data = load_json_state(JSON_FILE)
             if not original_data:
                 logging.info("未找到原始数据，无法进行新文章检测")
                 return
@@ -456,6 +567,7 @@ class WeChatAlbumCrawler:
                     new_article['error_message'] = None
                     new_article['processed_time'] = None
                     new_article['retry_count'] = 0
+                    new_article['discovered_time'] = datetime.now().isoformat()
                     new_articles.append(new_article)
                     logging.info(f"发现新文章: {article.get('title', '未知标题')[:50]}...")
 
@@ -489,24 +601,14 @@ class WeChatAlbumCrawler:
                 logging.info("未发现新文章，继续使用现有数据")
                 print("✅ 未发现新文章，继续使用现有数据")
 
-            # 清理临时驱动
-            if temp_driver:
-                try:
-                    temp_driver.quit()
-                except:
-                    pass
-                self.driver = None
-
         except Exception as e:
             logging.error(f"检测新文章时出错: {e}")
             print(f"⚠️ 检测新文章时出错，继续使用现有数据: {e}")
 
-            # 确保清理临时驱动
-            if 'temp_driver' in locals() and temp_driver:
-                try:
-                    temp_driver.quit()
-                except:
-                    pass
+        finally:
+            # 清理临时驱动（包括提前返回的情况）
+            if temp_driver:
+                self.driver_manager.quit()
                 self.driver = None
 
     def clean_content(self, content):
@@ -519,22 +621,7 @@ class WeChatAlbumCrawler:
         Returns:
             str: 清理后的文章内容
         """
-        import re
-
-        if not content:
-            return content
-
-        # 查找"收录于"的位置
-        pattern = r'\n?收录于'
-        match = re.search(pattern, content)
-
-        if match:
-            # 保留"收录于"之前的内容
-            cleaned_content = content[:match.start()].rstrip()
-            return cleaned_content
-        else:
-            # 如果没有找到"收录于"，返回原内容
-            return content
+        return clean_content(content)
 
     def process_article(self, article_info, output_dir):
         """处理单个文章，支持智能标题提取和去重"""
@@ -548,25 +635,54 @@ class WeChatAlbumCrawler:
             # 提取文章内容和发布时间
             content, publish_time = self.extract_article_content(url)
             if not content:
-                raise Exception("文章内容为空")
+                if self.last_fetch_error:
+                    raise self.last_fetch_error
+                raise EmptyContentError("文章内容为空")
 
             # 尝试从内容中提取真实标题
             real_title = extract_real_title_from_content(content)
             final_title = real_title if real_title else title
 
-            # 使用智能保存功能（传入发布时间和计数器）
-            album_title = self.articles_data.get('album_title') if self.articles_data else None
-            file_path, updated_counter = smart_save_article_content(url, final_title, content, output_dir, album_title, index, publish_time, getattr(self, 'date_counter', {}))
-            if not file_path:
-                raise Exception("保存文章失败")
-
-            # 更新计数器
-            if updated_counter:
-                self.date_counter.update(updated_counter)
-                self._last_updated_counter = updated_counter
+            # 近似重复检测（轻微改动后转载的文章）
+            near_dup_index = getattr(self, 'near_dup_index', None)
+            fingerprint = compute_simhash(content) if near_dup_index is not None else None
+            near_duplicate = near_dup_index.find(fingerprint, exclude_url=url) if fingerprint is not None else None
+            if near_duplicate:
+                distance, duplicate_url, duplicate_path = near_duplicate
+                logging.info(f"检测到近似重复文章 (距离 {distance}): {duplicate_url}")
+                article_info['near_duplicate_of'] = duplicate_url
 
-            # 更新文章信息中的真实标题
+            album_title = self.articles_data.get('album_title') if self.articles_data else None
+            if near_duplicate and NEAR_DUP_MODE == 'skip' and near_duplicate[2]:
+                # 不保存，引用相似的已保存文件
+                file_path = near_duplicate[2]
+            else:
+                packed_archive = getattr(self, 'packed_archive', None)
+                if packed_archive is not None:
+                    # 写入打包归档，文件名只在解包时使用
+                    filename, updated_counter = generate_smart_filename(
+                        url, final_title, index, album_title, publish_time, getattr(self, 'date_counter', {}))
+                    file_path = packed_archive.append(url, content, filename, album_title)
+                else:
+                    # 使用智能保存功能（传入发布时间和计数器）
+                    file_path, updated_counter = smart_save_article_content(url, final_title, content, output_dir, album_title, index, publish_time, getattr(self, 'date_counter', {}),
+                                                                            content_index=getattr(self, 'content_index', None),
+                                                                            writer=getattr(self, 'file_writer', None))
+                if not file_path:
+                    raise Exception("保存文章失败")
+
+                # 更新计数器
+                if updated_counter:
+                    self.date_counter.update(updated_counter)
+                    self._last_updated_counter = updated_counter
+
+                if fingerprint is not None:
+                    near_dup_index.add(fingerprint, url, file_path)
+
+            # 更新文章信息中的真实标题和发布时间
             article_info['title'] = final_title
+            if publish_time:
+                article_info['publish_time'] = publish_time
 
             # 找到对应的文章索引并更新状态
             article_index = None
@@ -580,12 +696,19 @@ class WeChatAlbumCrawler:
             else:
                 logging.warning(f"无法找到文章索引: {url}")
 
+            # 更新全文检索索引
+            search_index = getattr(self, 'search_index', None)
+            if search_index is not None:
+                search_index.add(url, final_title, content, file_path, 'wechat', album_title, publish_time)
+
             logging.info(f"第 {index} 篇文章处理完成: {final_title}")
             return True
 
         except Exception as e:
             error_msg = f"处理失败: {e}"
-            logging.error(f"第 {index} 篇文章处理失败: {title}, {error_msg}")
+            error_class = classify_error(e)
+            logging.error(f"第 {index} 篇文章处理失败: {title}, {error_msg} (错误类型: {error_class})")
+            article_info['error_class'] = error_class
 
             # 找到对应的文章索引并更新状态
             article_index = None
@@ -601,8 +724,53 @@ class WeChatAlbumCrawler:
 
             return False
 
+    def _flush_state(self, output_dir):
+        """保存状态和日期计数器（使用后台写入时只提交快照）"""
+        if not self.articles_data:
+            return
+        writer = getattr(self, 'file_writer', None)
+        save_json_state(self.articles_data, JSON_FILE, writer=writer)
+        album_title = self.articles_data.get('album_title')
+        if album_title:
+            save_date_counter(output_dir, album_title, self.date_counter, writer=writer)
+
+    def _schedule_retry(self, scheduler, article_info, in_run_attempts):
+        """
+        按错误类型决定是否在本次运行内退避重试，重试的文章以延迟方式重新入队，
+        期间继续处理其他文章
+
+        Args:
+            scheduler (ArticleScheduler): 调度器
+            article_info (dict): 处理失败的文章信息
+            in_run_attempts (dict): 本次运行内各文章的重试次数 {URL哈希: 次数}
+
+        Returns:
+            bool: 是否已重新入队
+        """
+        url_hash = extract_url_hash(article_info['url'])
+        error_class = article_info.get('error_class')
+        attempt = in_run_attempts.get(url_hash, 0)
+
+        if not self.retry_policy.should_retry(error_class, attempt):
+            return False
+
+        delay = self.retry_policy.get_delay(error_class, attempt)
+        in_run_attempts[url_hash] = attempt + 1
+        # 重新计为待处理（失败统计减一），最终仍失败时 update_article_status 会重新统计并写入错误信息；
+        # 清除本次的错误信息，避免等待重试或重试成功的文章仍带着旧的错误
+        change_article_status(self.articles_data, article_info, 'pending')
+        article_info['error_message'] = None
+        article_info['error_class'] = None
+        article_info['retry_count'] = article_info.get('retry_count', 0) + 1
+        scheduler.push(article_info, delay=delay)
+
+        logging.info(f"第 {article_info['index']} 篇文章将在 {delay:.1f} 秒后重试 "
+                     f"(错误类型: {error_class}, 第 {attempt + 1}/{self.retry_policy.max_retries} 次)")
+        return True
+
     def crawl_album(self, album_url, output_dir=ARTICLES_DIR, resume=True, retry_failed_only=False):
         """抓取专辑文章"""
+        run_start_time = datetime.now().isoformat()
         try:
             # 加载现有状态
             if resume and os.path.exists(JSON_FILE):
@@ -622,6 +790,16 @@ class WeChatAlbumCrawler:
             # 加载日期计数器
             album_title = self.articles_data.get('album_title') if self.articles_data else None
             self.date_counter = load_date_counter(output_dir, album_title) if album_title else {}
+            self.content_index = ContentIndex(output_dir)
+            if NEAR_DUP_MODE != 'off':
+                self.near_dup_index = NearDuplicateIndex(get_index_file(JSON_FILE))
+            if SEARCH_INDEX_ENABLED:
+                self.search_index = open_search_index()
+            if ASYNC_WRITER_ENABLED:
+                self.file_writer = AtomicFileWriter()
+            if OUTPUT_SINK == 'packed':
+                self.packed_archive = PackedArchive()
+            self.state_flusher = CoalescedFlusher(lambda: self._flush_state(output_dir))
 
             # 如果只重试失败的文章，过滤文章列表
             if retry_failed_only and self.articles_data:
@@ -681,44 +859,87 @@ class WeChatAlbumCrawler:
             if album_url not in self.driver.current_url:
                 self.load_album_page(album_url)
 
-            # 处理待处理的文章
+            # 处理待处理的文章（按优先级调度，新文章优先）
             pending_articles = [a for a in self.articles_data['articles'] if a['status'] == 'pending']
 
             if not pending_articles:
                 logging.info("没有待处理的文章")
                 return True
 
-            logging.info(f"开始处理 {len(pending_articles)} 篇待处理文章")
+            scheduler = ArticleScheduler(last_run_time=self.articles_data.get('last_run_time'))
+            scheduler.extend(pending_articles)
+            total_pending = len(scheduler)
+
+            logging.info(f"开始处理 {total_pending} 篇待处理文章（调度规则: {scheduler.priority}）")
 
             success_count = 0
-            for i, article_info in enumerate(pending_articles):
+            processed_count = 0
+            in_run_attempts = {}
+            while scheduler:
+                article_info = scheduler.pop()
+                if article_info is None:
+                    # 只剩等待退避的文章
+                    wait_time = scheduler.next_ready_in()
+                    logging.info(f"暂无可处理文章，等待 {wait_time:.1f} 秒后重试...")
+                    time.sleep(wait_time)
+                    continue
+
+                # 主机处于熔断状态时不发起请求，推迟到冷却结束
+                host = urlparse(article_info['url']).netloc
+                blocked_time = self.circuit_breaker.before_request(host)
+                if blocked_time > 0:
+                    scheduler.push(article_info, delay=blocked_time)
+                    continue
+
+                processed_count += 1
+
+                # 确保浏览器可用（会话失效时自动重建，达到阈值时主动回收）
+                try:
+                    self.driver = self.driver_manager.ensure_healthy()
+                except Exception as e:
+                    logging.error(f"重建浏览器驱动失败: {e}")
+                    return False
+
                 # 显示进度
                 progress = format_progress_bar(
-                    i + 1, len(pending_articles),
+                    processed_count, total_pending,
                     prefix=f"处理进度",
-                    suffix=f"{i + 1}/{len(pending_articles)}"
+                    suffix=f"{processed_count}/{total_pending}"
                 )
                 print(f"\r{progress}", end="", flush=True)
 
                 # 处理文章
                 if self.process_article(article_info, output_dir):
                     success_count += 1
-
-                # 保存状态和日期计数器
-                save_json_state(self.articles_data, JSON_FILE)
-                if album_title:
-                    save_date_counter(output_dir, album_title, self.date_counter)
+                    self.circuit_breaker.record_success(host)
+                else:
+                    error_class = article_info.get('error_class')
+                    if error_class == ERROR_DRIVER_CRASH:
+                        # 下一篇文章前会自动重建驱动
+                        logging.warning("检测到浏览器会话崩溃，将在处理下一篇文章前重建驱动")
+                    # 始终交给熔断器记录：浏览器崩溃没有熔断阈值，不计入主机熔断；
+                    # 但半开探测请求崩溃时需要由熔断器重新放行探测，否则会一直停留在半开状态
+                    self.circuit_breaker.record_failure(host, error_class)
+                    if self._schedule_retry(scheduler, article_info, in_run_attempts):
+                        total_pending += 1
+
+                # 保存状态和日期计数器（合并为每N篇或每T秒保存一次）
+                self.state_flusher.mark_dirty()
 
                 # 更新计数器（从保存函数获取的更新）
                 if hasattr(self, '_last_updated_counter'):
                     self.date_counter.update(self._last_updated_counter)
 
                 # 延时
-                if i < len(pending_articles) - 1:  # 不是最后一篇
+                if scheduler:  # 不是最后一篇
                     delay = get_random_delay()
                     logging.info(f"等待 {delay:.1f} 秒...")
                     time.sleep(delay)
 
+            # 记录本次运行时间，用于下次运行判断新文章
+            self.articles_data['last_run_time'] = run_start_time
+            self.state_flusher.flush(force=True)
+
             print()  # 换行
 
             # 最终统计
@@ -726,6 +947,19 @@ class WeChatAlbumCrawler:
             final_failed = sum(1 for a in self.articles_data['articles'] if a['status'] == 'failed')
 
             logging.info(f"处理完成！成功: {final_completed}, 失败: {final_failed}")
+            if in_run_attempts:
+                logging.info(f"本次运行内重试 {sum(in_run_attempts.values())} 次（{len(in_run_attempts)} 篇文章）")
+            if self.driver_manager.restarts:
+                logging.info(f"本次运行共重建浏览器驱动 {self.driver_manager.restarts} 次")
+            publish_time_stats = get_publish_time_stats()
+            if publish_time_stats['total']:
+                hit_rates = '，'.join(f"{strategy} {rate:.0%}"
+                                     for strategy, rate in publish_time_stats['hit_rates'].items())
+                logging.info(f"发布时间提取 {publish_time_stats['total']} 次，命中率: {hit_rates}，"
+                             f"未提取到 {publish_time_stats['miss']} 次")
+            if self.circuit_breaker.events:
+                opened = sum(1 for event in self.circuit_breaker.events if event['event'] == 'open')
+                logging.info(f"本次运行熔断 {opened} 次，事件记录: {self.circuit_breaker.event_file}")
             print(f"\n处理完成！")
             print(f"总文章数: {len(self.articles_data['articles'])}")
             print(f"成功处理: {final_completed}")
@@ -739,7 +973,28 @@ class WeChatAlbumCrawler:
             return False
 
         finally:
+            # 保存尚未保存的状态（包括 Ctrl+C 中断时），并等待后台写入完成
+            if getattr(self, 'state_flusher', None) is not None:
+                try:
+                    self.state_flusher.flush()
+                except Exception as e:
+                    logging.error(f"保存状态失败: {e}")
+            if getattr(self, 'file_writer', None) is not None:
+                self.file_writer.close()
+            if getattr(self, 'packed_archive', None) is not None:
+                self.packed_archive.close()
+                try:
+                    build_binary_index(self.packed_archive.archive_dir)
+                except Exception as e:
+                    logging.warning(f"生成归档二进制索引失败: {e}")
+
+            if self.http_fetcher:
+                self.http_fetcher.close()
+            if getattr(self, 'search_index', None) is not None:
+                self.search_index.close()
+
             # 关闭浏览器
+            self.driver_manager.quit()
             if self.driver:
                 try:
                     self.driver.quit()
@@ -756,6 +1011,10 @@ def main():
     parser.add_argument('--no-resume', action='store_false', dest='resume', help='不从断点继续，重新开始')
     parser.add_argument('--retry-failed', action='store_true', help='仅重试失败的文章（仅支持微信公众号）')
     parser.add_argument('--headless', action='store_true', help='无头模式运行')
+    parser.add_argument('--http', action='store_true',
+                        help='文章页面直接通过HTTP请求获取并缓存到磁盘（仅支持微信公众号）')
+    parser.add_argument('--archive', action='store_true', default=PAGE_ARCHIVE_ENABLED,
+                        help='归档文章原始HTML，之后可用 manage.py reparse 离线重新解析（仅支持微信公众号）')
 
     args = parser.parse_args()
 
@@ -804,7 +1063,8 @@ def main():
     # 根据平台选择抓取器
     if platform == "wechat":
         # 微信公众号抓取
-        crawler = WeChatAlbumCrawler(headless=args.headless, delay=args.delay)
+        crawler = WeChatAlbumCrawler(headless=args.headless, delay=args.delay, use_http=args.http,
+                                     archive_pages=args.archive)
 
         try:
             success = crawler.crawl_album(
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器驱动工厂：按平台查找浏览器、缓存解析出的驱动路径、并发启动候选浏览器
+
+各候选浏览器（默认 Chrome 和 Edge）在独立线程中同时启动，使用最先启动成功的一个，
+其余启动成功的驱动随即关闭。这样某个浏览器安装损坏或驱动下载卡住时，
+不再需要等它超时后才尝试下一个。
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import logging
+import threading
+from datetime import datetime
+
+from config import (get_random_user_agent, PAGE_LOAD_TIMEOUT, CHROME_DRIVER_PATH, EDGE_DRIVER_PATH,
+                    DRIVER_CACHE_FILE, BROWSER_CANDIDATES, DRIVER_STARTUP_TIMEOUT)
+
+# 各平台的浏览器可执行文件：PATH 中的命令名和常见安装位置
+BROWSER_COMMANDS = {
+    'chrome': ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'],
+    'edge': ['microsoft-edge', 'microsoft-edge-stable', 'msedge'],
+}
+BROWSER_PATHS = {
+    'win32': {
+        'chrome': [r"%PROGRAMFILES%\Google\Chrome\Application\chrome.exe",
+                   r"%PROGRAMFILES(X86)%\Google\Chrome\Application\chrome.exe",
+                   r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"],
+        'edge': [r"%PROGRAMFILES(X86)%\Microsoft\Edge\Application\msedge.exe",
+                 r"%PROGRAMFILES%\Microsoft\Edge\Application\msedge.exe"],
+    },
+    'darwin': {
+        'chrome': ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+                   '/Applications/Chromium.app/Contents/MacOS/Chromium'],
+        'edge': ['/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge'],
+    },
+    'linux': {
+        'chrome': ['/opt/google/chrome/chrome', '/snap/bin/chromium'],
+        'edge': ['/opt/microsoft/msedge/msedge'],
+    },
+}
+
+# 驱动程序名称和手动配置的驱动路径
+DRIVER_COMMANDS = {'chrome': 'chromedriver', 'edge': 'msedgedriver'}
+CONFIGURED_DRIVER_PATHS = {'chrome': CHROME_DRIVER_PATH, 'edge': EDGE_DRIVER_PATH}
+BROWSER_NAMES = {'chrome': 'Chrome', 'edge': 'Edge'}
+
+# 各候选线程同时读写驱动路径缓存
+_cache_lock = threading.Lock()
+
+def _platform_key():
+    """当前平台在 BROWSER_PATHS 中的键"""
+    if sys.platform.startswith('win'):
+        return 'win32'
+    if sys.platform == 'darwin':
+        return 'darwin'
+    return 'linux'
+
+def resolve_browser_binary(browser):
+    """
+    查找浏览器可执行文件：先查常见安装位置，再查 PATH
+
+    Args:
+        browser (str): 'chrome' 或 'edge'
+
+    Returns:
+        str: 可执行文件路径，找不到返回None（交给 Selenium 自行查找）
+    """
+    for path in BROWSER_PATHS[_platform_key()].get(browser, []):
+        path = os.path.expandvars(path)
+        if os.path.isfile(path):
+            return path
+
+    for command in BROWSER_COMMANDS.get(browser, []):
+        path = shutil.which(command)
+        if path:
+            return path
+    return None
+
+def load_driver_cache(cache_file=DRIVER_CACHE_FILE):
+    """加载驱动路径缓存 {浏览器: {'driver_path': 路径, 'binary': 浏览器路径, 'resolved_time': 时间}}"""
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"加载驱动路径缓存失败: {e}")
+    return {}
+
+def save_driver_cache(cache_data, cache_file=DRIVER_CACHE_FILE):
+    """保存驱动路径缓存"""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        logging.warning(f"保存驱动路径缓存失败: {e}")
+
+def _update_driver_cache(browser, driver_path, binary=None):
+    """更新（driver_path为None时删除）某个浏览器的驱动路径缓存"""
+    with _cache_lock:
+        cache_data = load_driver_cache()
+        if driver_path:
+            if cache_data.get(browser, {}).get('driver_path') == driver_path:
+                return
+            cache_data[browser] = {'driver_path': driver_path, 'binary': binary,
+                                   'resolved_time': datetime.now().isoformat()}
+        elif browser in cache_data:
+            del cache_data[browser]
+        else:
+            return
+        save_driver_cache(cache_data)
+
+def resolve_driver_path(browser):
+    """
+    查找驱动程序路径：手动配置 > 缓存 > PATH
+
+    都找不到时返回None，由 Selenium Manager 解析（可能需要联网下载，启动成功后写入缓存）
+
+    Args:
+        browser (str): 'chrome' 或 'edge'
+
+    Returns:
+        tuple: (驱动路径或None, 来源 'config' / 'cache' / 'path')
+    """
+    configured_path = CONFIGURED_DRIVER_PATHS.get(browser)
+    if configured_path:
+        return configured_path, 'config'
+
+    with _cache_lock:
+        cached_path = load_driver_cache().get(browser, {}).get('driver_path')
+    if cached_path:
+        if os.path.isfile(cached_path):
+            return cached_path, 'cache'
+        logging.info(f"缓存的 {BROWSER_NAMES[browser]} 驱动已不存在，重新解析: {cached_path}")
+        _update_driver_cache(browser, None)
+
+    path = shutil.which(DRIVER_COMMANDS[browser])
+    if path:
+        return path, 'path'
+    return None, None
+
+def build_chrome_options(headless=False, window_size=(1280, 720), binary=None):
+    """构建Chrome启动参数"""
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+
+    # 基础配置
+    chrome_options.add_argument(f'user-agent={get_random_user_agent()}')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-web-security')
+    chrome_options.add_argument('--allow-running-insecure-content')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # 优化Chrome启动性能的额外参数
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-plugins')
+    chrome_options.add_argument('--disable-default-apps')
+    chrome_options.add_argument('--disable-translate')
+    chrome_options.add_argument('--disable-sync')
+    chrome_options.add_argument('--no-first-run')
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+    chrome_options.add_argument('--disable-features=TranslateUI')
+    chrome_options.add_argument('--disable-ipc-flooding-protection')
+    chrome_options.add_argument('--password-store=basic')
+
+    if headless:
+        chrome_options.add_argument('--headless=new')  # 使用新的 headless 模式
+
+    # 设置窗口大小
+    chrome_options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+
+    # 禁用图片加载以提高速度（可选）
+    prefs = {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.javascript': 1
+    }
+    chrome_options.add_experimental_option('prefs', prefs)
+
+    if binary:
+        chrome_options.binary_location = binary
+    return chrome_options
+
+def build_edge_options(headless=False, window_size=(1280, 720), binary=None):
+    """构建Edge启动参数"""
+    from selenium.webdriver.edge.options import Options as EdgeOptions
+
+    edge_options = EdgeOptions()
+
+    # 基础配置
+    edge_options.add_argument('--no-sandbox')
+    edge_options.add_argument('--disable-dev-shm-usage')
+    edge_options.add_argument('--disable-gpu')
+    edge_options.add_argument('--disable-web-security')
+    edge_options.add_argument('--allow-running-insecure-content')
+    edge_options.add_argument('--disable-blink-features=AutomationControlled')
+    edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    edge_options.add_experimental_option('useAutomationExtension', False)
+
+    if headless:
+        edge_options.add_argument('--headless')
+
+    # 设置窗口大小
+    edge_options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+
+    # 禁用图片加载以提高速度（可选）
+    prefs = {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.javascript': 1
+    }
+    edge_options.add_experimental_option('prefs', prefs)
+
+    if binary:
+        edge_options.binary_location = binary
+    return edge_options
+
+def _start_browser(browser, options, driver_path):
+    """用指定驱动路径（None时由 Selenium Manager 解析）启动浏览器"""
+    from selenium import webdriver
+
+    if browser == 'chrome':
+        from selenium.webdriver.chrome.service import Service
+        return webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+
+    from selenium.webdriver.edge.service import Service
+    return webdriver.Edge(service=Service(executable_path=driver_path), options=options)
+
+def launch_browser(browser, headless=False, window_size=(1280, 720)):
+    """
+    启动一个浏览器并返回驱动
+
+    驱动路径依次取手动配置、缓存、PATH，都没有时由 Selenium Manager 解析；
+    Chrome 还会在 Selenium Manager 失败时尝试 webdriver-manager。启动成功后记录实际使用的驱动路径，
+    下次运行直接使用；缓存的驱动无法启动（如浏览器升级后版本不匹配）时清除缓存并重新解析一次
+
+    Args:
+        browser (str): 'chrome' 或 'edge'
+        headless (bool): 是否无头模式
+        window_size (tuple): 窗口大小
+
+    Returns:
+        WebDriver: 浏览器驱动
+    """
+    name = BROWSER_NAMES[browser]
+    binary = resolve_browser_binary(browser)
+    if binary:
+        logging.info(f"使用 {name} 路径: {binary}")
+    else:
+        logging.info(f"未在常见位置找到 {name}，由 Selenium 自行查找")
+
+    build_options = build_chrome_options if browser == 'chrome' else build_edge_options
+    driver_path, source = resolve_driver_path(browser)
+
+    try:
+        driver = _start_browser(browser, build_options(headless, window_size, binary), driver_path)
+    except Exception as e:
+        if source == 'cache':
+            logging.warning(f"缓存的 {name} 驱动启动失败，重新解析驱动: {e}")
+            _update_driver_cache(browser, None)
+            driver_path, source = None, None
+            try:
+                driver = _start_browser(browser, build_options(headless, window_size, binary), None)
+            except Exception as retry_error:
+                e = retry_error
+                driver = None
+        else:
+            driver = None
+
+        # Selenium Manager 解析失败时，Chrome 再尝试 webdriver-manager（仅当模块存在时）
+        if driver is None and browser == 'chrome' and source is None:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+            except ImportError:
+                raise e
+            logging.info(f"{name} 内置驱动管理失败 ({e})，尝试 webdriver-manager...")
+            driver = _start_browser(browser, build_options(headless, window_size, binary),
+                                    ChromeDriverManager().install())
+        elif driver is None:
+            raise e
+
+    if source != 'config':
+        _update_driver_cache(browser, driver.service.path, binary)
+
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    # 移除 navigator.webdriver 属性以避免被检测
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    return driver
+
+def _quit_quietly(driver):
+    """关闭驱动（忽略异常）"""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def create_driver(headless=False, window_size=(1280, 720), candidates=None, timeout=DRIVER_STARTUP_TIMEOUT,
+                  launcher=launch_browser):
+    """
+    并发启动候选浏览器，返回最先启动成功的驱动
+
+    较晚启动成功的候选浏览器在其线程中直接关闭；超时后仍在启动的候选浏览器也会在启动完成后关闭
+
+    Args:
+        headless (bool): 是否无头模式
+        window_size (tuple): 窗口大小
+        candidates (list): 候选浏览器，默认为 BROWSER_CANDIDATES
+        timeout (float): 等待任一浏览器启动成功的最长时间（秒）
+        launcher (callable): 启动单个浏览器的函数，参数为 (浏览器, headless, window_size)
+
+    Returns:
+        tuple: (浏览器名, 驱动)
+
+    Raises:
+        Exception: 所有候选浏览器都启动失败（抛出最后一个错误）或超时
+    """
+    candidates = list(candidates or BROWSER_CANDIDATES)
+    results = queue.Queue()
+    lock = threading.Lock()
+    state = {'winner': None, 'closed': False}
+    start_time = time.time()
+
+    def worker(browser):
+        try:
+            driver = launcher(browser, headless, window_size)
+        except Exception as e:
+            results.put((browser, None, e, time.time() - start_time))
+            return
+
+        # 只有第一个启动成功的浏览器被使用，其余的立即关闭
+        with lock:
+            won = state['winner'] is None and not state['closed']
+            if won:
+                state['winner'] = browser
+                results.put((browser, driver, None, time.time() - start_time))
+        if not won:
+            logging.info(f"{BROWSER_NAMES.get(browser, browser)} 启动完成但已不需要，关闭 "
+                         f"(耗时: {time.time() - start_time:.1f}秒)")
+            _quit_quietly(driver)
+
+    logging.info(f"同时启动候选浏览器: {', '.join(BROWSER_NAMES.get(b, b) for b in candidates)}")
+    for browser in candidates:
+        threading.Thread(target=worker, args=(browser,), daemon=True,
+                         name=f"driver-start-{browser}").start()
+
+    last_error = None
+    failed = 0
+    deadline = start_time + timeout
+    while failed < len(candidates):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            browser, driver, error, elapsed = results.get(timeout=remaining)
+        except queue.Empty:
+            break
+        name = BROWSER_NAMES.get(browser, browser)
+        if driver is not None:
+            logging.info(f"{name} 驱动创建成功 (耗时: {elapsed:.1f}秒)")
+            return browser, driver
+        failed += 1
+        last_error = error
+        logging.warning(f"{name} 驱动创建失败 (耗时: {elapsed:.1f}秒): {error}")
+
+    # 超时：之后启动成功的浏览器由其线程关闭；加锁前刚好成功的那个仍可使用
+    with lock:
+        state['closed'] = True
+    while True:
+        try:
+            browser, driver, error, elapsed = results.get_nowait()
+        except queue.Empty:
+            break
+        if driver is not None:
+            logging.info(f"{BROWSER_NAMES.get(browser, browser)} 驱动创建成功 (耗时: {elapsed:.1f}秒)")
+            return browser, driver
+        last_error = error
+
+    if failed < len(candidates):
+        raise TimeoutError(f"浏览器驱动创建超时（{timeout}秒）") from last_error
+    raise last_error
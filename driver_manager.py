@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器驱动生命周期管理：崩溃自动恢复与定期回收
+"""
+
+import logging
+
+from config import (WINDOW_SIZE, DRIVER_RECYCLE_NAVIGATIONS, DRIVER_RECYCLE_MEMORY_MB,
+                    DRIVER_MEMORY_CHECK_INTERVAL)
+from utils import setup_driver
+
+def _import_psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+class DriverManager:
+    """
+    浏览器驱动包装器
+
+    检测失效的会话并通过 setup_driver 重新创建驱动；访问页面数或浏览器进程内存
+    超过阈值时主动回收，保证长时间运行时吞吐稳定
+    """
+
+    def __init__(self, headless=False, window_size=WINDOW_SIZE,
+                 max_navigations=DRIVER_RECYCLE_NAVIGATIONS,
+                 memory_limit_mb=DRIVER_RECYCLE_MEMORY_MB,
+                 memory_check_interval=DRIVER_MEMORY_CHECK_INTERVAL,
+                 on_create=None):
+        """
+        初始化驱动管理器
+
+        Args:
+            headless (bool): 是否无头模式
+            window_size (tuple): 窗口大小
+            max_navigations (int): 单个驱动最多访问的页面数，0表示不限制
+            memory_limit_mb (float): 浏览器进程内存上限（MB），0表示不检查（需要 psutil）
+            memory_check_interval (int): 每访问多少个页面检查一次内存
+            on_create (callable): 驱动创建后的回调，参数为新驱动
+        """
+        self.headless = headless
+        self.window_size = window_size
+        self.max_navigations = max_navigations
+        self.memory_limit_mb = memory_limit_mb
+        self.memory_check_interval = max(1, memory_check_interval)
+        self.on_create = on_create
+        self.driver = None
+        self.navigations = 0
+        self.restarts = 0
+        self._memory_warning_logged = False
+
+    def start(self):
+        """创建新的驱动"""
+        self.driver = setup_driver(headless=self.headless, window_size=self.window_size)
+        self.navigations = 0
+        if self.on_create:
+            self.on_create(self.driver)
+        return self.driver
+
+    def quit(self):
+        """关闭当前驱动（忽略已崩溃会话的异常）"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def recreate(self, reason):
+        """
+        关闭并重新创建驱动
+
+        Args:
+            reason (str): 重建原因，用于日志
+
+        Returns:
+            WebDriver: 新的驱动
+        """
+        logging.warning(f"重建浏览器驱动: {reason} (已访问 {self.navigations} 个页面)")
+        self.quit()
+        self.restarts += 1
+        return self.start()
+
+    def is_alive(self):
+        """检查驱动会话是否仍然可用"""
+        from selenium.common.exceptions import WebDriverException
+
+        if not self.driver:
+            return False
+        try:
+            self.driver.window_handles
+            return True
+        except WebDriverException as e:
+            logging.warning(f"浏览器会话已失效: {e}")
+            return False
+
+    def get_memory_mb(self):
+        """
+        获取浏览器占用的内存（MB）：驱动进程（chromedriver / msedgedriver）及其全部子进程
+        （浏览器主进程、渲染进程、GPU进程等）的常驻内存之和，Chrome 和 Edge 都适用
+
+        需要安装 psutil；未安装或无法获取驱动进程时返回None，此时只按访问页面数回收
+        """
+        psutil = _import_psutil()
+        if psutil is None:
+            if not self._memory_warning_logged:
+                logging.info("未安装 psutil，不检查浏览器内存，只按访问页面数回收驱动")
+                self._memory_warning_logged = True
+            return None
+
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        if process is None:
+            return None
+        try:
+            root = psutil.Process(process.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        total = 0
+        for item in processes:
+            try:
+                total += item.memory_info().rss
+            except psutil.Error:
+                pass  # 统计过程中退出的进程
+        return total / (1024 * 1024)
+
+    def record_navigation(self):
+        """记录一次页面访问"""
+        self.navigations += 1
+
+    def ensure_healthy(self):
+        """
+        确保驱动可用：会话失效时重建，达到回收条件时主动回收
+
+        Returns:
+            WebDriver: 可用的驱动
+        """
+        if not self.is_alive():
+            return self.recreate("会话失效")
+
+        if self.max_navigations and self.navigations >= self.max_navigations:
+            return self.recreate(f"访问页面数达到 {self.max_navigations}")
+
+        if (self.memory_limit_mb and self.navigations
+                and self.navigations % self.memory_check_interval == 0):
+            memory_mb = self.get_memory_mb()
+            if memory_mb and memory_mb > self.memory_limit_mb:
+                return self.recreate(f"浏览器内存 {memory_mb:.0f}MB 超过 {self.memory_limit_mb}MB")
+
+        return self.driver
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+导出文章语料为列式/行式文件（Parquet 或 gzip 压缩的 JSONL），供下游分析使用
+
+正文在写出时逐篇读取（生成器流水线），内存占用与语料规模无关；
+增量模式只导出上次导出之后完成的文章，每次写出一个新的分片文件。
+"""
+
+import os
+import gzip
+import json
+import logging
+from datetime import datetime
+
+from config import EXPORT_DIR, EXPORT_ROW_GROUP_SIZE
+from utils import extract_url_hash, read_article_content
+from state_stream import iter_state_articles
+
+FORMAT_PARQUET = 'parquet'
+FORMAT_JSONL = 'jsonl'
+FORMAT_EXTENSIONS = {FORMAT_PARQUET: '.parquet', FORMAT_JSONL: '.jsonl.gz'}
+
+MARKER_FILE = 'export_marker.json'
+
+# 导出的字段（Parquet 列顺序）
+EXPORT_FIELDS = ['url', 'url_hash', 'source', 'album', 'index', 'title', 'publish_time',
+                 'processed_time', 'file_path', 'content_length', 'content']
+
+def load_export_marker(export_dir):
+    """读取上次导出的标记 {'last_processed_time': ..., ...}"""
+    marker_file = os.path.join(export_dir, MARKER_FILE)
+    if os.path.exists(marker_file):
+        try:
+            with open(marker_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"读取导出标记失败，将全量导出: {e}")
+    return {}
+
+def save_export_marker(export_dir, marker):
+    """保存导出标记（先写临时文件再替换）"""
+    marker_file = os.path.join(export_dir, MARKER_FILE)
+    temp_file = marker_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(marker, f, ensure_ascii=False, indent=2)
+    os.replace(temp_file, marker_file)
+
+def iter_article_metadata(state_files, since=None):
+    """
+    遍历状态文件中已完成的文章（不读取正文，状态文件流式读取）
+
+    Args:
+        state_files (list): [(状态文件, 来源)]
+        since (str): 只返回 processed_time 晚于该时间的文章
+
+    Yields:
+        dict: 文章元数据
+    """
+    for json_file, source in state_files:
+        header = {}
+        for article in iter_state_articles(json_file, header):
+            if article.get('status') != 'completed' or not article.get('file_path'):
+                continue
+            processed_time = article.get('processed_time') or ''
+            if since and processed_time <= since:
+                continue
+            yield {
+                'url': article.get('url'),
+                'url_hash': extract_url_hash(article.get('url', '')),
+                'source': source,
+                'album': header.get('album_title') or header.get('user_url'),
+                'index': article.get('index'),
+                'title': article.get('title'),
+                'publish_time': article.get('publish_time'),
+                'processed_time': processed_time,
+                'file_path': article['file_path'],
+            }
+
+def iter_export_records(metadata):
+    """
+    为每篇文章读取正文，生成完整的导出记录；文件缺失的文章跳过
+
+    Args:
+        metadata (iterable): iter_article_metadata 生成的元数据
+
+    Yields:
+        dict: 导出记录
+    """
+    for record in metadata:
+        try:
+            content = read_article_content(record['file_path'])
+        except OSError as e:
+            logging.warning(f"读取文章失败，跳过导出: {record['file_path']}, 错误: {e}")
+            continue
+        # 生成新的字典，避免正文被调用方持有的元数据列表引用
+        yield dict(record, content=content, content_length=len(content))
+
+def _row_group_key(record):
+    """Parquet 行组的分组键：专辑 + 发布月份（按天分组行组过小，不利于压缩和扫描）"""
+    return record['album'] or '', (record['publish_time'] or '')[:7]
+
+def _iter_row_groups(records, max_rows):
+    """把按分组键排好序的记录切分为行组，每组不超过 max_rows 行"""
+    batch = []
+    batch_key = None
+    for record in records:
+        key = _row_group_key(record)
+        if batch and (key != batch_key or len(batch) >= max_rows):
+            yield batch
+            batch = []
+        batch_key = key
+        batch.append(record)
+    if batch:
+        yield batch
+
+def write_parquet(records, output_file, row_group_size=EXPORT_ROW_GROUP_SIZE):
+    """
+    写出 Parquet 文件，每个 专辑+月份 单独成行组（需要安装 pyarrow）
+
+    Args:
+        records (iterable): 已按 _row_group_key 排序的导出记录
+        output_file (str): 输出文件
+        row_group_size (int): 每个行组的最大行数
+
+    Returns:
+        int: 写出的记录数
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("导出 Parquet 需要安装 pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        ('url', pa.string()), ('url_hash', pa.string()), ('source', pa.string()),
+        ('album', pa.string()), ('index', pa.int64()), ('title', pa.string()),
+        ('publish_time', pa.string()), ('processed_time', pa.string()),
+        ('file_path', pa.string()), ('content_length', pa.int64()), ('content', pa.string()),
+    ])
+
+    count = 0
+    with pq.ParquetWriter(output_file, schema, compression='zstd') as writer:
+        for batch in _iter_row_groups(records, row_group_size):
+            columns = {field: [record.get(field) for record in batch] for field in EXPORT_FIELDS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(batch)
+    return count
+
+def write_jsonl(records, output_file):
+    """
+    写出 gzip 压缩的 JSONL 文件，每行一篇文章
+
+    Args:
+        records (iterable): 导出记录
+        output_file (str): 输出文件
+
+    Returns:
+        int: 写出的记录数
+    """
+    count = 0
+    with gzip.open(output_file, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({field: record.get(field) for field in EXPORT_FIELDS},
+                               ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+def export_corpus(state_files, export_dir=EXPORT_DIR, export_format=FORMAT_PARQUET, incremental=False):
+    """
+    导出语料
+
+    全量导出写出 articles.<扩展名>（覆盖上次的全量文件）；增量导出只包含上次导出后完成的文章，
+    写出 articles_<时间>.<扩展名> 分片。两种方式都会更新导出标记。
+
+    Args:
+        state_files (list): [(状态文件, 来源)]
+        export_dir (str): 导出目录
+        export_format (str): 'parquet' 或 'jsonl'
+        incremental (bool): 是否增量导出
+
+    Returns:
+        tuple: (导出文件路径, 导出的文章数)，没有需要导出的文章时路径为None
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    marker = load_export_marker(export_dir)
+    since = marker.get('last_processed_time') if incremental else None
+
+    # 先只收集元数据（很小），用于确定导出范围、增量标记和 Parquet 行组顺序
+    metadata = list(iter_article_metadata(state_files, since))
+    if not metadata:
+        logging.info("没有需要导出的文章")
+        return None, 0
+
+    extension = FORMAT_EXTENSIONS[export_format]
+    if incremental:
+        filename = f"articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+    else:
+        filename = f"articles{extension}"
+    output_file = os.path.join(export_dir, filename)
+    temp_file = output_file + '.tmp'
+
+    logging.info(f"开始导出 {len(metadata)} 篇文章到 {output_file}")
+    try:
+        if export_format == FORMAT_PARQUET:
+            metadata.sort(key=_row_group_key)
+            count = write_parquet(iter_export_records(metadata), temp_file)
+        else:
+            count = write_jsonl(iter_export_records(metadata), temp_file)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    save_export_marker(export_dir, {
+        'last_processed_time': max(record['processed_time'] for record in metadata),
+        'last_export_file': filename,
+        'last_export_time': datetime.now().isoformat(),
+        'format': export_format,
+    })
+
+    logging.info(f"导出完成: {count} 篇文章")
+    return output_file, count
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP响应磁盘缓存（压缩存储 + 条件请求重新验证 + LRU淘汰）
+
+索引在内存中维护，变更合并后由后台线程原子写入 index.json（每N次变更或每T秒一次，关闭时保存剩余变更），
+写入一个页面不再重写整个索引
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES
+from utils import extract_url_hash
+from async_writer import AtomicFileWriter, CoalescedFlusher
+
+# 超过大小上限时淘汰到上限的该比例，避免缓存满后每写入一个页面都排序一次全部条目
+EVICT_TARGET_RATIO = 0.9
+
+def normalize_cache_key(url):
+    """
+    生成URL的缓存键
+
+    微信文章使用 extract_url_hash 提取的 sn= 参数，其他URL使用规范化后的URL
+    （协议和主机小写、查询参数排序、去掉锚点）
+
+    Args:
+        url (str): 请求URL
+
+    Returns:
+        str: 缓存键
+    """
+    if 'mp.weixin.qq.com/s' in url:
+        url_hash = extract_url_hash(url)
+        if url_hash.startswith('sn='):
+            return url_hash
+
+    parsed = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or '/',
+                       parsed.params, query, ''))
+
+class HttpCache:
+    """HTTP响应缓存，正文gzip压缩存储，索引记录ETag/Last-Modified和访问时间"""
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            ttl (float): 缓存有效期（秒），有效期内直接使用缓存，不发请求
+            max_bytes (int): 压缩后正文的总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(cache_dir, self.INDEX_FILE)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self._total_size = sum(entry.get('size', 0) for entry in self.index.values())
+        self.writer = AtomicFileWriter()
+        self.index_flusher = CoalescedFlusher(self.save_index)
+
+    def _load_index(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.warning(f"加载HTTP缓存索引失败，将重建: {e}")
+        return {}
+
+    def save_index(self):
+        """提交缓存索引快照，由后台线程原子写入（先写临时文件再替换，避免中断时损坏）"""
+        try:
+            self.writer.submit(self.index_file, json.dumps(self.index, ensure_ascii=False))
+        except Exception as e:
+            logging.warning(f"保存HTTP缓存索引失败: {e}")
+
+    def close(self):
+        """保存尚未保存的索引变更并等待写入完成"""
+        self.index_flusher.flush()
+        self.writer.close()
+
+    def _remove_entry(self, key):
+        """从索引中删除条目并更新总大小"""
+        entry = self.index.pop(key, None)
+        if entry:
+            self._total_size -= entry.get('size', 0)
+        return entry
+
+    def _body_path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.gz")
+
+    def get(self, url):
+        """
+        读取缓存条目
+
+        Args:
+            url (str): 请求URL
+
+        Returns:
+            dict: 缓存条目（含解压后的 'body' 字节串），不存在返回None
+        """
+        key = normalize_cache_key(url)
+        entry = self.index.get(key)
+        if not entry:
+            return None
+
+        body_path = self._body_path(key)
+        try:
+            with gzip.open(body_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            # 正文文件丢失或损坏，丢弃该条目
+            self._remove_entry(key)
+            self.index_flusher.mark_dirty()
+            return None
+
+        entry['last_access'] = time.time()
+        self.index_flusher.mark_dirty()
+        return dict(entry, body=body)
+
+    def is_fresh(self, entry):
+        """缓存条目是否仍在有效期内"""
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def put(self, url, body, etag=None, last_modified=None, encoding=None):
+        """
+        写入缓存条目
+
+        Args:
+            url (str): 请求URL
+            body (bytes): 响应正文
+            etag (str): ETag 响应头
+            last_modified (str): Last-Modified 响应头
+            encoding (str): 响应编码
+        """
+        key = normalize_cache_key(url)
+        body_path = self._body_path(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+
+        temp_path = body_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(gzip.compress(body, compresslevel=6, mtime=0))
+        os.replace(temp_path, body_path)
+
+        now = time.time()
+        self._remove_entry(key)
+        self.index[key] = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': encoding,
+            'fetched_at': now,
+            'last_access': now,
+            'size': os.path.getsize(body_path),
+        }
+        self._total_size += self.index[key]['size']
+        self._evict(keep=key)
+        self.index_flusher.mark_dirty()
+
+    def touch(self, url):
+        """条件请求返回304时刷新缓存的获取时间"""
+        entry = self.index.get(normalize_cache_key(url))
+        if entry:
+            entry['fetched_at'] = entry['last_access'] = time.time()
+            self.index_flusher.mark_dirty()
+
+    def total_size(self):
+        """缓存正文总大小（字节），随写入和淘汰增量维护"""
+        return self._total_size
+
+    def _evict(self, keep=None):
+        """
+        总大小超过上限时，按最近访问时间淘汰最旧的条目（不淘汰 keep 指定的条目），
+        一次淘汰到上限的 EVICT_TARGET_RATIO
+        """
+        if self._total_size <= self.max_bytes:
+            return
+
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1].get('last_access', 0)):
+            if self._total_size <= target:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self._remove_entry(key)
+            logging.debug(f"HTTP缓存淘汰: {entry.get('url')}")
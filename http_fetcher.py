@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+通过HTTP请求获取文章页面（带磁盘缓存和条件请求）
+"""
+
+import re
+import codecs
+import logging
+
+import requests
+
+from config import HTTP_TIMEOUT, get_random_user_agent
+from http_cache import HttpCache
+
+# 页面开头的 <meta charset="..."> 或 <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+META_SNIFF_BYTES = 4096
+
+def detect_encoding(content_type, body):
+    """
+    确定响应编码：Content-Type 中声明的 charset > 页面 <meta> 中声明的 charset > utf-8
+
+    不使用 requests 的 response.encoding：Content-Type 为 text/html 且没有 charset 时
+    它按 HTTP 规范返回 ISO-8859-1，中文页面会被解码为乱码
+
+    Args:
+        content_type (str): Content-Type 响应头
+        body (bytes): 响应内容
+
+    Returns:
+        str: 编码名称
+    """
+    candidates = []
+    if content_type:
+        match = re.search(r'charset\s*=\s*["\']?([^"\';\s]+)', content_type, re.IGNORECASE)
+        if match:
+            candidates.append(match.group(1))
+    match = _META_CHARSET_PATTERN.search(body[:META_SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode('ascii'))
+
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue  # 无效的编码名称
+    return 'utf-8'
+
+class HttpFetcher:
+    """文章页面HTTP抓取器"""
+
+    def __init__(self, cache=None, timeout=HTTP_TIMEOUT, offline=False):
+        """
+        初始化抓取器
+
+        Args:
+            cache (HttpCache): 响应缓存，为None时使用默认缓存目录
+            timeout (float): 请求超时时间（秒）
+            offline (bool): 离线模式，只使用缓存，不发起任何网络请求
+        """
+        self.cache = cache if cache is not None else HttpCache()
+        self.timeout = timeout
+        self.offline = offline
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = get_random_user_agent()
+
+    @staticmethod
+    def _decode(body, encoding):
+        return body.decode(encoding or 'utf-8', errors='replace')
+
+    def fetch(self, url):
+        """
+        获取页面HTML
+
+        有效期内的缓存直接返回；过期的缓存使用 If-None-Match / If-Modified-Since
+        发起条件请求，服务器返回304时继续使用缓存
+
+        Args:
+            url (str): 页面URL
+
+        Returns:
+            str: 页面HTML
+
+        Raises:
+            requests.RequestException: 请求失败或状态码异常
+            LookupError: 离线模式下缓存未命中
+        """
+        entry = self.cache.get(url)
+        if entry and (self.offline or self.cache.is_fresh(entry)):
+            self.cache.hits += 1
+            return self._decode(entry['body'], entry.get('encoding'))
+
+        if self.offline:
+            raise LookupError(f"离线模式下缓存未命中: {url}")
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry:
+            self.cache.revalidated += 1
+            self.cache.touch(url)
+            logging.debug(f"缓存重新验证通过: {url}")
+            return self._decode(entry['body'], entry.get('encoding'))
+
+        response.raise_for_status()
+        self.cache.misses += 1
+
+        encoding = detect_encoding(response.headers.get('Content-Type'), response.content)
+        self.cache.put(
+            url, response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            encoding=encoding,
+        )
+        return self._decode(response.content, encoding)
+
+    def close(self):
+        """保存缓存索引并关闭会话"""
+        self.cache.close()
+        self.session.close()
+        logging.info(f"HTTP缓存统计 - 命中: {self.cache.hits}, 重新验证: {self.cache.revalidated}, "
+                     f"下载: {self.cache.misses}")
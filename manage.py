@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语料库维护工具（离线命令，不访问网络）
+
+用法:
+    python manage.py reparse [--workers N]    从原始页面归档重新生成Markdown和状态
+    python manage.py reprocess [--clean] [--title] [--rename] [--workers N]
+                                              并行重新处理已保存的文章
+    python manage.py near-dups [--report FILE] [--rebuild-index]
+                                              批量聚类近似重复文章
+    python manage.py index                    为已保存的文章建立全文检索索引
+    python manage.py search 关键词 [--limit N]  全文检索
+    python manage.py export [--format parquet|jsonl] [--incremental]
+                                              导出语料供下游分析
+    python manage.py migrate-layout --layout flat|album_date|hash
+                                              把已保存的文章移动到新的目录布局
+    python manage.py extract [--url-hash H]   把打包归档中的文章解包为 .md 文件
+    python manage.py pack-index               重新生成打包归档的二进制索引
+    python manage.py status [--pending N]     统计状态文件中各状态的文章数（流式读取）
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from config import (JSON_FILE, TOUTIAO_JSON_FILE, ARTICLES_DIR, LOGS_DIR, PAGE_ARCHIVE_DIR,
+                    NEAR_DUP_MAX_DISTANCE, SEARCH_INDEX_FILE, EXPORT_DIR, OUTPUT_LAYOUT,
+                    PACKED_ARCHIVE_DIR)
+
+def cmd_reparse(args):
+    """从原始页面归档重新生成Markdown和状态"""
+    from reprocess import reparse_archive
+
+    stats = reparse_archive(args.state, args.output, args.archive, args.workers)
+    if stats is None:
+        return 1
+
+    print(f"重新解析完成: 共 {stats['total']} 篇，覆盖 {stats['rewritten']} 篇，"
+          f"新建 {stats['created']} 篇，内容为空 {stats['empty']} 篇，失败 {stats['failed']} 篇")
+    return 0
+
+def cmd_reprocess(args):
+    """并行重新处理已保存的文章"""
+    from reprocess import reprocess_articles, OP_CLEAN, OP_TITLE, OP_RENAME
+
+    operations = [op for op, enabled in ((OP_CLEAN, args.clean), (OP_TITLE, args.title),
+                                         (OP_RENAME, args.rename)) if enabled]
+    if not operations:
+        print("请至少指定一个操作: --clean / --title / --rename")
+        return 1
+
+    stats = reprocess_articles(args.state, args.output, operations, args.workers)
+    print(f"重新处理完成: 共 {stats['total']} 篇，重新清理 {stats['cleaned']} 篇，"
+          f"更新标题 {stats['retitled']} 篇，重新命名 {stats['renamed']} 篇，失败 {stats['failed']} 篇")
+    return 0
+
+def cmd_near_dups(args):
+    """批量聚类近似重复文章"""
+    from state_stream import iter_state_articles
+    from near_duplicate import cluster_near_duplicates, rebuild_index, get_index_file
+    from utils import iter_article_files
+
+    if not os.path.isdir(args.output):
+        print(f"文章目录不存在: {args.output}")
+        return 1
+
+    file_paths = sorted(iter_article_files(args.output))
+    clusters, fingerprints = cluster_near_duplicates(file_paths, args.max_distance, args.workers)
+
+    duplicate_count = sum(len(cluster) - 1 for cluster in clusters)
+    print(f"共 {len(file_paths)} 篇文章，{len(clusters)} 组近似重复，可去除 {duplicate_count} 篇")
+    for cluster in clusters[:args.top]:
+        print(f"\n[{len(cluster)} 篇]")
+        for path in cluster:
+            print(f"  {os.path.basename(path)}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(clusters, f, ensure_ascii=False, indent=2)
+        print(f"\n聚类结果已保存: {args.report}")
+
+    if args.rebuild_index:
+        urls = {os.path.abspath(a['file_path']): a.get('url')
+                for a in iter_state_articles(args.state) if a.get('file_path')}
+        rebuild_index(get_index_file(args.state), fingerprints, urls)
+        print(f"近似重复索引已重建: {get_index_file(args.state)}")
+    return 0
+
+def cmd_index(args):
+    """为状态文件中已完成的文章建立全文检索索引"""
+    from search_index import SearchIndex, iter_state_documents
+
+    search_index = SearchIndex(args.db)
+    try:
+        for json_file, source in ((args.state, 'wechat'), (args.toutiao_state, 'toutiao')):
+            count = search_index.add_many(iter_state_documents(json_file, source))
+            print(f"{os.path.basename(json_file)}: 索引 {count} 篇文章")
+        print(f"索引共 {search_index.count()} 篇文章: {args.db}")
+    finally:
+        search_index.close()
+    return 0
+
+def cmd_search(args):
+    """全文检索"""
+    from search_index import SearchIndex
+
+    if not os.path.exists(args.db):
+        print(f"全文检索索引不存在，请先运行: python manage.py index")
+        return 1
+
+    markers = ('\033[1;31m', '\033[0m') if sys.stdout.isatty() else ('[', ']')
+    search_index = SearchIndex(args.db)
+    try:
+        results, elapsed_ms = search_index.search(' '.join(args.query), args.limit, args.album, markers)
+    finally:
+        search_index.close()
+
+    print(f"找到 {len(results)} 条结果（{elapsed_ms:.1f} ms）")
+    for rank, result in enumerate(results, 1):
+        print(f"\n{rank}. {result['title']}  {result['publish_time'] or ''}")
+        print(f"   {result['file_path']}")
+        print(f"   {result['snippet']}")
+    return 0
+
+def cmd_export(args):
+    """导出语料为 Parquet 或 JSONL"""
+    from export import export_corpus
+
+    state_files = [(args.state, 'wechat'), (args.toutiao_state, 'toutiao')]
+    try:
+        output_file, count = export_corpus(state_files, args.output, args.format, args.incremental)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    if output_file:
+        print(f"导出完成: {count} 篇文章 -> {output_file}")
+    else:
+        print("没有需要导出的文章")
+    return 0
+
+def cmd_migrate_layout(args):
+    """把已保存的文章移动到新的目录布局"""
+    from reprocess import migrate_layout
+
+    stats = migrate_layout(args.state, args.output, args.layout)
+    if stats is None:
+        print("迁移失败，文件和状态均未改变，详见日志")
+        return 1
+
+    print(f"迁移完成: 移动 {stats['moved']} 个文件，文件缺失 {stats['missing']} 篇")
+    if stats['packed']:
+        print(f"打包归档中的 {stats['packed']} 篇文章无需迁移，解包（extract）时按 --layout 指定的布局输出")
+    if args.layout != OUTPUT_LAYOUT:
+        print(f"提示: 请把 config.py 中的 OUTPUT_LAYOUT 改为 '{args.layout}'，之后保存的文章才会使用新布局")
+    return 0
+
+def cmd_extract(args):
+    """把打包归档中的文章解包为 .md 文件，或输出单篇文章"""
+    from packed_store import PackedArchive, read_packed_article, make_packed_path
+
+    if args.url_hash:
+        try:
+            content = read_packed_article(make_packed_path(args.url_hash), args.archive)
+        except FileNotFoundError:
+            print(f"归档中没有该文章: {args.url_hash}")
+            return 1
+        print(content)
+        return 0
+
+    extracted = PackedArchive(args.archive).extract(args.output, args.layout)
+    print(f"解包完成: {len(extracted)} 篇文章 -> {args.output}")
+    return 0
+
+def cmd_pack_index(args):
+    """重新生成打包归档的二进制索引"""
+    from packed_store import build_binary_index
+
+    count = build_binary_index(args.archive)
+    print(f"二进制索引已生成: {count} 篇文章")
+    return 0
+
+def cmd_status(args):
+    """流式统计状态文件（不把全部文章载入内存）"""
+    from state_stream import scan_state
+
+    if not os.path.exists(args.state):
+        print(f"状态文件不存在: {args.state}")
+        return 1
+
+    summary = scan_state(args.state)
+    title = summary.header.get('album_title') or summary.header.get('user_url') or ''
+    print(f"{title}: 共 {summary.total} 篇文章，{len(summary.url_hashes)} 个不同URL，最大序号 {summary.max_index}")
+    for status, count in sorted(summary.status_counts.items(), key=lambda item: -item[1]):
+        print(f"  {status}: {count}")
+    for index, url in sorted(summary.pending, key=lambda item: item[0] or 0)[:args.pending]:
+        print(f"  待处理 {index}: {url}")
+    return 0
+
+def build_parser():
+    """构建命令行解析器"""
+    parser = argparse.ArgumentParser(description='语料库维护工具（离线命令，不访问网络）')
+    subparsers = parser.add_subparsers(dest='command')
+
+    reparse_parser = subparsers.add_parser('reparse', help='从原始页面归档重新生成Markdown和状态')
+    reparse_parser.add_argument('--state', default=JSON_FILE, help='状态文件')
+    reparse_parser.add_argument('--output', default=ARTICLES_DIR, help='文章保存目录')
+    reparse_parser.add_argument('--archive', default=PAGE_ARCHIVE_DIR, help='原始页面归档目录')
+    reparse_parser.add_argument('--workers', type=int, default=None, help='进程数（默认使用全部CPU核心）')
+    reparse_parser.set_defaults(func=cmd_reparse)
+
+    reprocess_parser = subparsers.add_parser('reprocess', help='并行重新处理已保存的文章')
+    reprocess_parser.add_argument('--state', default=JSON_FILE, help='状态文件')
+    reprocess_parser.add_argument('--output', default=ARTICLES_DIR, help='文章保存目录')
+    reprocess_parser.add_argument('--clean', action='store_true', help='重新清理正文')
+    reprocess_parser.add_argument('--title', action='store_true', help='从正文重新提取标题')
+    reprocess_parser.add_argument('--rename', action='store_true', help='按发布时间重新生成文件名')
+    reprocess_parser.add_argument('--workers', type=int, default=None, help='进程数（默认使用全部CPU核心）')
+    reprocess_parser.set_defaults(func=cmd_reprocess)
+
+    near_dups_parser = subparsers.add_parser('near-dups', help='批量聚类近似重复文章')
+    near_dups_parser.add_argument('--state', default=JSON_FILE, help='状态文件')
+    near_dups_parser.add_argument('--output', default=ARTICLES_DIR, help='文章保存目录')
+    near_dups_parser.add_argument('--max-distance', type=int, default=NEAR_DUP_MAX_DISTANCE,
+                                  help='视为近似重复的最大指纹汉明距离')
+    near_dups_parser.add_argument('--workers', type=int, default=None, help='进程数（默认使用全部CPU核心）')
+    near_dups_parser.add_argument('--top', type=int, default=20, help='输出最大的前N组')
+    near_dups_parser.add_argument('--report', help='把全部聚类结果保存为JSON文件')
+    near_dups_parser.add_argument('--rebuild-index', action='store_true',
+                                  help='用本次计算的指纹重建抓取时使用的近似重复索引')
+    near_dups_parser.set_defaults(func=cmd_near_dups)
+
+    index_parser = subparsers.add_parser('index', help='为已保存的文章建立全文检索索引')
+    index_parser.add_argument('--state', default=JSON_FILE, help='微信专辑状态文件')
+    index_parser.add_argument('--toutiao-state', default=TOUTIAO_JSON_FILE, help='今日头条状态文件')
+    index_parser.add_argument('--db', default=SEARCH_INDEX_FILE, help='全文检索索引文件')
+    index_parser.set_defaults(func=cmd_index)
+
+    search_parser = subparsers.add_parser('search', help='全文检索')
+    search_parser.add_argument('query', nargs='+', help='查询词，多个词需同时出现')
+    search_parser.add_argument('--limit', type=int, default=20, help='最多返回条数')
+    search_parser.add_argument('--album', help='只检索该专辑（头条为用户主页链接）')
+    search_parser.add_argument('--db', default=SEARCH_INDEX_FILE, help='全文检索索引文件')
+    search_parser.set_defaults(func=cmd_search)
+
+    export_parser = subparsers.add_parser('export', help='导出语料供下游分析')
+    export_parser.add_argument('--state', default=JSON_FILE, help='微信专辑状态文件')
+    export_parser.add_argument('--toutiao-state', default=TOUTIAO_JSON_FILE, help='今日头条状态文件')
+    export_parser.add_argument('--output', default=EXPORT_DIR, help='导出目录')
+    export_parser.add_argument('--format', choices=['parquet', 'jsonl'], default='parquet',
+                               help='导出格式（parquet 需要安装 pyarrow；jsonl 为gzip压缩）')
+    export_parser.add_argument('--incremental', action='store_true',
+                               help='只导出上次导出之后完成的文章，写出新的分片文件')
+    export_parser.set_defaults(func=cmd_export)
+
+    migrate_parser = subparsers.add_parser('migrate-layout', help='把已保存的文章移动到新的目录布局')
+    migrate_parser.add_argument('--state', default=JSON_FILE, help='状态文件')
+    migrate_parser.add_argument('--output', default=ARTICLES_DIR, help='文章保存目录')
+    migrate_parser.add_argument('--layout', choices=['flat', 'album_date', 'hash'], default=OUTPUT_LAYOUT,
+                                help='目标布局（默认使用 config.py 中的 OUTPUT_LAYOUT）')
+    migrate_parser.set_defaults(func=cmd_migrate_layout)
+
+    extract_parser = subparsers.add_parser('extract', help='把打包归档中的文章解包为 .md 文件')
+    extract_parser.add_argument('--archive', default=PACKED_ARCHIVE_DIR, help='打包归档目录')
+    extract_parser.add_argument('--output', default=ARTICLES_DIR, help='解包输出目录')
+    extract_parser.add_argument('--layout', choices=['flat', 'album_date', 'hash'], default=OUTPUT_LAYOUT,
+                                help='解包后的目录布局')
+    extract_parser.add_argument('--url-hash', help='只输出该URL哈希对应的文章（如 sn=xxxx）')
+    extract_parser.set_defaults(func=cmd_extract)
+
+    pack_index_parser = subparsers.add_parser('pack-index', help='重新生成打包归档的二进制索引')
+    pack_index_parser.add_argument('--archive', default=PACKED_ARCHIVE_DIR, help='打包归档目录')
+    pack_index_parser.set_defaults(func=cmd_pack_index)
+
+    status_parser = subparsers.add_parser('status', help='统计状态文件中各状态的文章数')
+    status_parser.add_argument('--state', default=JSON_FILE, help='状态文件')
+    status_parser.add_argument('--pending', type=int, default=10, help='列出的待处理文章数')
+    status_parser.set_defaults(func=cmd_status)
+
+    return parser
+
+def main():
+    """主函数"""
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+
+    from utils import setup_logging
+    setup_logging(
+        log_level='INFO',
+        log_file=os.path.join(LOGS_DIR, "manage.log"),
+        error_log_file=os.path.join(LOGS_DIR, "errors.log")
+    )
+
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+近似重复文章检测（SimHash指纹 + 分段LSH索引）
+
+64位指纹按 max_distance + 1 段切分：汉明距离不超过 max_distance 的两个指纹
+至少有一段完全相同（抽屉原理），因此只需比较至少一段相同的候选，不必两两比较。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import Counter, defaultdict
+
+from config import NEAR_DUP_MAX_DISTANCE
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3  # 按连续3个字符切分特征（中文没有空格分词）
+MIN_TEXT_LENGTH = 50  # 正文过短时指纹不可靠，不参与检测
+
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def compute_simhash(text):
+    """
+    计算正文的64位SimHash指纹
+
+    Args:
+        text (str): 文章正文
+
+    Returns:
+        int: 指纹，正文过短返回None
+    """
+    text = _NON_WORD_PATTERN.sub('', text or '')
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+
+    shingles = Counter(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+    # 先按字节统计权重（每个特征8次累加），再展开到64位，避免每个特征逐位循环
+    byte_weights = [[0] * 256 for _ in range(FINGERPRINT_BITS // 8)]
+    total = 0
+    for shingle, weight in shingles.items():
+        value = _shingle_hash(shingle)
+        total += weight
+        for table in byte_weights:
+            table[value & 0xFF] += weight
+            value >>= 8
+
+    fingerprint = 0
+    for byte_index, table in enumerate(byte_weights):
+        for bit in range(8):
+            mask = 1 << bit
+            set_weight = sum(weight for byte_value, weight in enumerate(table) if byte_value & mask)
+            if set_weight * 2 > total:
+                fingerprint |= 1 << (byte_index * 8 + bit)
+    return fingerprint
+
+def hamming_distance(a, b):
+    """两个指纹的汉明距离"""
+    return bin(a ^ b).count('1')
+
+def split_bands(fingerprint, bands):
+    """把指纹切分为 bands 段，返回 [(段序号, 段值)]"""
+    width = -(-FINGERPRINT_BITS // bands)
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(bands)]
+
+def get_index_file(json_file):
+    """近似重复索引文件路径（与状态文件放在一起）"""
+    return os.path.splitext(json_file)[0] + '_simhash.jsonl'
+
+class NearDuplicateIndex:
+    """
+    SimHash分段LSH索引
+
+    索引追加写入 jsonl 文件，每行 {指纹, URL, 文件路径}
+    """
+
+    def __init__(self, index_file, max_distance=NEAR_DUP_MAX_DISTANCE):
+        self.index_file = index_file
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.records = []
+        self.buckets = defaultdict(list)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_file):
+            return
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 中断时可能留下不完整的最后一行
+                self._insert(int(record['fingerprint'], 16), record.get('url'), record.get('file_path'))
+
+    def _insert(self, fingerprint, url, file_path):
+        record_id = len(self.records)
+        self.records.append((fingerprint, url, file_path))
+        for band_key in split_bands(fingerprint, self.bands):
+            self.buckets[band_key].append(record_id)
+
+    def find(self, fingerprint, exclude_url=None):
+        """
+        查找最相似的已索引文章
+
+        Args:
+            fingerprint (int): 指纹
+            exclude_url (str): 忽略该URL自身的记录（同一文章重新抓取时）
+
+        Returns:
+            tuple: (汉明距离, URL, 文件路径)，没有近似重复返回None
+        """
+        best = None
+        seen = set()
+        for band_key in split_bands(fingerprint, self.bands):
+            for record_id in self.buckets.get(band_key, ()):
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+                other, url, file_path = self.records[record_id]
+                if exclude_url and url == exclude_url:
+                    continue
+                distance = hamming_distance(fingerprint, other)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, url, file_path)
+        return best
+
+    def update_paths(self, path_mapping):
+        """
+        文件移动后更新索引中的路径，并重写索引文件
+
+        Args:
+            path_mapping (dict): {旧路径: 新路径}
+        """
+        self.records = [(fingerprint, url, path_mapping.get(file_path, file_path))
+                        for fingerprint, url, file_path in self.records]
+        rebuild_index(self.index_file, ((file_path, fingerprint) for fingerprint, _, file_path in self.records),
+                      {file_path: url for _, url, file_path in self.records})
+
+    def add(self, fingerprint, url, file_path):
+        """把文章加入索引并追加写入索引文件"""
+        self._insert(fingerprint, url, file_path)
+        try:
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'fingerprint': f"{fingerprint:016x}", 'url': url,
+                                    'file_path': file_path}, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logging.warning(f"写入近似重复索引失败: {e}")
+
+def _fingerprint_file(file_path):
+    """子进程：计算一个文件的指纹"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return compute_simhash(f.read())
+    except OSError:
+        return None
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+def cluster_near_duplicates(file_paths, max_distance=NEAR_DUP_MAX_DISTANCE, workers=None):
+    """
+    对已有文章批量聚类近似重复
+
+    指纹在进程池中并行计算；同一分段桶内的文章才做比较，相似的用并查集合并，
+    总体耗时约与文章数成线性
+
+    Args:
+        file_paths (list): Markdown文件路径
+        max_distance (int): 视为近似重复的最大汉明距离
+        workers (int): 进程数，默认使用全部CPU核心
+
+    Returns:
+        tuple: (聚类列表 [[文件路径, ...], ...]（只包含2篇以上的聚类）, {文件路径: 指纹})
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from reprocess import get_chunksize
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        fingerprints = list(executor.map(_fingerprint_file, file_paths,
+                                         chunksize=get_chunksize(len(file_paths), workers)))
+
+    valid = [(path, fp) for path, fp in zip(file_paths, fingerprints) if fp is not None]
+    bands = max_distance + 1
+    buckets = defaultdict(list)
+    for item, (_, fingerprint) in enumerate(valid):
+        for band_key in split_bands(fingerprint, bands):
+            buckets[band_key].append(item)
+
+    union_find = _UnionFind(len(valid))
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if union_find.find(a) == union_find.find(b):
+                    continue
+                if hamming_distance(valid[a][1], valid[b][1]) <= max_distance:
+                    union_find.union(a, b)
+
+    clusters = defaultdict(list)
+    for item, (path, _) in enumerate(valid):
+        clusters[union_find.find(item)].append(path)
+
+    result = sorted((sorted(paths) for paths in clusters.values() if len(paths) > 1),
+                    key=len, reverse=True)
+    return result, dict(valid)
+
+def rebuild_index(index_file, fingerprints, urls=None):
+    """
+    用批量计算的指纹重写近似重复索引
+
+    Args:
+        index_file (str): 索引文件
+        fingerprints (dict or iterable): {文件路径: 指纹} 或 (文件路径, 指纹) 序列
+        urls (dict): {文件路径: URL}，状态文件中没有记录的文件URL为空
+    """
+    urls = urls or {}
+    if isinstance(fingerprints, dict):
+        fingerprints = fingerprints.items()
+    temp_file = index_file + '.tmp'
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        for file_path, fingerprint in fingerprints:
+            f.write(json.dumps({'fingerprint': f"{fingerprint:016x}", 'url': urls.get(file_path),
+                                'file_path': file_path}, ensure_ascii=False) + '\n')
+    os.replace(temp_file, index_file)
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+打包归档输出（代替每篇文章一个 .md 文件）
+
+文章追加写入滚动的归档分段（segment_00000.zst 等，每段约 PACKED_SEGMENT_MAX_BYTES），
+每篇文章单独压缩为一个 zstd 帧（未安装 zstandard 时为 gzip 成员），可以按偏移量单独解压；
+index.jsonl 记录 URL哈希 到 分段/偏移/长度 的映射，同一URL以最后一条记录为准。
+状态文件中这类文章的 file_path 为 "packed:<URL哈希>"。
+
+每次运行结束后由 index.jsonl 生成定长二进制索引 index.bin，供随机读取使用：
+文件头为8字节魔数 + 4字节记录数，之后每条记录32字节
+（URL哈希的MD5 16字节 + 分段号 4字节 + 偏移量 8字节 + 长度 4字节，大端序），按MD5排序。
+读取时整个文件以 mmap 映射并二分查找，只有被访问到的页面会载入内存。
+"""
+
+import os
+import re
+import json
+import mmap
+import struct
+import hashlib
+import logging
+from datetime import datetime
+
+from config import PACKED_ARCHIVE_DIR, PACKED_SEGMENT_MAX_BYTES, OUTPUT_LAYOUT
+from utils import extract_url_hash, get_article_path, write_file_atomic
+from content_index import compute_content_hash, compute_file_hash
+from page_archive import compress_bytes, decompress_bytes, CODEC_ZSTD, CODEC_GZIP, zstandard
+
+PACKED_PATH_PREFIX = 'packed:'
+INDEX_FILE = 'index.jsonl'
+BINARY_INDEX_FILE = 'index.bin'
+
+BINARY_INDEX_MAGIC = b'WXPKIDX1'
+_BINARY_HEADER = struct.Struct('>8sI')
+_BINARY_RECORD = struct.Struct('>16sIQI')
+
+_SEGMENT_PATTERN = re.compile(r'^segment_(\d{5})\.(zst|gz)$')
+
+def is_packed_path(file_path):
+    """file_path 是否指向打包归档中的文章"""
+    return bool(file_path) and file_path.startswith(PACKED_PATH_PREFIX)
+
+def make_packed_path(url_hash):
+    """生成打包归档文章的 file_path"""
+    return f"{PACKED_PATH_PREFIX}{url_hash}"
+
+def get_segment_path(archive_dir, segment, codec):
+    """分段文件路径"""
+    return os.path.join(archive_dir, f"segment_{segment:05d}.{codec}")
+
+def list_segments(archive_dir):
+    """
+    列出已有分段
+
+    Returns:
+        dict: {分段号: 压缩编码}
+    """
+    segments = {}
+    if os.path.isdir(archive_dir):
+        for name in os.listdir(archive_dir):
+            match = _SEGMENT_PATTERN.match(name)
+            if match:
+                segments[int(match.group(1))] = match.group(2)
+    return segments
+
+def read_record(archive_dir, segment, offset, length, codec):
+    """
+    按偏移量读取并解压一篇文章
+
+    Args:
+        archive_dir (str): 归档目录
+        segment (int): 分段号
+        offset (int): 偏移量
+        length (int): 压缩后长度
+        codec (str): 压缩编码
+
+    Returns:
+        str: 文章正文
+    """
+    with open(get_segment_path(archive_dir, segment, codec), 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return decompress_bytes(data, codec).decode('utf-8')
+
+class PackedArchive:
+    """打包归档的写入和随机读取"""
+
+    def __init__(self, archive_dir=PACKED_ARCHIVE_DIR, segment_max_bytes=PACKED_SEGMENT_MAX_BYTES):
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+        self.index_file = os.path.join(archive_dir, INDEX_FILE)
+        self.segments = list_segments(archive_dir)
+        self.entries = self.load_index()
+        self._segment_file = None
+        self._segment = None
+
+    def load_index(self):
+        """
+        读取偏移索引
+
+        Returns:
+            dict: {URL哈希: 最新的索引记录}
+        """
+        entries = {}
+        if not os.path.exists(self.index_file):
+            return entries
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 中断时可能留下不完整的最后一行
+                entries[record['url_hash']] = record
+        return entries
+
+    def _open_segment(self, incoming_size):
+        """打开可以继续追加的分段：当前分段写满或压缩编码不同时开始新分段"""
+        if self._segment_file is not None:
+            if self._segment_file.tell() + incoming_size <= self.segment_max_bytes:
+                return
+            self._segment_file.close()
+            self._segment_file = None
+
+        latest = max(self.segments) if self.segments else None
+        if latest is not None and self.segments[latest] == self.codec:
+            path = get_segment_path(self.archive_dir, latest, self.codec)
+            if os.path.getsize(path) + incoming_size <= self.segment_max_bytes:
+                self._segment = latest
+                self._segment_file = open(path, 'ab')
+                return
+
+        self._segment = 0 if latest is None else latest + 1
+        self.segments[self._segment] = self.codec
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._segment_file = open(get_segment_path(self.archive_dir, self._segment, self.codec), 'ab')
+        logging.info(f"开始新的归档分段: {self._segment:05d}")
+
+    def append(self, url, content, filename=None, album_title=None):
+        """
+        追加一篇文章
+
+        Args:
+            url (str): 文章URL
+            content (str): 文章正文
+            filename (str): 解包时使用的文件名（不含扩展名）
+            album_title (str): 专辑标题（解包时用于分目录布局）
+
+        Returns:
+            str: 文章的 file_path（"packed:<URL哈希>"）
+        """
+        url_hash = extract_url_hash(url)
+        data = content.strip().encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+
+        # 同一文章内容未变时不重复写入
+        existing = self.entries.get(url_hash)
+        if existing and existing.get('sha256') == digest:
+            logging.info(f"文章已在归档中，跳过写入: {filename or url}")
+            return make_packed_path(url_hash)
+
+        compressed = compress_bytes(data, self.codec)
+        self._open_segment(len(compressed))
+        offset = self._segment_file.tell()
+        self._segment_file.write(compressed)
+        self._segment_file.flush()
+
+        record = {
+            'url_hash': url_hash,
+            'url': url,
+            'segment': self._segment,
+            'offset': offset,
+            'length': len(compressed),
+            'codec': self.codec,
+            'sha256': digest,
+            'filename': filename,
+            'album_title': album_title,
+            'stored_time': datetime.now().isoformat(),
+        }
+        # 先写数据再写索引：中断时最多在分段末尾留下没有索引的数据，不影响读取
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.entries[url_hash] = record
+
+        logging.info(f"文章已写入归档分段 {self._segment:05d}: {filename or url}")
+        return make_packed_path(url_hash)
+
+    def read(self, url_hash):
+        """
+        按URL哈希读取文章正文
+
+        Returns:
+            str: 文章正文，不存在返回None
+        """
+        record = self.entries.get(url_hash)
+        if not record:
+            return None
+        if self._segment_file is not None:
+            self._segment_file.flush()
+        return read_record(self.archive_dir, record['segment'], record['offset'],
+                           record['length'], record['codec'])
+
+    def extract(self, output_dir, layout=OUTPUT_LAYOUT):
+        """
+        把归档中的文章解包为 Markdown 文件（目录布局与直接保存时相同）
+
+        目标文件已存在时比较正文哈希：相同则跳过，不同则在文件名后加编号，不会覆盖已有文件
+
+        Args:
+            output_dir (str): 输出目录
+            layout (str): 目录布局
+
+        Returns:
+            dict: {URL哈希: 解包后的文件路径}
+        """
+        extracted = {}
+        for url_hash, record in self.entries.items():
+            base_filename = record.get('filename') or hashlib.md5(url_hash.encode('utf-8')).hexdigest()
+            content = read_record(self.archive_dir, record['segment'], record['offset'],
+                                  record['length'], record['codec'])
+            content_hash = compute_content_hash(content)
+
+            filename = base_filename
+            file_path = get_article_path(output_dir, filename, record.get('album_title'), layout)
+            collisions = 0
+            while os.path.exists(file_path) and compute_file_hash(file_path) != content_hash:
+                collisions += 1
+                filename = f"{base_filename}_{collisions + 1:02d}"
+                file_path = get_article_path(output_dir, filename, record.get('album_title'), layout)
+
+            if os.path.exists(file_path):
+                logging.info(f"文章已存在，跳过解包: {os.path.basename(file_path)}")
+            else:
+                if collisions:
+                    logging.warning(f"文件名冲突（内容不同）: {base_filename}，解包为 {os.path.basename(file_path)}")
+                write_file_atomic(file_path, content)
+            extracted[url_hash] = file_path
+        return extracted
+
+    def close(self):
+        """关闭当前分段"""
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+def _binary_key(url_hash):
+    return hashlib.md5(url_hash.encode('utf-8')).digest()
+
+def build_binary_index(archive_dir=PACKED_ARCHIVE_DIR):
+    """
+    由 index.jsonl 生成定长二进制索引 index.bin（先写临时文件再替换）
+
+    Args:
+        archive_dir (str): 归档目录
+
+    Returns:
+        int: 索引的文章数
+    """
+    entries = PackedArchive(archive_dir).entries
+    records = sorted((_binary_key(url_hash), record['segment'], record['offset'], record['length'])
+                     for url_hash, record in entries.items())
+
+    index_file = os.path.join(archive_dir, BINARY_INDEX_FILE)
+    temp_file = index_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(_BINARY_HEADER.pack(BINARY_INDEX_MAGIC, len(records)))
+        for record in records:
+            f.write(_BINARY_RECORD.pack(*record))
+    os.replace(temp_file, index_file)
+
+    logging.info(f"归档二进制索引已生成: {len(records)} 篇文章")
+    return len(records)
+
+def is_binary_index_fresh(archive_dir=PACKED_ARCHIVE_DIR):
+    """
+    二进制索引存在且比 index.jsonl 新（之后没有新写入的文章）
+
+    修改时间相同时视为过期：文件系统时间精度较粗时，生成索引后紧接着追加的文章可能与索引同一时间戳
+    """
+    binary_file = os.path.join(archive_dir, BINARY_INDEX_FILE)
+    index_file = os.path.join(archive_dir, INDEX_FILE)
+    if not os.path.exists(binary_file):
+        return False
+    return not os.path.exists(index_file) or os.stat(binary_file).st_mtime_ns > os.stat(index_file).st_mtime_ns
+
+class BinaryIndexReader:
+    """基于 mmap 的二进制索引只读访问"""
+
+    def __init__(self, archive_dir=PACKED_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.segments = list_segments(archive_dir)
+        self._file = open(os.path.join(archive_dir, BINARY_INDEX_FILE), 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = _BINARY_HEADER.unpack_from(self._mmap, 0)
+        if magic != BINARY_INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的归档二进制索引: {archive_dir}")
+
+    def lookup(self, url_hash):
+        """
+        二分查找文章位置
+
+        Args:
+            url_hash (str): URL哈希
+
+        Returns:
+            tuple: (分段号, 偏移量, 长度)，不存在返回None
+        """
+        key = _binary_key(url_hash)
+        record_size = _BINARY_RECORD.size
+        base = _BINARY_HEADER.size
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = base + middle * record_size
+            current = self._mmap[position:position + 16]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                _, segment, offset, length = _BINARY_RECORD.unpack_from(self._mmap, position)
+                return segment, offset, length
+        return None
+
+    def read(self, url_hash):
+        """按URL哈希读取文章正文，不存在返回None"""
+        location = self.lookup(url_hash)
+        if location is None:
+            return None
+        segment, offset, length = location
+        return read_record(self.archive_dir, segment, offset, length, self.segments[segment])
+
+    def close(self):
+        """关闭映射"""
+        self._mmap.close()
+        self._file.close()
+
+_archives = {}
+
+def _index_signature(archive_dir):
+    """索引文件的修改时间和大小，用于判断缓存的读取器是否过期"""
+    signature = []
+    for name in (INDEX_FILE, BINARY_INDEX_FILE):
+        try:
+            stat = os.stat(os.path.join(archive_dir, name))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def _get_reader(archive_dir):
+    """
+    获取归档读取器：二进制索引是最新的时使用 mmap 读取器，否则加载 index.jsonl
+
+    读取器按归档目录缓存，index.jsonl 或 index.bin 变化（追加文章、重新生成二进制索引）后重新创建
+    """
+    signature = _index_signature(archive_dir)
+    cached = _archives.get(archive_dir)
+    if cached is not None:
+        if cached[0] == signature:
+            return cached[1]
+        cached[1].close()
+
+    if is_binary_index_fresh(archive_dir):
+        reader = BinaryIndexReader(archive_dir)
+    else:
+        reader = PackedArchive(archive_dir)
+    _archives[archive_dir] = (signature, reader)
+    return reader
+
+def read_packed_article(file_path, archive_dir=PACKED_ARCHIVE_DIR):
+    """
+    读取 "packed:<URL哈希>" 指向的文章正文（同一归档目录的读取器只创建一次）
+
+    Args:
+        file_path (str): 状态中的 file_path
+        archive_dir (str): 归档目录
+
+    Returns:
+        str: 文章正文
+    """
+    content = _get_reader(archive_dir).read(file_path[len(PACKED_PATH_PREFIX):])
+    if content is None:
+        raise FileNotFoundError(f"归档中没有该文章: {file_path}")
+    return content
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+原始页面归档（按内容寻址，zstd/gzip压缩）
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+from config import PAGE_ARCHIVE_DIR
+from utils import extract_url_hash
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖，未安装时使用gzip
+    zstandard = None
+
+CODEC_ZSTD = 'zst'
+CODEC_GZIP = 'gz'
+
+def compress_bytes(data, codec):
+    """按指定编码压缩字节串"""
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def decompress_bytes(data, codec):
+    """按指定编码解压字节串"""
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("读取 zstd 归档需要安装 zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def read_archived_page(archive_dir, digest, codec):
+    """
+    读取归档的页面HTML（不依赖 PageArchive 实例，便于在子进程中调用）
+
+    Args:
+        archive_dir (str): 归档目录
+        digest (str): 页面内容的SHA-256
+        codec (str): 压缩编码
+
+    Returns:
+        str: 页面HTML
+    """
+    object_path = os.path.join(archive_dir, 'objects', digest[:2], f"{digest}.html.{codec}")
+    with open(object_path, 'rb') as f:
+        return decompress_bytes(f.read(), codec).decode('utf-8', errors='replace')
+
+class PageArchive:
+    """
+    原始页面归档
+
+    页面按内容的SHA-256存放在 objects/ 下，相同内容只存一份；
+    index.jsonl 追加记录 URL 到内容摘要的映射，同一URL以最后一条记录为准
+    """
+
+    INDEX_FILE = 'index.jsonl'
+
+    def __init__(self, archive_dir=PAGE_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.index_file = os.path.join(archive_dir, self.INDEX_FILE)
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+        os.makedirs(os.path.join(archive_dir, 'objects'), exist_ok=True)
+
+    def _object_path(self, digest, codec):
+        return os.path.join(self.archive_dir, 'objects', digest[:2], f"{digest}.html.{codec}")
+
+    def store(self, url, html):
+        """
+        归档页面HTML
+
+        Args:
+            url (str): 页面URL
+            html (str): 页面HTML
+
+        Returns:
+            str: 页面内容的SHA-256，归档失败返回None
+        """
+        try:
+            data = html.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            object_path = self._object_path(digest, self.codec)
+
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                temp_path = object_path + '.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(compress_bytes(data, self.codec))
+                os.replace(temp_path, object_path)
+
+            record = {
+                'url': url,
+                'url_hash': extract_url_hash(url),
+                'digest': digest,
+                'codec': self.codec,
+                'archived_time': datetime.now().isoformat(),
+            }
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+            return digest
+
+        except Exception as e:
+            logging.warning(f"归档页面失败: {url}, 错误: {e}")
+            return None
+
+    def load_index(self):
+        """
+        读取归档索引
+
+        Returns:
+            dict: {URL哈希: 最新的归档记录}
+        """
+        entries = {}
+        if not os.path.exists(self.index_file):
+            return entries
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 中断时可能留下不完整的最后一行
+                entries[record['url_hash']] = record
+        return entries
+
+    def load(self, digest, codec=None):
+        """读取归档的页面HTML"""
+        return read_archived_page(self.archive_dir, digest, codec or self.codec)
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+文章页面和正文的文本解析（不依赖浏览器，可在离线命令和子进程中使用）
+
+所有正则表达式在模块加载时预编译；页面源码中的发布时间标记通过一次组合扫描查找，
+不再对整个页面依次运行多个正则。
+"""
+
+import re
+import hashlib
+from datetime import datetime
+
+# 微信文章链接中的 sn 参数（文章唯一标识）
+URL_SN_PATTERN = re.compile(r'https?://mp\.weixin\.qq\.com/s\?.*?(sn=[^&#]+)')
+
+# 时间文本格式：2024年1月15日 10:30 / 2024-01-15 10:30 / 时间戳
+CN_DATETIME_PATTERN = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})')
+ISO_DATETIME_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})')
+TIMESTAMP_PATTERN = re.compile(r'^(\d{10,13})$')
+
+# 专辑列表项中只有日期的文本：2024年1月15日 / 2024-01-15 / 2024/01/15
+CN_DATE_PATTERN = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日')
+ISO_DATE_PATTERN = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+
+# 页面源码中的发布时间标记，组合为一个正则一次扫描，按优先级排列：
+# 中文日期时间、数字日期时间、微信页面变量 "ct":"时间戳"。
+# 以单个字符集 [\d"] 开头，re 可以快速跳过不可能匹配的位置（分支开头各不相同的写法
+# 要在每个位置逐个尝试分支，比依次运行多个正则还慢）；年份的第一位由该字符匹配
+PAGE_TIME_PATTERN = re.compile(
+    r'[\d"](?:'
+    r'(?<=")ct":"(\d+)"'                              # 1: 时间戳
+    r'|(?<=\d)(\d{3})(?:'                             # 2: 年份后三位
+    r'年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})'    # 3-6: 中文日期时间
+    r'|-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})))'     # 7-10: 数字日期时间
+)
+PAGE_TIME_PRIORITY = ('cn', 'iso', 'ct')
+
+# 微信页面脚本中的发布时间戳变量，如 var ct = "1700000000"; / create_time: JsDecode('1700000000')
+SCRIPT_TIME_PATTERN = re.compile(r'\b(?:ct|create_time)["\']?\s*[:=]\s*(?:JsDecode\()?["\']?(\d{10,13})\b')
+
+# 发布时间提取策略（按尝试顺序）：页面脚本变量、DOM元素文本、页面源码中的时间文本
+PUBLISH_TIME_STRATEGIES = ('script', 'dom', 'html')
+_publish_time_stats = {strategy: 0 for strategy in PUBLISH_TIME_STRATEGIES + ('miss',)}
+
+# 正文中"收录于"之后为专辑推荐等无关内容
+COLLECTED_MARKER = '收录于'
+
+# 只由数字和标点组成的行（不是标题）
+NUMERIC_LINE_PATTERN = re.compile(r'^[0-9\s,\.，。、]+$')
+TITLE_BRACKET_CHARS = '【】「」《》""'''
+
+def extract_url_hash(url):
+    """从URL提取唯一标识"""
+    if not url:
+        return ""
+
+    # 使用sn参数作为唯一标识，没有sn参数时使用整个URL的MD5哈希
+    match = URL_SN_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return hashlib.md5(url.encode()).hexdigest()[:8]
+
+def _format_datetime(year, month, day, hour, minute):
+    """日期时间各部分（字符串）格式化为标准格式，日期无效返回None"""
+    try:
+        dt = datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+    return dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def _format_timestamp(timestamp_text):
+    """秒或毫秒时间戳格式化为标准格式（本地时间），无效返回None"""
+    if not 10 <= len(timestamp_text) <= 13:
+        return None
+    timestamp = int(timestamp_text)
+    if timestamp > 10**12:  # 毫秒时间戳
+        timestamp = timestamp // 1000
+    try:
+        dt = datetime.fromtimestamp(timestamp)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def parse_wechat_time_text(time_text):
+    """
+    解析微信文章的时间文本为标准格式
+
+    Args:
+        time_text (str): 时间文本
+
+    Returns:
+        str: 标准格式的时间字符串，如 "2024-01-15 10:30:00"
+    """
+    time_text = time_text.strip()
+
+    match = CN_DATETIME_PATTERN.search(time_text)
+    if match:
+        parsed_time = _format_datetime(*match.groups())
+        if parsed_time:
+            return parsed_time
+
+    match = ISO_DATETIME_PATTERN.search(time_text)
+    if match:
+        parsed_time = _format_datetime(*match.groups())
+        if parsed_time:
+            return parsed_time
+
+    match = TIMESTAMP_PATTERN.search(time_text)
+    if match:
+        return _format_timestamp(match.group(1))
+
+    return None
+
+def parse_list_time_text(time_text):
+    """
+    解析专辑列表项中的发布时间文本，除 parse_wechat_time_text 支持的格式外，
+    也接受只有日期的文本（时间记为 00:00:00）
+
+    Args:
+        time_text (str): 时间文本
+
+    Returns:
+        str: 标准格式的时间字符串，无法解析（如"3天前"）返回None
+    """
+    parsed_time = parse_wechat_time_text(time_text)
+    if parsed_time:
+        return parsed_time
+
+    for pattern in (CN_DATE_PATTERN, ISO_DATE_PATTERN):
+        match = pattern.search(time_text)
+        if match:
+            parsed_time = _format_datetime(*match.groups(), 0, 0)
+            if parsed_time:
+                return parsed_time
+    return None
+
+def _parse_page_time_match(match):
+    """返回 (标记类型, 解析后的时间)，时间无效时为None"""
+    groups = match.groups()
+    if groups[0] is not None:
+        return 'ct', _format_timestamp(groups[0])
+    year = match.group()[0] + groups[1]
+    if groups[2] is not None:
+        return 'cn', _format_datetime(year, *groups[2:6])
+    return 'iso', _format_datetime(year, *groups[6:10])
+
+def extract_publish_time_from_html(page_source):
+    """
+    从文章页面源码中查找发布时间
+
+    一次扫描页面，记录每种时间标记第一个能解析的取值；最高优先级的中文日期解析成功时立即返回，
+    否则扫描到页面末尾后按优先级返回
+
+    Args:
+        page_source (str): 页面HTML
+
+    Returns:
+        str: 发布时间字符串，格式如 "2024-01-15 10:30:00" 或 None
+    """
+    if not page_source:
+        return None
+
+    found = {}
+    for match in PAGE_TIME_PATTERN.finditer(page_source):
+        kind, parsed_time = _parse_page_time_match(match)
+        if not parsed_time or kind in found:
+            continue
+        if kind == PAGE_TIME_PRIORITY[0]:
+            return parsed_time
+        found[kind] = parsed_time
+
+    for kind in PAGE_TIME_PRIORITY:
+        if kind in found:
+            return found[kind]
+    return None
+
+def extract_publish_time_from_script(page_source):
+    """
+    从页面脚本变量（ct / create_time）中读取发布时间
+
+    Args:
+        page_source (str): 页面HTML
+
+    Returns:
+        str: 发布时间字符串，格式如 "2024-01-15 10:30:00" 或 None
+    """
+    if not page_source:
+        return None
+    for match in SCRIPT_TIME_PATTERN.finditer(page_source):
+        parsed_time = _format_timestamp(match.group(1))
+        if parsed_time:
+            return parsed_time
+    return None
+
+def record_publish_time_strategy(strategy):
+    """记录一次发布时间提取结果（命中的策略，或 'miss'）"""
+    _publish_time_stats[strategy] += 1
+
+def get_publish_time_stats():
+    """
+    获取发布时间提取统计
+
+    Returns:
+        dict: 各策略命中次数、未提取到的次数、总次数和各策略命中率
+    """
+    stats = dict(_publish_time_stats)
+    total = sum(stats.values())
+    stats['total'] = total
+    stats['hit_rates'] = {strategy: (stats[strategy] / total if total else 0.0)
+                          for strategy in PUBLISH_TIME_STRATEGIES}
+    return stats
+
+def extract_publish_time_from_page(page_source):
+    """
+    从页面HTML中提取发布时间（HTTP模式、离线重新解析使用）：先读脚本变量，再查找时间文本
+
+    Args:
+        page_source (str): 页面HTML
+
+    Returns:
+        str: 发布时间字符串，格式如 "2024-01-15 10:30:00" 或 None
+    """
+    publish_time = extract_publish_time_from_script(page_source)
+    if publish_time:
+        record_publish_time_strategy('script')
+        return publish_time
+
+    publish_time = extract_publish_time_from_html(page_source)
+    record_publish_time_strategy('html' if publish_time else 'miss')
+    return publish_time
+
+def extract_content_from_html(html):
+    """
+    从文章页面HTML中提取正文纯文本（HTTP模式使用）
+
+    Args:
+        html (str): 页面HTML
+
+    Returns:
+        str: 正文纯文本，找不到正文元素时返回整个页面的文本
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style']):
+        element.decompose()
+
+    content_selectors = ['#js_content', '.rich_media_content', '.content', '#content']
+    for selector in content_selectors:
+        content_element = soup.select_one(selector)
+        if content_element:
+            return content_element.get_text('\n', strip=True)
+
+    body = soup.body or soup
+    return body.get_text('\n', strip=True)
+
+def clean_content(content):
+    """
+    清理文章内容，去除从"收录于"开始的部分
+
+    Args:
+        content (str): 原始文章内容
+
+    Returns:
+        str: 清理后的文章内容
+    """
+    if not content:
+        return content
+
+    # 保留"收录于"之前的内容（其前的换行由 rstrip 去掉）
+    position = content.find(COLLECTED_MARKER)
+    if position < 0:
+        return content
+    return content[:position].rstrip()
+
+def extract_real_title_from_content(content):
+    """
+    从文章内容中提取真实标题
+
+    Args:
+        content (str): 文章内容
+
+    Returns:
+        str: 提取的标题，失败返回空字符串
+    """
+    if not content:
+        return ""
+
+    lines = content.split('\n')
+
+    # 策略1: 寻找第一个长度合适的非空行，通常可能是标题
+    for line in lines:
+        line = line.strip()
+        if 5 < len(line) < 100:
+            # 排除明显不是标题的行
+            if not NUMERIC_LINE_PATTERN.match(line) and not line.startswith('http'):
+                return line
+
+    # 策略2: 寻找包含特殊字符的标题行
+    for line in lines[:10]:  # 只检查前10行
+        line = line.strip()
+        if line and any(char in line for char in TITLE_BRACKET_CHARS):
+            return line
+
+    # 策略3: 返回第一个较长的非空行
+    for line in lines[:5]:
+        line = line.strip()
+        if len(line) > 10:
+            return line[:50] + "..." if len(line) > 50 else line
+
+    return ""
@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+"""
+离线批量处理已抓取的文章（多进程，不访问网络）
+"""
+
+import os
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from config import PAGE_ARCHIVE_DIR, PACKED_ARCHIVE_DIR, SEARCH_INDEX_FILE, OUTPUT_LAYOUT
+from utils import (load_json_state, save_json_state, dump_json_state, extract_url_hash,
+                   clean_content, extract_content_from_html, extract_publish_time_from_page,
+                   extract_real_title_from_content, smart_save_article_content,
+                   generate_smart_filename, load_date_counter, save_date_counter,
+                   get_article_path, iter_article_files, write_file_atomic)
+from page_archive import PageArchive, read_archived_page
+from content_index import ContentIndex
+from packed_store import PackedArchive, PACKED_PATH_PREFIX, is_packed_path, build_binary_index
+
+# reprocess 支持的操作
+OP_CLEAN = 'clean'      # 重新清理正文（去掉"收录于"之后的内容）
+OP_TITLE = 'title'      # 从正文重新提取标题
+OP_RENAME = 'rename'    # 按发布时间重新生成文件名
+REPROCESS_OPERATIONS = (OP_CLEAN, OP_TITLE, OP_RENAME)
+
+# 处理多少篇文章输出一次进度
+PROGRESS_LOG_INTERVAL = 1000
+
+def get_chunksize(total, workers):
+    """计算进程池每批任务数：让每个进程分到约4批，兼顾负载均衡和进程间通信开销"""
+    return max(1, min(256, total // (workers * 4)))
+
+def update_state_counts(articles_data):
+    """重新统计各状态的文章数"""
+    articles = articles_data['articles']
+    articles_data['total_articles'] = len(articles)
+    articles_data['processed_count'] = sum(1 for a in articles if a.get('status') == 'completed')
+    articles_data['failed_count'] = sum(1 for a in articles if a.get('status') == 'failed')
+    articles_data['pending_count'] = sum(1 for a in articles if a.get('status') == 'pending')
+
+def _reparse_page(task):
+    """
+    子进程：解析一个归档页面；文章已有保存文件时直接在子进程中写回
+
+    Args:
+        task (tuple): (归档目录, 内容摘要, 压缩编码, 已保存的文件路径或None)
+
+    Returns:
+        tuple: (错误信息, 正文长度, 标题, 发布时间, 正文)，已写回文件时正文为None
+    """
+    archive_dir, digest, codec, file_path = task
+    try:
+        html = read_archived_page(archive_dir, digest, codec)
+        content = clean_content(extract_content_from_html(html))
+        publish_time = extract_publish_time_from_page(html)
+        title = extract_real_title_from_content(content)
+
+        if content and file_path:
+            write_file_atomic(file_path, content.strip())
+            return None, len(content), title, publish_time, None
+
+        return None, len(content or ''), title, publish_time, content
+
+    except Exception as e:
+        return str(e), 0, None, None, None
+
+def reparse_archive(json_file, output_dir, archive_dir=PAGE_ARCHIVE_DIR, workers=None,
+                    packed_dir=PACKED_ARCHIVE_DIR):
+    """
+    从原始页面归档重新生成Markdown文件和状态
+
+    已有保存文件的文章在原路径覆盖写入；保存在打包归档中的文章（"packed:<URL哈希>"）重新追加到打包归档；
+    没有文件的文章（如之前失败的）按正常规则新建文件
+
+    Args:
+        json_file (str): 状态文件
+        output_dir (str): 文章保存目录
+        archive_dir (str): 原始页面归档目录
+        workers (int): 进程数，默认使用全部CPU核心
+        packed_dir (str): 打包归档目录
+
+    Returns:
+        dict: 处理统计，状态文件不存在时返回None
+    """
+    articles_data = load_json_state(json_file)
+    if not articles_data:
+        logging.error(f"无法加载状态文件: {json_file}")
+        return None
+
+    archive_index = PageArchive(archive_dir).load_index()
+
+    tasks = []
+    targets = []
+    for article in articles_data['articles']:
+        record = archive_index.get(extract_url_hash(article.get('url', '')))
+        if not record:
+            continue
+        file_path = article.get('file_path')
+        if file_path and (is_packed_path(file_path) or not os.path.isdir(os.path.dirname(file_path) or '.')):
+            file_path = None  # 正文返回主进程处理
+        tasks.append((archive_dir, record['digest'], record['codec'], file_path))
+        targets.append(article)
+
+    stats = {'total': len(tasks), 'rewritten': 0, 'created': 0, 'empty': 0, 'failed': 0}
+    if not tasks:
+        logging.info("归档中没有可重新解析的文章")
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    logging.info(f"开始重新解析 {len(tasks)} 篇文章（{workers} 个进程）")
+
+    album_title = articles_data.get('album_title')
+    date_counter = load_date_counter(output_dir, album_title) if album_title else {}
+    os.makedirs(output_dir, exist_ok=True)
+    content_index = ContentIndex(output_dir)
+    packed_archive = None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_reparse_page, tasks, chunksize=get_chunksize(len(tasks), workers))
+
+        # 结果按顺序流式返回，由主进程统一更新状态
+        for article, (error, length, title, publish_time, content) in zip(targets, results):
+            if error:
+                stats['failed'] += 1
+                logging.warning(f"重新解析失败: {article.get('url')}, 错误: {error}")
+                continue
+            if not length:
+                stats['empty'] += 1
+                continue
+
+            if title:
+                article['title'] = title
+            if publish_time:
+                article['publish_time'] = publish_time
+
+            if content is not None and is_packed_path(article.get('file_path')):
+                if packed_archive is None:
+                    packed_archive = PackedArchive(packed_dir)
+                record = packed_archive.entries.get(article['file_path'][len(PACKED_PATH_PREFIX):], {})
+                article['file_path'] = packed_archive.append(
+                    article['url'], content, record.get('filename'), record.get('album_title', album_title))
+                stats['rewritten'] += 1
+            elif content is not None:
+                file_path, _ = smart_save_article_content(
+                    article['url'], article['title'], content, output_dir, album_title,
+                    article.get('index', 0), publish_time, date_counter, content_index=content_index
+                )
+                if not file_path:
+                    stats['failed'] += 1
+                    continue
+                article['file_path'] = file_path
+                stats['created'] += 1
+            else:
+                stats['rewritten'] += 1
+
+            article['status'] = 'completed'
+            article['error_message'] = None
+            article['processed_time'] = datetime.now().isoformat()
+
+    if packed_archive is not None:
+        packed_archive.close()
+        build_binary_index(packed_dir)
+
+    update_state_counts(articles_data)
+    save_json_state(articles_data, json_file)
+    if album_title:
+        save_date_counter(output_dir, album_title, date_counter)
+
+    logging.info(f"重新解析完成: {stats}")
+    return stats
+
+def update_path_indexes(json_file, output_dir, path_mapping):
+    """
+    文件移动后同步更新记录了文件路径的各个索引（内容哈希索引、近似重复索引、全文检索索引）
+
+    Args:
+        json_file (str): 状态文件（近似重复索引与其放在一起）
+        output_dir (str): 文章目录
+        path_mapping (dict): {旧路径: 新路径}
+    """
+    from near_duplicate import NearDuplicateIndex, get_index_file
+
+    try:
+        ContentIndex(output_dir).update_paths(path_mapping)
+
+        near_dup_file = get_index_file(json_file)
+        if os.path.exists(near_dup_file):
+            NearDuplicateIndex(near_dup_file).update_paths(path_mapping)
+
+        if os.path.exists(SEARCH_INDEX_FILE):
+            from search_index import SearchIndex
+            search_index = SearchIndex(SEARCH_INDEX_FILE)
+            search_index.update_paths(path_mapping)
+            search_index.close()
+    except Exception as e:
+        logging.warning(f"更新索引中的文件路径失败: {e}")
+
+def _reprocess_file(task):
+    """
+    子进程：重新清理一个已保存的文章文件并提取标题
+
+    Args:
+        task (tuple): (文件路径, 是否重新清理, 是否提取标题)
+
+    Returns:
+        tuple: (错误信息, 文件是否被改写, 提取的标题)
+    """
+    file_path, do_clean, do_title = task
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        changed = False
+        if do_clean:
+            cleaned = clean_content(content).strip()
+            if cleaned and cleaned != content:
+                write_file_atomic(file_path, cleaned)
+                content = cleaned
+                changed = True
+
+        title = extract_real_title_from_content(content) if do_title else None
+        return None, changed, title
+
+    except Exception as e:
+        return str(e), False, None
+
+def _rename_sort_key(article):
+    """重新命名时的处理顺序：按发布时间，同一时间按专辑内序号，保证同日编号稳定"""
+    return article.get('publish_time') or '', article.get('index', 0)
+
+def rename_article_files(articles_data, output_dir, json_file):
+    """
+    按发布时间重新生成文件名（在主进程中执行，保证同日编号连续）
+
+    先把需要改名的文件移到临时名，再移到目标名，避免新旧文件名互相覆盖。
+    目标文件名已被其他文件占用（如状态中未记录的文件、没有发布时间而按抓取日期命名的文章）时顺延编号，
+    不会覆盖已有文件。没有发布时间的文章保留原文件名。
+    同日编号从头重新分配，再合并到已保存的日期计数器（取较大值），未涉及的日期保持不变。
+
+    Args:
+        articles_data (dict): 文章数据
+        output_dir (str): 文章保存目录
+        json_file (str): 状态文件
+
+    Returns:
+        int: 改名的文件数
+    """
+    album_title = articles_data.get('album_title')
+    date_counter = {}
+    moves = []
+    shared = {}  # 多篇文章引用同一文件时（重复内容），只移动一次
+
+    candidates = [a for a in articles_data['articles']
+                  if a.get('status') == 'completed' and a.get('file_path') and a.get('publish_time')]
+
+    # 参与重新命名的文件都会被移走或保留原名，它们的路径不算被占用；已分配的目标路径不能再分配
+    renaming_paths = {os.path.abspath(a['file_path']) for a in candidates if os.path.exists(a['file_path'])}
+    assigned = set()
+
+    def is_occupied(path):
+        path = os.path.abspath(path)
+        return path in assigned or (os.path.exists(path) and path not in renaming_paths)
+
+    for article in sorted(candidates, key=_rename_sort_key):
+        old_path = article['file_path']
+        if old_path in shared:
+            shared[old_path].append(article)
+            continue
+        if not os.path.exists(old_path):
+            continue
+        shared[old_path] = [article]
+        while True:
+            filename, _ = generate_smart_filename(article['url'], article.get('title'), article.get('index', 0),
+                                                  album_title, article['publish_time'], date_counter)
+            new_path = get_article_path(output_dir, filename, album_title)
+            if not is_occupied(new_path):
+                break
+            logging.warning(f"目标文件已被占用，顺延编号: {new_path}")
+        assigned.add(os.path.abspath(new_path))
+        if os.path.abspath(new_path) != os.path.abspath(old_path):
+            moves.append((article, old_path, new_path))
+
+    # 第一步：全部移到临时名
+    staged = []
+    for article, old_path, new_path in moves:
+        temp_path = f"{old_path}.renaming"
+        os.replace(old_path, temp_path)
+        staged.append((article, temp_path, new_path))
+
+    # 第二步：移到目标名
+    for article, temp_path, new_path in staged:
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.replace(temp_path, new_path)
+        for referencing in shared[article['file_path']]:
+            referencing['file_path'] = new_path
+
+    if album_title and candidates:
+        saved_counter = load_date_counter(output_dir, album_title)
+        for publish_date, count in date_counter.items():
+            saved_counter[publish_date] = max(saved_counter.get(publish_date, 0), count)
+        save_date_counter(output_dir, album_title, saved_counter)
+
+    if moves:
+        update_path_indexes(json_file, output_dir, {old_path: new_path for _, old_path, new_path in moves})
+
+    return len(moves)
+
+def reprocess_articles(json_file, output_dir, operations, workers=None):
+    """
+    并行重新处理已保存的文章
+
+    文件读写和解析在进程池中分批执行，结果按顺序流式返回主进程，由主进程统一更新状态；
+    重新命名涉及同日编号，在主进程中顺序执行。状态文件中没有记录的 .md 文件只做重新清理。
+
+    Args:
+        json_file (str): 状态文件
+        output_dir (str): 文章保存目录
+        operations (list): 要执行的操作，REPROCESS_OPERATIONS 的子集
+        workers (int): 进程数，默认使用全部CPU核心
+
+    Returns:
+        dict: 处理统计
+    """
+    operations = set(operations)
+    do_clean = OP_CLEAN in operations
+    do_title = OP_TITLE in operations
+
+    articles_data = load_json_state(json_file)
+    if articles_data is None:
+        logging.warning(f"状态文件不存在或无法加载，只处理目录中的文件: {json_file}")
+        articles_data = {'articles': []}
+
+    # 状态中记录的文件
+    targets = {}
+    for article in articles_data['articles']:
+        file_path = article.get('file_path')
+        if file_path and os.path.exists(file_path):
+            targets[os.path.abspath(file_path)] = article
+
+    # 目录中状态未记录的文件
+    tasks = [(path, do_clean, do_title) for path in targets]
+    if do_clean and os.path.isdir(output_dir):
+        for path in iter_article_files(output_dir):
+            if path not in targets:
+                tasks.append((path, do_clean, False))
+
+    stats = {'total': len(tasks), 'cleaned': 0, 'retitled': 0, 'renamed': 0, 'failed': 0}
+
+    if tasks and (do_clean or do_title):
+        workers = workers or os.cpu_count() or 1
+        logging.info(f"开始重新处理 {len(tasks)} 篇文章（{workers} 个进程，操作: {sorted(operations)}）")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_reprocess_file, tasks, chunksize=get_chunksize(len(tasks), workers))
+
+            for done, (task, (error, changed, title)) in enumerate(zip(tasks, results), 1):
+                if error:
+                    stats['failed'] += 1
+                    logging.warning(f"重新处理失败: {task[0]}, 错误: {error}")
+                    continue
+                if changed:
+                    stats['cleaned'] += 1
+
+                article = targets.get(task[0])
+                if article is not None and title and title != article.get('title'):
+                    article['title'] = title
+                    stats['retitled'] += 1
+
+                if done % PROGRESS_LOG_INTERVAL == 0:
+                    logging.info(f"重新处理进度: {done}/{len(tasks)}")
+
+    if OP_RENAME in operations and articles_data['articles']:
+        stats['renamed'] = rename_article_files(articles_data, output_dir, json_file)
+
+    if articles_data['articles'] and (stats['retitled'] or stats['renamed']):
+        save_json_state(articles_data, json_file)
+
+    logging.info(f"重新处理完成: {stats}")
+    return stats
+
+def _remove_emptied_dirs(file_paths, root):
+    """
+    删除文件移走后变空的目录：从文件所在目录逐级向上，遇到非空目录或到达 root 为止
+
+    Args:
+        file_paths (iterable): 已移走的文件路径
+        root (str): 文章目录（不删除 root 本身及其外的目录）
+    """
+    root = os.path.abspath(root)
+    for dir_path in sorted({os.path.dirname(os.path.abspath(path)) for path in file_paths},
+                           key=len, reverse=True):
+        while dir_path != root and dir_path.startswith(root + os.sep):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                break  # 非空或已删除
+            dir_path = os.path.dirname(dir_path)
+
+def migrate_layout(json_file, output_dir, layout=OUTPUT_LAYOUT):
+    """
+    把已保存的文章移动到新的目录布局，并同步更新状态中的 file_path
+
+    先检查所有目标路径，再逐个移动文件；移动或写入状态失败时把已移动的文件移回原处，
+    状态文件先写临时文件再替换，不会出现文件已移动但状态仍指向旧路径的情况
+
+    Args:
+        json_file (str): 状态文件
+        output_dir (str): 文章目录
+        layout (str): 目标布局，'flat' / 'album_date' / 'hash'
+
+    Returns:
+        dict: {'moved': 移动的文件数, 'missing': 状态中记录但文件不存在的文章数,
+               'packed': 保存在打包归档中的文章数（解包时才应用目录布局，不需要迁移）}，失败返回None
+    """
+    articles_data = load_json_state(json_file)
+    if not articles_data:
+        logging.error(f"无法加载状态文件: {json_file}")
+        return None
+
+    output_dir = os.path.abspath(output_dir)
+    album_title = articles_data.get('album_title')
+    plan = {}
+    missing = 0
+    packed = 0
+    for article in articles_data['articles']:
+        old_path = article.get('file_path')
+        if not old_path or old_path in plan:
+            continue
+        if is_packed_path(old_path):
+            packed += 1
+            continue
+        if not os.path.exists(old_path):
+            missing += 1
+            continue
+        filename = os.path.splitext(os.path.basename(old_path))[0]
+        new_path = get_article_path(output_dir, filename, album_title, layout)
+        if os.path.abspath(new_path) != os.path.abspath(old_path):
+            plan[old_path] = new_path
+
+    # 目标路径已被占用或多个文件移动到同一路径时放弃迁移
+    targets = set()
+    for old_path, new_path in plan.items():
+        if os.path.exists(new_path) or new_path in targets:
+            logging.error(f"迁移目标已存在，放弃迁移: {old_path} -> {new_path}")
+            return None
+        targets.add(new_path)
+
+    if not plan:
+        logging.info(f"文章已经是 {layout} 布局，无需迁移")
+        return {'moved': 0, 'missing': missing, 'packed': packed}
+
+    logging.info(f"开始迁移 {len(plan)} 个文件到 {layout} 布局")
+    moved = []
+    temp_file = json_file + '.tmp'
+    try:
+        for old_path, new_path in plan.items():
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            os.replace(old_path, new_path)
+            moved.append((old_path, new_path))
+
+        updated_articles = [dict(article, file_path=plan.get(article.get('file_path'), article.get('file_path')))
+                            for article in articles_data['articles']]
+        content = dump_json_state(dict(articles_data, articles=updated_articles))
+        with open(temp_file, 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+        os.replace(temp_file, json_file)
+
+    except Exception as e:
+        logging.error(f"迁移失败，正在回滚已移动的 {len(moved)} 个文件: {e}")
+        for old_path, new_path in reversed(moved):
+            try:
+                os.replace(new_path, old_path)
+            except OSError as rollback_error:
+                logging.error(f"回滚失败: {new_path} -> {old_path}, 错误: {rollback_error}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        _remove_emptied_dirs([new_path for _, new_path in moved], output_dir)
+        return None
+
+    update_path_indexes(json_file, output_dir, plan)
+    _remove_emptied_dirs(plan, output_dir)
+
+    logging.info(f"迁移完成: 移动 {len(moved)} 个文件")
+    return {'moved': len(moved), 'missing': missing, 'packed': packed}
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+运行内重试策略：错误分类 + 指数退避
+"""
+
+import random
+
+from config import (IN_RUN_MAX_RETRIES, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+                    RETRY_JITTER)
+
+# 错误类型
+ERROR_TIMEOUT = 'timeout'
+ERROR_EMPTY_CONTENT = 'empty_content'
+ERROR_DRIVER_CRASH = 'driver_crash'
+ERROR_ANTI_BOT = 'anti_bot'
+ERROR_UNKNOWN = 'unknown'
+
+# 浏览器会话失效时常见的错误信息
+DRIVER_CRASH_MESSAGES = [
+    'invalid session id',
+    'chrome not reachable',
+    'session deleted',
+    'no such window',
+    'disconnected',
+    'target window already closed',
+    'connection refused',
+]
+
+class EmptyContentError(Exception):
+    """文章内容为空"""
+
+class AntiBotError(Exception):
+    """页面被重定向或出现验证页面"""
+
+def classify_error(error):
+    """
+    对抓取过程中的异常进行分类
+
+    Args:
+        error (Exception): 捕获到的异常
+
+    Returns:
+        str: 错误类型，ERROR_* 常量之一
+    """
+    from selenium.common.exceptions import TimeoutException, WebDriverException, InvalidSessionIdException
+
+    if isinstance(error, AntiBotError):
+        return ERROR_ANTI_BOT
+    if isinstance(error, EmptyContentError):
+        return ERROR_EMPTY_CONTENT
+    if isinstance(error, InvalidSessionIdException):
+        return ERROR_DRIVER_CRASH
+
+    # HTTP模式下被限流或拒绝访问
+    status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code in (403, 429):
+        return ERROR_ANTI_BOT
+
+    message = str(error).lower()
+    if isinstance(error, WebDriverException) and any(text in message for text in DRIVER_CRASH_MESSAGES):
+        return ERROR_DRIVER_CRASH
+    if isinstance(error, (TimeoutException, TimeoutError)) or 'timed out' in message or 'timeout' in message:
+        return ERROR_TIMEOUT
+
+    return ERROR_UNKNOWN
+
+def backoff_delay(attempt, base, max_delay=RETRY_BACKOFF_MAX, jitter=RETRY_JITTER):
+    """
+    计算指数退避延时（带随机抖动）
+
+    Args:
+        attempt (int): 已失败次数（从0开始）
+        base (float): 退避基数（秒）
+        max_delay (float): 最大延时（秒）
+        jitter (float): 抖动比例
+
+    Returns:
+        float: 延时秒数
+    """
+    delay = min(max_delay, base * (2 ** attempt))
+    return random.uniform(delay * (1 - jitter), delay)
+
+class RetryPolicy:
+    """按错误类型决定是否重试以及退避时长"""
+
+    def __init__(self, max_retries=IN_RUN_MAX_RETRIES, backoff_base=None,
+                 max_delay=RETRY_BACKOFF_MAX, jitter=RETRY_JITTER):
+        self.max_retries = max_retries
+        self.backoff_base = dict(RETRY_BACKOFF_BASE if backoff_base is None else backoff_base)
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def should_retry(self, error_class, attempt):
+        """
+        判断是否应该重试
+
+        Args:
+            error_class (str): 错误类型
+            attempt (int): 本次运行内已失败次数（从0开始）
+
+        Returns:
+            bool: 是否重试
+        """
+        return error_class in self.backoff_base and attempt < self.max_retries
+
+    def get_delay(self, error_class, attempt):
+        """获取该错误类型第 attempt 次重试前的等待时长（秒）"""
+        return backoff_delay(attempt, self.backoff_base.get(error_class, 0),
+                             self.max_delay, self.jitter)
@@ -7,7 +7,11 @@
 
 import os
 import sys
-from crawler import main
+
+def main():
+    """命令行模式：导入抓取器（及 Selenium 等依赖）并运行，--help 和交互提示阶段不加载这些模块"""
+    from crawler import main as crawler_main
+    return crawler_main()
 
 def interactive_mode():
     """交互式模式"""
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+待处理文章优先级调度器
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime
+
+from config import SCHEDULE_PRIORITY
+from utils import parse_wechat_time_text
+
+class ArticleScheduler:
+    """基于堆的待处理文章调度器，按可配置的优先级规则出队"""
+
+    def __init__(self, priority=None, last_run_time=None):
+        """
+        初始化调度器
+
+        Args:
+            priority (list): 优先级规则列表，默认使用 config.SCHEDULE_PRIORITY
+            last_run_time (str): 上次运行完成时间（ISO格式），用于判断新文章
+        """
+        self.priority = list(priority or SCHEDULE_PRIORITY)
+        self.last_run_time = last_run_time
+        self._heap = []
+        self._delayed = []  # (可处理时间, 序号, 文章)，用于退避重试
+        self._counter = itertools.count()  # 保持相同优先级时的原始顺序
+
+        unknown = [key for key in self.priority if key not in self._KEY_FUNCS]
+        if unknown:
+            logging.warning(f"未知的调度优先级规则，已忽略: {unknown}")
+            self.priority = [key for key in self.priority if key in self._KEY_FUNCS]
+
+    def _is_new(self, article):
+        """是否为上次运行之后新发现的文章"""
+        discovered_time = article.get('discovered_time')
+        if not discovered_time:
+            return False
+        if not self.last_run_time:
+            return True
+        return discovered_time > self.last_run_time
+
+    def _new_key(self, article):
+        return 0 if self._is_new(article) else 1
+
+    def _publish_time_key(self, article):
+        # 待处理文章还没有从文章页面提取的发布时间，使用专辑列表项中的发布日期
+        publish_time = article.get('publish_time') or article.get('list_publish_time')
+        parsed_time = parse_wechat_time_text(publish_time) if publish_time else None
+        if not parsed_time:
+            return float('inf')  # 未知发布时间排在最后
+        return -datetime.strptime(parsed_time, '%Y-%m-%d %H:%M:%S').timestamp()
+
+    def _retry_count_key(self, article):
+        return article.get('retry_count', 0) or 0
+
+    _KEY_FUNCS = {
+        'new': _new_key,
+        'publish_time': _publish_time_key,
+        'retry_count': _retry_count_key,
+    }
+
+    def priority_key(self, article):
+        """计算文章的优先级键（越小越优先）"""
+        return tuple(self._KEY_FUNCS[key](self, article) for key in self.priority)
+
+    def push(self, article, delay=0):
+        """
+        加入一篇待处理文章
+
+        Args:
+            article (dict): 文章信息
+            delay (float): 延迟多少秒后才可被取出（用于退避重试）
+        """
+        if delay and delay > 0:
+            heapq.heappush(self._delayed, (time.time() + delay, next(self._counter), article))
+        else:
+            heapq.heappush(self._heap, (self.priority_key(article), next(self._counter), article))
+
+    def extend(self, articles):
+        """批量加入待处理文章"""
+        for article in articles:
+            self.push(article)
+
+    def _release_delayed(self):
+        """将已到期的延迟文章移入可处理队列"""
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, article = heapq.heappop(self._delayed)
+            self.push(article)
+
+    def pop(self):
+        """取出当前优先级最高的可处理文章，暂无可处理文章时返回None"""
+        self._release_delayed()
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[-1]
+
+    def next_ready_in(self):
+        """距离下一篇延迟文章可处理还需等待的秒数"""
+        if self._heap or not self._delayed:
+            return 0
+        return max(0, self._delayed[0][0] - time.time())
+
+    def __len__(self):
+        return len(self._heap) + len(self._delayed)
+
+    def __bool__(self):
+        return bool(self._heap or self._delayed)
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+文章全文检索索引（SQLite FTS5）
+
+FTS5 自带的分词器不能切分中文，写入前先把正文预处理为二元组（相邻两个汉字）：
+"机器学习" -> "机器 器学 学习 习"；英文和数字按单词切分并转为小写。
+每段汉字末尾额外写入最后一个字的单字词，这样单字查询用前缀匹配即可覆盖所有位置。
+查询词只切分为二元组后组成短语查询，保证匹配的是连续文本。
+修改分词方式后需要重新执行 manage.py index 重建已有索引。
+原文单独保存在 documents 表中，结果摘要从原文中截取并高亮。
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+
+from config import SEARCH_INDEX_FILE
+
+_TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+|[0-9A-Za-z]+')
+
+def _is_cjk(run):
+    return run[0] >= '\u3400'
+
+def tokenize_text(text, trailing_unigram=True):
+    """
+    把文本切分为FTS5索引使用的词序列
+
+    Args:
+        text (str): 原文
+        trailing_unigram (bool): 是否在每段汉字末尾追加最后一个字（写入索引时需要，组成查询短语时不需要）
+
+    Returns:
+        str: 以空格分隔的词
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text or ''):
+        run = match.group()
+        if not _is_cjk(run):
+            tokens.append(run.lower())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if trailing_unigram:
+                tokens.append(run[-1])  # 最后一个字不是任何二元组的开头
+    return ' '.join(tokens)
+
+def build_match_query(query):
+    """
+    把用户输入转换为FTS5查询：空格分隔的每个词都必须出现，词内按二元组组成短语
+
+    Args:
+        query (str): 用户输入的查询
+
+    Returns:
+        tuple: (FTS5 MATCH 表达式, 用于高亮的原始词列表)，没有有效的词时表达式为None
+    """
+    clauses = []
+    terms = []
+    for term in query.split():
+        runs = _TOKEN_PATTERN.findall(term)
+        if not runs:
+            continue
+        terms.extend(runs)
+        for run in runs:
+            if _is_cjk(run) and len(run) == 1:
+                clauses.append(f'"{run}"*')  # 单个汉字：匹配以该字开头的二元组或段末的单字
+            else:
+                clauses.append(f'"{tokenize_text(run, trailing_unigram=False)}"')
+    return (' AND '.join(clauses) if clauses else None), terms
+
+def make_snippet(content, terms, width=80, markers=('[', ']')):
+    """
+    从原文中截取包含查询词的片段并高亮
+
+    Args:
+        content (str): 原文
+        terms (list): 查询词
+        width (int): 片段长度（字符）
+        markers (tuple): 高亮的起止标记
+
+    Returns:
+        str: 片段
+    """
+    text = re.sub(r'\s+', ' ', content or '').strip()
+    if not terms:
+        return text[:width]
+
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True)),
+                         re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, first.start() - width // 4) if first else 0
+    end = min(len(text), start + width)
+
+    snippet = pattern.sub(lambda m: f"{markers[0]}{m.group()}{markers[1]}", text[start:end])
+    return ('...' if start > 0 else '') + snippet + ('...' if end < len(text) else '')
+
+class SearchIndex:
+    """全文检索索引，每篇文章以URL为键，重复写入时覆盖"""
+
+    def __init__(self, db_file=SEARCH_INDEX_FILE):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        try:
+            self._create_tables()
+        except sqlite3.Error:
+            self.conn.close()
+            raise
+
+    def _create_tables(self):
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE,
+                source TEXT,
+                album TEXT,
+                title TEXT,
+                publish_time TEXT,
+                file_path TEXT,
+                content TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body);
+        """)
+
+    def _upsert(self, url, title, content, file_path, source, album, publish_time):
+        row = self.conn.execute('SELECT id FROM documents WHERE url = ?', (url,)).fetchone()
+        if row:
+            doc_id = row[0]
+            self.conn.execute(
+                'UPDATE documents SET source=?, album=?, title=?, publish_time=?, file_path=?, content=? '
+                'WHERE id=?', (source, album, title, publish_time, file_path, content, doc_id))
+            self.conn.execute('DELETE FROM documents_fts WHERE rowid = ?', (doc_id,))
+        else:
+            doc_id = self.conn.execute(
+                'INSERT INTO documents (url, source, album, title, publish_time, file_path, content) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, source, album, title, publish_time, file_path, content)).lastrowid
+        self.conn.execute('INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)',
+                          (doc_id, tokenize_text(title), tokenize_text(content)))
+
+    def add(self, url, title, content, file_path=None, source='wechat', album=None, publish_time=None):
+        """
+        写入或更新一篇文章（立即提交，失败只记录警告，不影响抓取）
+
+        Args:
+            url (str): 文章URL
+            title (str): 标题
+            content (str): 正文
+            file_path (str): 保存的文件路径
+            source (str): 来源，'wechat' 或 'toutiao'
+            album (str): 专辑或作者
+            publish_time (str): 发布时间
+        """
+        try:
+            with self.conn:
+                self._upsert(url, title, content, file_path, source, album, publish_time)
+        except sqlite3.Error as e:
+            logging.warning(f"更新全文索引失败: {url}, 错误: {e}")
+
+    def add_many(self, documents):
+        """
+        批量写入文章（单个事务）
+
+        Args:
+            documents (iterable): (url, title, content, file_path, source, album, publish_time) 元组
+
+        Returns:
+            int: 写入的文章数
+        """
+        count = 0
+        with self.conn:
+            for document in documents:
+                self._upsert(*document)
+                count += 1
+        return count
+
+    def update_paths(self, path_mapping):
+        """文件移动后更新索引中的路径 {旧路径: 新路径}"""
+        with self.conn:
+            self.conn.executemany('UPDATE documents SET file_path = ? WHERE file_path = ?',
+                                  [(new, old) for old, new in path_mapping.items()])
+
+    def count(self):
+        """已索引的文章数"""
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def search(self, query, limit=20, album=None, markers=('[', ']')):
+        """
+        检索文章，按BM25相关度排序（标题权重高于正文）
+
+        Args:
+            query (str): 查询，空格分隔的多个词需同时出现
+            limit (int): 最多返回条数
+            album (str): 只检索该专辑/作者
+            markers (tuple): 摘要中高亮的起止标记
+
+        Returns:
+            tuple: (结果列表, 耗时毫秒)
+        """
+        start_time = time.perf_counter()
+        match_query, terms = build_match_query(query)
+        if not match_query:
+            return [], 0.0
+
+        sql = ('SELECT d.url, d.title, d.album, d.publish_time, d.file_path, d.content, '
+               'bm25(documents_fts, 5.0, 1.0) AS score '
+               'FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid '
+               'WHERE documents_fts MATCH ?')
+        params = [match_query]
+        if album:
+            sql += ' AND d.album = ?'
+            params.append(album)
+        sql += ' ORDER BY score LIMIT ?'
+        params.append(limit)
+
+        results = []
+        for url, title, album_name, publish_time, file_path, content, score in self.conn.execute(sql, params):
+            results.append({
+                'url': url,
+                'title': title,
+                'album': album_name,
+                'publish_time': publish_time,
+                'file_path': file_path,
+                'score': -score,
+                'snippet': make_snippet(content, terms, markers=markers),
+            })
+        return results, (time.perf_counter() - start_time) * 1000
+
+    def close(self):
+        """关闭数据库连接"""
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+def open_search_index(db_file=SEARCH_INDEX_FILE):
+    """
+    抓取时打开全文检索索引，失败（如SQLite未编译FTS5、数据库被锁定）只记录警告，不影响抓取
+
+    Args:
+        db_file (str): 索引文件
+
+    Returns:
+        SearchIndex: 索引对象，打开失败时为None
+    """
+    try:
+        return SearchIndex(db_file)
+    except sqlite3.Error as e:
+        logging.warning(f"打开全文检索索引失败，本次抓取不更新索引: {db_file}, 错误: {e}")
+        return None
+
+def iter_state_documents(json_file, source):
+    """
+    从状态文件中读取已完成文章，生成 add_many 使用的元组（用于为已有语料建立索引）
+
+    Args:
+        json_file (str): 状态文件
+        source (str): 来源
+
+    Yields:
+        tuple: (url, title, content, file_path, source, album, publish_time)
+    """
+    from utils import read_article_content
+    from state_stream import iter_state_articles
+
+    header = {}
+    for article in iter_state_articles(json_file, header):
+        file_path = article.get('file_path')
+        if article.get('status') != 'completed' or not file_path:
+            continue
+        try:
+            content = read_article_content(file_path)
+        except OSError:
+            continue  # 文件已被删除
+        yield (article['url'], article.get('title'), content, file_path, source,
+               header.get('album_title') or header.get('user_url'),
+               article.get('publish_time'))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+状态文件的编码格式
+
+除原有的缩进排版JSON外，支持两种紧凑的快照格式，文件以固定的头部开始：
+    b'WXSTATE' + 版本号(1字节) + 编码(1字节) + 数据
+编码 1 为 gzip 压缩的紧凑JSON，编码 2 为 MessagePack。没有头部的文件按原有JSON读取，
+所以修改 STATE_FORMAT 后旧状态文件仍可直接读取，下次保存时转换为新格式。
+"""
+
+import gzip
+import json
+import logging
+
+from config import STATE_FORMAT
+from article_record import json_default
+
+FORMAT_JSON = 'json'
+FORMAT_JSON_GZ = 'json.gz'
+FORMAT_MSGPACK = 'msgpack'
+
+STATE_MAGIC = b'WXSTATE'
+STATE_FORMAT_VERSION = 1
+HEADER_SIZE = len(STATE_MAGIC) + 2
+
+_CODEC_IDS = {FORMAT_JSON_GZ: 1, FORMAT_MSGPACK: 2}
+_CODEC_NAMES = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+
+class StateFormatError(RuntimeError):
+    """状态文件无法解码（版本过新、缺少依赖等），不能当作状态文件不存在处理"""
+
+def _import_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+def detect_state_format(header):
+    """
+    根据文件开头的字节识别格式
+
+    Args:
+        header (bytes): 文件开头（至少 HEADER_SIZE 字节，文件较短时为全部内容）
+
+    Returns:
+        str: 'json' / 'json.gz' / 'msgpack'
+    """
+    if not header.startswith(STATE_MAGIC):
+        return FORMAT_JSON
+    if len(header) < HEADER_SIZE:
+        raise StateFormatError("状态文件头部不完整")
+    version = header[len(STATE_MAGIC)]
+    if version > STATE_FORMAT_VERSION:
+        raise StateFormatError(f"状态文件版本 {version} 高于当前支持的版本 {STATE_FORMAT_VERSION}，请升级程序")
+    codec_id = header[len(STATE_MAGIC) + 1]
+    if codec_id not in _CODEC_NAMES:
+        raise StateFormatError(f"未知的状态文件编码: {codec_id}")
+    return _CODEC_NAMES[codec_id]
+
+def detect_state_file_format(json_file):
+    """识别状态文件的格式"""
+    with open(json_file, 'rb') as f:
+        return detect_state_format(f.read(HEADER_SIZE))
+
+def encode_state(data, state_format=STATE_FORMAT):
+    """
+    把状态编码为文件内容
+
+    Args:
+        data (dict): 状态数据（文章可以是 ArticleRecord）
+        state_format (str): 'json' / 'json.gz' / 'msgpack'
+
+    Returns:
+        str or bytes: JSON格式返回文本，其余格式返回带头部的字节
+    """
+    if state_format == FORMAT_MSGPACK:
+        msgpack = _import_msgpack()
+        if msgpack is None:
+            logging.warning("未安装 msgpack，状态文件改用 json.gz 格式保存")
+            state_format = FORMAT_JSON_GZ
+        else:
+            payload = msgpack.packb(data, default=json_default, use_bin_type=True)
+            return STATE_MAGIC + bytes([STATE_FORMAT_VERSION, _CODEC_IDS[FORMAT_MSGPACK]]) + payload
+
+    if state_format == FORMAT_JSON_GZ:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default)
+        payload = gzip.compress(text.encode('utf-8'), compresslevel=6)
+        return STATE_MAGIC + bytes([STATE_FORMAT_VERSION, _CODEC_IDS[FORMAT_JSON_GZ]]) + payload
+
+    return json.dumps(data, ensure_ascii=False, indent=2, default=json_default)
+
+def decode_state(raw):
+    """
+    解码状态文件内容（自动识别格式）
+
+    Args:
+        raw (bytes): 文件的全部内容
+
+    Returns:
+        dict: 状态数据（文章为普通 dict）
+    """
+    state_format = detect_state_format(raw[:HEADER_SIZE])
+    if state_format == FORMAT_JSON:
+        return json.loads(raw.decode('utf-8'))
+
+    payload = raw[HEADER_SIZE:]
+    if state_format == FORMAT_JSON_GZ:
+        return json.loads(gzip.decompress(payload).decode('utf-8'))
+
+    msgpack = _import_msgpack()
+    if msgpack is None:
+        raise StateFormatError("状态文件为 msgpack 格式，读取需要安装 msgpack: pip install msgpack")
+    return msgpack.unpackb(payload, raw=False)
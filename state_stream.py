@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+流式读取状态文件
+
+只读的离线命令（导出、建立检索索引、状态统计等）不需要把整个状态文件解析为一个大字典，
+这里逐篇读取 articles 数组中的文章：安装了 ijson 时使用 ijson，否则使用按块读取的
+json.JSONDecoder.raw_decode 扫描器。两种方式的内存占用都只与单篇文章的大小有关。
+json.gz / msgpack 格式的快照不支持流式读取，整体解码后再逐篇返回。
+"""
+
+import os
+import json
+import logging
+
+from utils import extract_url_hash
+from state_format import FORMAT_JSON, detect_state_file_format, decode_state
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+class _ChunkedDecoder:
+    """按块读取文本并用 raw_decode 逐个解析 JSON 值，已解析的部分会从缓冲区丢弃"""
+
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """读取下一块，返回是否读到了新数据"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个非空白字符（到达文件末尾返回空字符串）"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"状态文件格式错误: 位置 {self.pos} 处应为 {char!r}")
+        self.pos += 1
+
+    def decode(self):
+        """解析下一个完整的 JSON 值；值跨越块边界时继续读取"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 数字可能正好在块边界被截断，确认后面还有分隔符
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def _iter_articles_raw_decode(f, header):
+    decoder = _ChunkedDecoder(f)
+    decoder.expect('{')
+    if decoder.peek() == '}':
+        return
+    while True:
+        key = decoder.decode()
+        decoder.expect(':')
+        if key == 'articles' and decoder.peek() == '[':
+            decoder.expect('[')
+            if decoder.peek() == ']':
+                decoder.pos += 1
+            else:
+                while True:
+                    yield decoder.decode()
+                    if decoder.peek() == ']':
+                        decoder.pos += 1
+                        break
+                    decoder.expect(',')
+        else:
+            header[key] = decoder.decode()
+        if decoder.peek() == '}':
+            return
+        decoder.expect(',')
+
+def _iter_articles_ijson(ijson, f, header):
+    # 顶层字段是标量，直接记录；articles 数组中的每个元素用 ObjectBuilder 组装后交出
+    builder = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if prefix == 'articles.item' and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == 'articles.item' and event == 'end_map':
+                yield builder.value
+                builder = None
+        elif event in ('string', 'number', 'boolean', 'null') and '.' not in prefix and prefix:
+            header[prefix] = value
+
+def iter_state_articles(json_file, header=None, use_ijson=True):
+    """
+    逐篇读取状态文件中的文章
+
+    Args:
+        json_file (str): 状态文件
+        header (dict): 传入时填入顶层字段（album_title 等）；位于 articles 之前的字段
+            在读取第一篇文章时已经可用，全部字段在遍历结束后可用
+        use_ijson (bool): 安装了 ijson 时是否使用；raw_decode 扫描器每篇文章由C实现的解码器整体解析，
+            速度约为 ijson 的两倍，并且完整保留对象/数组类型的顶层字段（ijson 方式只记录标量字段）
+
+    Yields:
+        dict: 文章
+    """
+    if header is None:
+        header = {}
+    if not os.path.exists(json_file):
+        return
+
+    if detect_state_file_format(json_file) != FORMAT_JSON:
+        with open(json_file, 'rb') as f:
+            data = decode_state(f.read())
+        header.update((key, value) for key, value in data.items() if key != 'articles')
+        yield from data.get('articles', [])
+        return
+
+    ijson = None
+    if use_ijson:
+        try:
+            import ijson
+        except ImportError:
+            pass
+
+    if ijson is not None:
+        with open(json_file, 'rb') as f:
+            yield from _iter_articles_ijson(ijson, f, header)
+    else:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            yield from _iter_articles_raw_decode(f, header)
+
+class StateSummary:
+    """
+    状态文件摘要：URL哈希集合、待处理队列和各状态计数，不保留完整的文章
+    """
+
+    def __init__(self):
+        self.header = {}
+        self.url_hashes = set()
+        self.pending = []  # [(序号, URL)]
+        self.status_counts = {}
+        self.max_index = 0
+        self.total = 0
+
+    def add(self, index, url, status):
+        self.total += 1
+        if url:
+            self.url_hashes.add(extract_url_hash(url))
+        if status == 'pending':
+            self.pending.append((index, url))
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if isinstance(index, int) and index > self.max_index:
+            self.max_index = index
+
+def _scan_state_ijson(ijson, f, summary):
+    # 只关心 index/url/status 三个字段，其余字段（预览、错误信息等）不会被组装
+    index = url = status = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if prefix == 'articles.item':
+            if event == 'start_map':
+                index = url = status = None
+            elif event == 'end_map':
+                summary.add(index, url, status)
+        elif prefix == 'articles.item.index':
+            index = value
+        elif prefix == 'articles.item.url':
+            url = value
+        elif prefix == 'articles.item.status':
+            status = value
+        elif event in ('string', 'number', 'boolean', 'null') and '.' not in prefix and prefix:
+            summary.header[prefix] = value
+
+def scan_state(json_file):
+    """
+    流式扫描状态文件，生成摘要
+
+    Args:
+        json_file (str): 状态文件
+
+    Returns:
+        StateSummary: 摘要，文件不存在时各项为空
+    """
+    summary = StateSummary()
+    if not os.path.exists(json_file):
+        return summary
+
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    try:
+        if ijson is not None and detect_state_file_format(json_file) == FORMAT_JSON:
+            with open(json_file, 'rb') as f:
+                _scan_state_ijson(ijson, f, summary)
+        else:
+            for article in iter_state_articles(json_file, summary.header):
+                summary.add(article.get('index'), article.get('url'), article.get('status'))
+    except Exception as e:
+        logging.error(f"扫描状态文件失败: {json_file}, 错误: {e}")
+    return summary
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+
+HOST = 'mp.weixin.qq.com'
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'time', lambda: now[0])
+    return now
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(thresholds={'anti_bot': 2, 'timeout': 3}, cooldown=60, event_file=None)
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure(HOST, 'anti_bot')
+    assert breaker.get_state(HOST) == STATE_CLOSED
+    breaker.record_failure(HOST, 'anti_bot')
+    assert breaker.get_state(HOST) == STATE_OPEN
+    assert breaker.before_request(HOST) == 60
+    assert breaker.before_request('other.host') == 0
+
+def test_success_or_other_error_resets_the_count(breaker):
+    breaker.record_failure(HOST, 'anti_bot')
+    breaker.record_success(HOST)
+    breaker.record_failure(HOST, 'anti_bot')
+    assert breaker.get_state(HOST) == STATE_CLOSED
+
+    breaker.record_failure(HOST, 'timeout')
+    breaker.record_failure(HOST, 'anti_bot')
+    assert breaker.get_state(HOST) == STATE_CLOSED
+
+def test_unlisted_errors_never_open(breaker):
+    for _ in range(10):
+        breaker.record_failure(HOST, 'unknown')
+    assert breaker.get_state(HOST) == STATE_CLOSED
+
+def test_half_open_probe_success_closes(breaker, clock):
+    breaker.record_failure(HOST, 'anti_bot')
+    breaker.record_failure(HOST, 'anti_bot')
+    clock[0] += 60
+    assert breaker.before_request(HOST) == 0
+    assert breaker.get_state(HOST) == STATE_HALF_OPEN
+    assert breaker.before_request(HOST) == 60  # 探测请求返回前不再放行
+    breaker.record_success(HOST)
+    assert breaker.get_state(HOST) == STATE_CLOSED
+    assert [event['event'] for event in breaker.events] == ['open', 'half_open', 'close']
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    breaker.record_failure(HOST, 'anti_bot')
+    breaker.record_failure(HOST, 'anti_bot')
+    clock[0] += 60
+    breaker.before_request(HOST)
+    breaker.record_failure(HOST, 'timeout')
+    assert breaker.get_state(HOST) == STATE_OPEN
+    assert breaker.before_request(HOST) == 60
+
+def test_half_open_unrelated_failure_allows_new_probe(breaker, clock):
+    breaker.record_failure(HOST, 'anti_bot')
+    breaker.record_failure(HOST, 'anti_bot')
+    clock[0] += 60
+    breaker.before_request(HOST)
+    breaker.record_failure(HOST, 'driver_crash')
+    assert breaker.before_request(HOST) == 0
+    assert breaker.get_state(HOST) == STATE_HALF_OPEN
+
+def test_events_are_written_to_file(clock, tmp_path):
+    event_file = tmp_path / 'events' / 'circuit_breaker.jsonl'
+    breaker = CircuitBreaker(thresholds={'anti_bot': 1}, cooldown=60, event_file=str(event_file))
+    breaker.record_failure(HOST, 'anti_bot')
+    records = [json.loads(line) for line in event_file.read_text(encoding='utf-8').splitlines()]
+    assert [(record['host'], record['event'], record['error_class']) for record in records] == \
+        [(HOST, 'open', 'anti_bot')]
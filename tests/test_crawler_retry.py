@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from crawler import WeChatAlbumCrawler
+from retry_policy import RetryPolicy, ERROR_TIMEOUT
+from scheduler import ArticleScheduler
+
+def make_crawler(articles):
+    crawler = WeChatAlbumCrawler.__new__(WeChatAlbumCrawler)  # 不创建浏览器驱动
+    crawler.retry_policy = RetryPolicy(max_retries=1, backoff_base={ERROR_TIMEOUT: 1}, jitter=0)
+    crawler.articles_data = {'articles': articles, 'processed_count': 0, 'failed_count': 1, 'pending_count': 0}
+    return crawler
+
+def test_schedule_retry_requeues_as_pending_without_stale_error():
+    article = {'index': 1, 'url': 'https://mp.weixin.qq.com/s/abc', 'status': 'failed',
+               'error_message': '处理失败: timeout', 'error_class': ERROR_TIMEOUT, 'retry_count': 0}
+    crawler = make_crawler([article])
+    scheduler = ArticleScheduler(['retry_count'])
+    attempts = {}
+
+    assert crawler._schedule_retry(scheduler, article, attempts)
+    assert article['status'] == 'pending'
+    assert article['error_message'] is None
+    assert article['error_class'] is None
+    assert article['retry_count'] == 1
+    assert (crawler.articles_data['failed_count'], crawler.articles_data['pending_count']) == (0, 1)
+    assert len(scheduler) == 1
+
+    # 达到本次运行的重试上限后不再入队
+    article.update(status='failed', error_class=ERROR_TIMEOUT)
+    assert not crawler._schedule_retry(scheduler, article, attempts)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import driver_manager
+from driver_manager import DriverManager
+
+MB = 1024 * 1024
+
+class FakeProcess:
+    def __init__(self, rss, children=(), gone=False):
+        self.rss = rss
+        self._children = list(children)
+        self.gone = gone
+
+    def children(self, recursive=False):
+        return self._children
+
+    def memory_info(self):
+        if self.gone:
+            raise FakePsutil.Error()
+        return SimpleNamespace(rss=self.rss)
+
+class FakePsutil:
+    class Error(Exception):
+        pass
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    def Process(self, pid):
+        if pid not in self.processes:
+            raise self.Error()
+        return self.processes[pid]
+
+def make_manager(pid=100):
+    manager = DriverManager(memory_limit_mb=1000, memory_check_interval=1)
+    manager.driver = SimpleNamespace(service=SimpleNamespace(process=SimpleNamespace(pid=pid)),
+                                     window_handles=[])
+    return manager
+
+def test_memory_sums_driver_process_tree(monkeypatch):
+    tree = FakeProcess(10 * MB, children=[FakeProcess(600 * MB), FakeProcess(500 * MB),
+                                          FakeProcess(MB, gone=True)])
+    monkeypatch.setattr(driver_manager, '_import_psutil', lambda: FakePsutil({100: tree}))
+    assert make_manager().get_memory_mb() == 1110
+
+def test_memory_unavailable_without_psutil_or_process(monkeypatch):
+    monkeypatch.setattr(driver_manager, '_import_psutil', lambda: None)
+    assert make_manager().get_memory_mb() is None
+
+    monkeypatch.setattr(driver_manager, '_import_psutil', lambda: FakePsutil({}))
+    assert make_manager().get_memory_mb() is None
+
+def test_ensure_healthy_recycles_when_over_limit(monkeypatch):
+    monkeypatch.setattr(driver_manager, '_import_psutil',
+                        lambda: FakePsutil({100: FakeProcess(1500 * MB)}))
+    manager = make_manager()
+    manager.record_navigation()
+    recreated = []
+    monkeypatch.setattr(manager, 'recreate', lambda reason: recreated.append(reason))
+    manager.ensure_healthy()
+    assert recreated and '1500MB' in recreated[0]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+pytest.importorskip('requests')
+
+from http_fetcher import detect_encoding
+
+PAGE = '<html><head><meta charset="gbk"><title>标题</title></head></html>'.encode('gbk')
+
+@pytest.mark.parametrize('content_type, body, expected', [
+    ('text/html; charset=GB2312', PAGE, 'gb2312'),
+    ('text/html', PAGE, 'gbk'),
+    (None, b'<meta http-equiv="Content-Type" content="text/html; charset=Big5">', 'big5'),
+    ('text/html', '<html>中文正文</html>'.encode('utf-8'), 'utf-8'),
+    ('text/html; charset=bogus', '<html>中文</html>'.encode('utf-8'), 'utf-8'),
+])
+def test_detect_encoding(content_type, body, expected):
+    assert detect_encoding(content_type, body) == expected
+
+def test_undeclared_charset_is_not_decoded_as_latin1():
+    body = '<html>中文正文</html>'.encode('utf-8')
+    assert body.decode(detect_encoding('text/html', body)) == '<html>中文正文</html>'
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import json
+
+from article_record import ArticleRecord
+from utils import load_json_state
+
+def test_load_json_state_streams_articles_into_records(tmp_path):
+    state_file = tmp_path / 'state.json'
+    state = {
+        'album_title': '专辑',
+        'articles': [
+            {'index': 1, 'url': 'https://example.com/a', 'status': 'completed'},
+            {'index': 2, 'url': 'https://example.com/b', 'status': 'pending', 'title': '标题'},
+        ],
+        'selector_stats': {'article_list': 3},
+    }
+    state_file.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+
+    data = load_json_state(str(state_file))
+    assert all(isinstance(article, ArticleRecord) for article in data['articles'])
+    assert [article.to_dict() for article in data['articles']] == state['articles']
+    assert data['album_title'] == '专辑'
+    assert data['selector_stats'] == {'article_list': 3}
+
+def test_load_json_state_rejects_truncated_file(tmp_path):
+    state_file = tmp_path / 'state.json'
+    state_file.write_text('{"album_title": "专辑", "articles": [{"index": 1', encoding='utf-8')
+    assert load_json_state(str(state_file)) is None
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import random
+
+from near_duplicate import (NearDuplicateIndex, compute_simhash, hamming_distance, split_bands,
+                            cluster_near_duplicates)
+
+def make_text(seed, length=600):
+    rng = random.Random(seed)
+    return ''.join(chr(rng.randint(0x4e00, 0x9fff)) for _ in range(length))
+
+def edit(text, position, replacement='改'):
+    return text[:position] + replacement + text[position + 1:]
+
+BASE = make_text(1)
+REPOST = edit(BASE, 300)  # 转载时改动了一个字
+OTHER = make_text(2)
+
+def test_simhash_ignores_short_text_and_punctuation():
+    assert compute_simhash('太短了') is None
+    assert compute_simhash(BASE) == compute_simhash('，'.join(BASE[i:i + 20] for i in range(0, len(BASE), 20)))
+
+def test_simhash_distance_reflects_similarity():
+    assert hamming_distance(compute_simhash(BASE), compute_simhash(REPOST)) <= 3
+    assert hamming_distance(compute_simhash(BASE), compute_simhash(OTHER)) > 10
+
+def test_split_bands_covers_all_bits():
+    fingerprint = compute_simhash(BASE)
+    bands = split_bands(fingerprint, 4)
+    assert [band for band, _ in bands] == [0, 1, 2, 3]
+    assert sum(value << (band * 16) for band, value in bands) == fingerprint
+
+def test_index_finds_near_duplicates_and_persists(tmp_path):
+    index_file = str(tmp_path / 'state_simhash.jsonl')
+    index = NearDuplicateIndex(index_file, max_distance=3)
+    index.add(compute_simhash(BASE), 'https://example.com/base', 'articles/base.md')
+    index.add(compute_simhash(OTHER), 'https://example.com/other', 'articles/other.md')
+
+    reloaded = NearDuplicateIndex(index_file, max_distance=3)
+    distance, url, file_path = reloaded.find(compute_simhash(REPOST))
+    assert distance <= 3
+    assert (url, file_path) == ('https://example.com/base', 'articles/base.md')
+    assert reloaded.find(compute_simhash(BASE), exclude_url='https://example.com/base') is None
+    assert reloaded.find(compute_simhash(make_text(3))) is None
+
+def test_cluster_near_duplicates(tmp_path):
+    texts = {'base.md': BASE, 'repost.md': REPOST, 'repost2.md': edit(BASE, 100, '再'),
+             'other.md': OTHER, 'short.md': '太短了'}
+    paths = []
+    for name, text in texts.items():
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        paths.append(str(path))
+
+    clusters, fingerprints = cluster_near_duplicates(paths, max_distance=3, workers=1)
+    assert clusters == [sorted(str(tmp_path / name) for name in ('base.md', 'repost.md', 'repost2.md'))]
+    assert str(tmp_path / 'short.md') not in fingerprints
+    assert len(fingerprints) == 4
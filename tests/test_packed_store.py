@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from packed_store import (PackedArchive, BinaryIndexReader, build_binary_index, is_binary_index_fresh,
+                          read_packed_article)
+from utils import extract_url_hash
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    return str(tmp_path / 'packed')
+
+def test_extract_does_not_overwrite_existing_files(archive_dir, tmp_path):
+    archive = PackedArchive(archive_dir)
+    archive.append('https://example.com/a', '第一篇', filename='专辑_20240101', album_title='专辑')
+    archive.append('https://example.com/b', '第二篇', filename='专辑_20240101', album_title='专辑')
+    archive.close()
+
+    output_dir = str(tmp_path / 'articles')
+    extracted = PackedArchive(archive_dir).extract(output_dir, 'flat')
+    assert sorted(os.path.basename(path) for path in extracted.values()) == \
+        ['专辑_20240101.md', '专辑_20240101_02.md']
+
+    # 再次解包时内容相同的文件直接跳过，不产生新文件
+    assert PackedArchive(archive_dir).extract(output_dir, 'flat') == extracted
+    assert len(os.listdir(output_dir)) == 2
+
+def test_reader_cache_sees_new_articles(archive_dir):
+    archive = PackedArchive(archive_dir)
+    first = archive.append('https://example.com/a', '第一篇', filename='a')
+    archive.close()
+    build_binary_index(archive_dir)
+    assert read_packed_article(first, archive_dir) == '第一篇'
+
+    archive = PackedArchive(archive_dir)
+    second = archive.append('https://example.com/b', '第二篇', filename='b')
+    archive.close()
+    assert read_packed_article(second, archive_dir) == '第二篇'
+
+    build_binary_index(archive_dir)
+    assert read_packed_article(first, archive_dir) == '第一篇'
+    assert read_packed_article(second, archive_dir) == '第二篇'
+
+def test_binary_index_lookup_matches_jsonl_index(archive_dir):
+    archive = PackedArchive(archive_dir, segment_max_bytes=200)  # 很小的分段，让文章分布在多个分段中
+    urls = [f'https://example.com/{i}' for i in range(50)]
+    for i, url in enumerate(urls):
+        archive.append(url, f'第{i}篇文章' * 5, filename=str(i))
+    archive.append(urls[0], '第0篇文章（更新）', filename='0')  # 同一URL以最后一条记录为准
+    archive.close()
+
+    assert not is_binary_index_fresh(archive_dir)
+    assert build_binary_index(archive_dir) == 50
+    assert is_binary_index_fresh(archive_dir)
+
+    entries = PackedArchive(archive_dir).entries
+    reader = BinaryIndexReader(archive_dir)
+    try:
+        assert reader.count == 50
+        assert len(reader.segments) > 1
+        for url_hash, record in entries.items():
+            assert reader.lookup(url_hash) == (record['segment'], record['offset'], record['length'])
+        assert reader.read(extract_url_hash(urls[0])) == '第0篇文章（更新）'
+        assert reader.read(extract_url_hash(urls[49])) == '第49篇文章' * 5
+        assert reader.lookup('missing') is None
+    finally:
+        reader.close()
+
+def test_binary_index_rejects_bad_magic(archive_dir):
+    os.makedirs(archive_dir)
+    with open(os.path.join(archive_dir, 'index.bin'), 'wb') as f:
+        f.write(b'NOTANIDX' + bytes(4))
+    with pytest.raises(ValueError):
+        BinaryIndexReader(archive_dir)
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import os
+
+from reprocess import migrate_layout
+from utils import load_json_state, save_json_state
+
+def test_migrate_layout_uses_absolute_paths_and_keeps_unrelated_dirs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('articles/old')
+    os.makedirs('articles/keep_me')
+    with open('articles/old/专辑_20240115.md', 'w', encoding='utf-8') as f:
+        f.write('正文')
+    save_json_state({'album_title': '专辑', 'articles': [
+        {'url': 'https://example.com/a', 'status': 'completed', 'file_path': 'articles/old/专辑_20240115.md'},
+    ]}, 'state.json')
+
+    result = migrate_layout('state.json', 'articles', 'album_date')
+
+    expected = str(tmp_path / 'articles' / '专辑' / '2024' / '01' / '专辑_20240115.md')
+    assert result == {'moved': 1, 'missing': 0, 'packed': 0}
+    assert load_json_state('state.json')['articles'][0]['file_path'] == expected
+    assert os.path.exists(expected)
+    assert not os.path.exists('articles/old')
+    assert os.path.isdir('articles/keep_me')
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from retry_policy import (RetryPolicy, backoff_delay, classify_error, AntiBotError, EmptyContentError,
+                          ERROR_TIMEOUT, ERROR_EMPTY_CONTENT, ERROR_DRIVER_CRASH, ERROR_ANTI_BOT,
+                          ERROR_UNKNOWN)
+
+exceptions = pytest.importorskip('selenium.common.exceptions')
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+@pytest.mark.parametrize('error, expected', [
+    (AntiBotError('验证页面'), ERROR_ANTI_BOT),
+    (EmptyContentError('空'), ERROR_EMPTY_CONTENT),
+    (HttpError(429), ERROR_ANTI_BOT),
+    (HttpError(403), ERROR_ANTI_BOT),
+    (exceptions.InvalidSessionIdException('x'), ERROR_DRIVER_CRASH),
+    (exceptions.WebDriverException('chrome not reachable'), ERROR_DRIVER_CRASH),
+    (exceptions.TimeoutException('x'), ERROR_TIMEOUT),
+    (TimeoutError(), ERROR_TIMEOUT),
+    (RuntimeError('Read timed out'), ERROR_TIMEOUT),
+    (HttpError(500), ERROR_UNKNOWN),
+    (ValueError('boom'), ERROR_UNKNOWN),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+def test_backoff_delay_grows_exponentially_and_is_capped():
+    assert backoff_delay(0, 5, max_delay=100, jitter=0) == 5
+    assert backoff_delay(3, 5, max_delay=100, jitter=0) == 40
+    assert backoff_delay(10, 5, max_delay=100, jitter=0) == 100
+
+def test_backoff_delay_jitter_stays_in_range():
+    for _ in range(100):
+        assert 20 <= backoff_delay(2, 10, max_delay=100, jitter=0.5) <= 40
+
+def test_retry_policy_retries_listed_errors_until_limit():
+    policy = RetryPolicy(max_retries=2, backoff_base={ERROR_TIMEOUT: 10}, max_delay=60, jitter=0)
+    assert policy.should_retry(ERROR_TIMEOUT, 0)
+    assert policy.should_retry(ERROR_TIMEOUT, 1)
+    assert not policy.should_retry(ERROR_TIMEOUT, 2)
+    assert not policy.should_retry(ERROR_UNKNOWN, 0)
+    assert policy.get_delay(ERROR_TIMEOUT, 1) == 20
+    assert policy.get_delay(ERROR_TIMEOUT, 5) == 60
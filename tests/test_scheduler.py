@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import scheduler
+from scheduler import ArticleScheduler
+
+def drain(article_scheduler):
+    urls = []
+    article = article_scheduler.pop()
+    while article is not None:
+        urls.append(article['url'])
+        article = article_scheduler.pop()
+    return urls
+
+def test_pop_orders_by_priority_rules():
+    article_scheduler = ArticleScheduler(['new', 'publish_time', 'retry_count'],
+                                         last_run_time='2024-02-01T00:00:00')
+    article_scheduler.extend([
+        {'url': 'old-2023', 'list_publish_time': '2023年5月1日', 'discovered_time': '2024-01-01T00:00:00'},
+        {'url': 'unknown-time'},
+        {'url': 'new', 'list_publish_time': '2022年1月1日', 'discovered_time': '2024-03-01T00:00:00'},
+        {'url': 'old-2024-retried', 'publish_time': '2024-01-10 08:00:00', 'retry_count': 2},
+        {'url': 'old-2024', 'publish_time': '2024-01-10 08:00:00'},
+    ])
+    assert drain(article_scheduler) == ['new', 'old-2024', 'old-2024-retried', 'old-2023', 'unknown-time']
+
+def test_equal_priority_keeps_insertion_order():
+    article_scheduler = ArticleScheduler(['retry_count'])
+    article_scheduler.extend({'url': str(i)} for i in range(5))
+    assert drain(article_scheduler) == ['0', '1', '2', '3', '4']
+
+def test_unknown_priority_rule_is_ignored():
+    assert ArticleScheduler(['new', 'bogus']).priority == ['new']
+
+def test_delayed_articles_wait_until_due(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler.time, 'time', lambda: now[0])
+    article_scheduler = ArticleScheduler(['retry_count'])
+    article_scheduler.push({'url': 'later'}, delay=30)
+    article_scheduler.push({'url': 'sooner'}, delay=10)
+
+    assert len(article_scheduler) == 2
+    assert article_scheduler.pop() is None
+    assert article_scheduler.next_ready_in() == 10
+
+    now[0] += 10
+    assert article_scheduler.pop()['url'] == 'sooner'
+    assert article_scheduler.next_ready_in() == 20
+
+    now[0] += 20
+    article_scheduler.push({'url': 'ready'})
+    assert drain(article_scheduler) == ['ready', 'later']
+    assert not article_scheduler
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from search_index import SearchIndex, build_match_query, tokenize_text
+
+@pytest.fixture
+def index(tmp_path):
+    search_index = SearchIndex(str(tmp_path / 'search.db'))
+    yield search_index
+    search_index.close()
+
+def test_tokenize_text_adds_trailing_unigram():
+    assert tokenize_text('机器学习 AI') == '机器 器学 学习 习 ai'
+    assert tokenize_text('机器学习', trailing_unigram=False) == '机器 器学 学习'
+    assert tokenize_text('字') == '字'
+
+def test_build_match_query():
+    assert build_match_query('机器学习 Python') == ('"机器 器学 学习" AND "python"', ['机器学习', 'Python'])
+    assert build_match_query('习') == ('"习"*', ['习'])
+    assert build_match_query('。，') == (None, [])
+
+@pytest.mark.parametrize('query', ['学', '习', '学习', '深度学习'])
+def test_search_matches_any_position(index, query):
+    index.add('https://example.com/1', '标题', '我们一起深度学习。', source='wechat')
+    results, _ = index.search(query)
+    assert [result['url'] for result in results] == ['https://example.com/1']
+
+def test_search_phrase_requires_contiguous_text(index):
+    index.add('https://example.com/1', '标题', '学而时习之', source='wechat')
+    assert index.search('学习')[0] == []
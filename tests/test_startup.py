@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from bench_startup import ENTRY_MODULES, measure_import, find_heavy
+
+@pytest.mark.parametrize('module', ENTRY_MODULES)
+def test_entry_module_does_not_load_heavy_dependencies(module):
+    _, loaded = measure_import(module, repeat=1)
+    assert find_heavy(loaded) == []
@@ -13,18 +13,16 @@ import re
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-
 from config import (BASE_DIR, TOUTIAO_ARTICLES_DIR, LOGS_DIR, TOUTIAO_JSON_FILE,
                    DEFAULT_DELAY, get_random_delay, SELECTORS, SCROLL_PAUSE_TIME,
-                   HEADLESS, WINDOW_SIZE, USER_AGENTS, get_random_user_agent)
-from utils import (setup_driver, setup_logging, load_json_state, save_json_state,
+                   HEADLESS, WINDOW_SIZE, USER_AGENTS, get_random_user_agent,
+                   SEARCH_INDEX_ENABLED)
+from utils import (setup_logging, load_json_state, save_json_state,
                    validate_url, save_article_content, clean_filename,
                    format_progress_bar)
+from driver_manager import DriverManager
+from search_index import open_search_index
+from article_record import ArticleRecord
 
 class ToutiaoUserCrawler:
     """今日头条用户主页文章抓取器"""
@@ -34,6 +32,8 @@ class ToutiaoUserCrawler:
         self.headless = headless
         self.delay = delay
         self.driver = None
+        self.driver_manager = DriverManager(headless=headless, window_size=WINDOW_SIZE,
+                                            on_create=self._set_user_agent)
         self.articles_data = None
 
         # 设置日志
@@ -45,14 +45,16 @@ class ToutiaoUserCrawler:
 
         logging.info("今日头条用户主页文章抓取器初始化完成")
 
+    def _set_user_agent(self, driver):
+        """设置随机User-Agent（每次创建驱动后调用）"""
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+            "userAgent": get_random_user_agent()
+        })
+
     def setup_driver(self):
         """设置浏览器驱动"""
         try:
-            self.driver = setup_driver(headless=self.headless, window_size=WINDOW_SIZE)
-            # 设置随机User-Agent
-            self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                "userAgent": get_random_user_agent()
-            })
+            self.driver = self.driver_manager.start()
             logging.info("浏览器驱动设置成功")
             return True
         except Exception as e:
@@ -86,6 +88,8 @@ class ToutiaoUserCrawler:
 
     def load_all_articles(self):
         """滚动加载所有文章"""
+        from selenium.webdriver.common.by import By
+
         try:
             logging.info("开始加载所有文章...")
 
@@ -151,6 +155,8 @@ class ToutiaoUserCrawler:
 
     def extract_articles_list(self):
         """提取文章列表"""
+        from selenium.webdriver.common.by import By
+
         try:
             new_articles = []
 
@@ -206,18 +212,18 @@ class ToutiaoUserCrawler:
                     except:
                         pass
 
-                    article_info = {
-                        'index': index + 1,
-                        'title': title,
-                        'url': article_url,
-                        'publish_time': publish_time,
-                        'read_count': read_count,
-                        'status': 'pending',
-                        'file_path': None,
-                        'error_message': None,
-                        'processed_time': None,
-                        'retry_count': 0
-                    }
+                    article_info = ArticleRecord(
+                        index=index + 1,
+                        title=title,
+                        url=article_url,
+                        publish_time=publish_time,
+                        read_count=read_count,
+                        status='pending',
+                        file_path=None,
+                        error_message=None,
+                        processed_time=None,
+                        retry_count=0
+                    )
 
                     new_articles.append(article_info)
                     logging.debug(f"成功提取文章 {index+1}: {title[:30]}...")
@@ -253,6 +259,11 @@ class ToutiaoUserCrawler:
 
     def extract_article_content(self, article_url):
         """提取文章正文内容"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
         try:
             logging.info(f"开始提取文章内容: {article_url}")
 
@@ -261,6 +272,7 @@ class ToutiaoUserCrawler:
             self.driver.switch_to.window(self.driver.window_handles[-1])
 
             # 访问文章页面
+            self.driver_manager.record_navigation()
             self.driver.get(article_url)
 
             # 等待页面加载
@@ -384,6 +396,12 @@ class ToutiaoUserCrawler:
                     art['processed_time'] = datetime.now().isoformat()
                     break
 
+            # 更新全文检索索引
+            search_index = getattr(self, 'search_index', None)
+            if search_index is not None:
+                search_index.add(url, title, content, file_path, 'toutiao',
+                                 self.articles_data.get('user_url'), article_info.get('publish_time'))
+
             logging.info(f"第 {index} 篇文章处理完成: {title}")
             return True
 
@@ -415,6 +433,8 @@ class ToutiaoUserCrawler:
 
             # 设置输出目录
             os.makedirs(output_dir, exist_ok=True)
+            if SEARCH_INDEX_ENABLED:
+                self.search_index = open_search_index()
 
             # 如果没有现有数据或不需要恢复，重新抓取
             if not self.articles_data or not resume:
@@ -474,6 +494,13 @@ class ToutiaoUserCrawler:
                 )
                 print(f"\r{progress}", end="", flush=True)
 
+                # 确保浏览器可用（会话失效时自动重建，达到阈值时主动回收）
+                try:
+                    self.driver = self.driver_manager.ensure_healthy()
+                except Exception as e:
+                    logging.error(f"重建浏览器驱动失败: {e}")
+                    return False
+
                 # 处理文章
                 if self.process_article(article_info, output_dir):
                     success_count += 1
@@ -510,7 +537,11 @@ class ToutiaoUserCrawler:
             return False
 
         finally:
+            if getattr(self, 'search_index', None) is not None:
+                self.search_index.close()
+
             # 关闭浏览器
+            self.driver_manager.quit()
             if self.driver:
                 try:
                     self.driver.quit()
@@ -10,255 +10,60 @@ import time
 import logging
 import hashlib
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-
-from config import (get_random_user_agent, get_random_delay, SELECTORS,
-                   PAGE_LOAD_TIMEOUT, ELEMENT_WAIT_TIMEOUT, MAX_RETRY_TIMES,
-                   RETRY_DELAY, get_article_file_path)
+from urllib.parse import urlparse, parse_qs
+
+from config import (get_random_delay, SELECTORS,
+                   ELEMENT_WAIT_TIMEOUT, MAX_RETRY_TIMES,
+                   RETRY_DELAY, get_article_file_path, LAYOUT_CACHE_FILE, CONTENT_DEDUP_MODE,
+                   OUTPUT_LAYOUT)
+from retry_policy import backoff_delay
+from content_index import compute_content_hash, compute_file_hash
+from article_record import to_article_records
+from state_format import encode_state, StateFormatError
+from parsing import (extract_url_hash, parse_wechat_time_text, parse_list_time_text,
+                     extract_publish_time_from_html,
+                     extract_publish_time_from_page, extract_content_from_html, clean_content,
+                     extract_real_title_from_content, record_publish_time_strategy,
+                     get_publish_time_stats)
 
 def setup_driver(headless=False, window_size=(1280, 720)):
-    """设置浏览器驱动（优先Chrome，失败时使用Edge）"""
-    import time
-    driver = None
-    last_error = None
+    """设置浏览器驱动（同时启动 Chrome 和 Edge，使用最先启动成功的一个）"""
+    from driver_factory import create_driver, BROWSER_NAMES
 
-    # 记录开始时间
     start_time = time.time()
     logging.info("=" * 50)
     logging.info("开始设置浏览器驱动...")
 
-    # 首先尝试 Chrome 浏览器
-    try:
-        logging.info("尝试创建 Chrome 驱动...")
-        chrome_start = time.time()
-        driver = _setup_chrome_driver(headless, window_size)
-        chrome_elapsed = time.time() - chrome_start
-        logging.info(f"Chrome 驱动创建成功 (耗时: {chrome_elapsed:.1f}秒)")
-        return driver
-
-    except Exception as chrome_error:
-        chrome_elapsed = time.time() - start_time
-        last_error = chrome_error
-        logging.warning(f"Chrome 驱动创建失败 (耗时: {chrome_elapsed:.1f}秒): {chrome_error}")
-
-        # Chrome 失败时，尝试 Edge 浏览器作为备选
-        try:
-            logging.info("尝试创建 Edge 驱动作为备选...")
-            edge_start = time.time()
-            driver = _setup_edge_driver(headless, window_size)
-            edge_elapsed = time.time() - edge_start
-            logging.info(f"Edge 驱动创建成功（作为 Chrome 的备选方案） (耗时: {edge_elapsed:.1f}秒)")
-            return driver
-
-        except Exception as edge_error:
-            total_elapsed = time.time() - start_time
-            last_error = edge_error
-            logging.error(f"Edge 驱动也创建失败 (总耗时: {total_elapsed:.1f}秒): {edge_error}")
-
-            # 提供详细的错误信息和解决方案
-            logging.error("=" * 50)
-            logging.error("浏览器驱动创建失败，请尝试以下解决方案:")
-            logging.error("1. 确保 Chrome 或 Edge 浏览器已正确安装")
-            logging.error("2. 检查系统是否支持图形界面（headless模式可能需要X11）")
-            logging.error("3. 更新 Selenium 和 webdriver-manager:")
-            logging.error("   pip install --upgrade selenium webdriver-manager")
-            logging.error("4. 手动下载 ChromeDriver: https://chromedriver.chromium.org/")
-            logging.error("5. 将 ChromeDriver.exe 放到系统 PATH 或当前目录")
-            logging.error("6. 如果在网络受限环境中，确保网络连接正常")
-            logging.error("=" * 50)
-
-            raise last_error
-
-def _setup_chrome_driver(headless=False, window_size=(1280, 720)):
-    """设置Chrome浏览器驱动"""
-    from selenium.webdriver.chrome.service import Service
-    import threading
-    import queue
-
-    chrome_options = Options()
-
-    # 基础配置
-    chrome_options.add_argument(f'user-agent={get_random_user_agent()}')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--disable-web-security')
-    chrome_options.add_argument('--allow-running-insecure-content')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-
-    # 优化Chrome启动性能的额外参数
-    chrome_options.add_argument('--disable-extensions')
-    chrome_options.add_argument('--disable-plugins')
-    chrome_options.add_argument('--disable-default-apps')
-    chrome_options.add_argument('--disable-translate')
-    chrome_options.add_argument('--disable-sync')
-    chrome_options.add_argument('--no-first-run')
-    chrome_options.add_argument('--disable-background-timer-throttling')
-    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-    chrome_options.add_argument('--disable-renderer-backgrounding')
-    chrome_options.add_argument('--disable-features=TranslateUI')
-    chrome_options.add_argument('--disable-ipc-flooding-protection')
-    chrome_options.add_argument('--password-store=basic')
-
-    if headless:
-        chrome_options.add_argument('--headless=new')  # 使用新的 headless 模式
-
-    # 设置窗口大小
-    chrome_options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
-
-    # 禁用图片加载以提高速度（可选）
-    prefs = {
-        'profile.managed_default_content_settings.images': 2,
-        'profile.managed_default_content_settings.javascript': 1
-    }
-    chrome_options.add_experimental_option('prefs', prefs)
-
-    # 检查Chrome浏览器路径
-    chrome_paths = [
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-    ]
-
-    chrome_path = None
-    for path in chrome_paths:
-        if os.path.exists(path):
-            chrome_path = path
-            break
-
-    if chrome_path:
-        chrome_options.binary_location = chrome_path
-        logging.info(f"使用 Chrome 路径: {chrome_path}")
-    else:
-        raise Exception(f"未找到Chrome浏览器，请检查以下路径:\n{chr(10).join(chrome_paths)}")
-
-    # 尝试多种方式创建驱动（带超时控制）
-    driver = None
-    last_error = None
-
-    # 方法1: 使用 Selenium 4.38.0 的内置驱动管理（带超时）
-    def create_driver_with_selenium():
-        return webdriver.Chrome(options=chrome_options)
-
     try:
-        logging.info("尝试创建 Chrome 驱动（Selenium 内置）...")
-        # 使用线程和队列来实现超时控制
-        result_queue = queue.Queue()
-        worker_thread = threading.Thread(
-            target=lambda: result_queue.put(('success', create_driver_with_selenium())),
-            daemon=True
-        )
-        worker_thread.start()
-        worker_thread.join(timeout=15)  # 15秒超时
-
-        if worker_thread.is_alive():
-            raise Exception("Chrome驱动创建超时（15秒）")
-
-        try:
-            status, result = result_queue.get_nowait()
-            if status == 'success':
-                driver = result
-                logging.info("Chrome 方法1: Selenium 内置驱动管理成功")
-        except queue.Empty:
-            raise Exception("Chrome驱动创建失败")
-
-    except Exception as e1:
-        last_error = e1
-        logging.warning(f"Chrome 方法1失败: {e1}")
-
-        # 方法2: 尝试使用 webdriver-manager（仅当模块存在时）
-        try:
-            from webdriver_manager.chrome import ChromeDriverManager
-        except ImportError:
-            logging.info("webdriver-manager 模块未安装，跳过方法2")
-        else:
-            def create_driver_with_manager():
-                service = Service(ChromeDriverManager().install())
-                return webdriver.Chrome(service=service, options=chrome_options)
-
-            try:
-                logging.info("尝试 webdriver-manager 方式...")
-                result_queue = queue.Queue()
-                worker_thread = threading.Thread(
-                    target=lambda: result_queue.put(('success', create_driver_with_manager())),
-                    daemon=True
-                )
-                worker_thread.start()
-                worker_thread.join(timeout=30)  # 30秒超时（webdriver-manager需要下载时间）
-
-                if worker_thread.is_alive():
-                    raise Exception("webdriver-manager 超时（30秒）")
-
-                try:
-                    status, result = result_queue.get_nowait()
-                    if status == 'success':
-                        driver = result
-                        logging.info("Chrome 方法2: webdriver-manager 成功")
-                except queue.Empty:
-                    raise Exception("webdriver-manager 创建失败")
-
-            except Exception as e2:
-                logging.warning(f"Chrome 方法2失败: {e2}")
-                last_error = e2
-
-    # 如果所有方法都失败，抛出最后的错误
-    if driver is None:
-        raise last_error if last_error else Exception("无法创建Chrome驱动")
-
-    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-
-    # 移除 navigator.webdriver 属性以避免被检测
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-    return driver
-
-def _setup_edge_driver(headless=False, window_size=(1280, 720)):
-    """设置Edge浏览器驱动（备选方案）"""
-    from selenium.webdriver.edge.options import Options as EdgeOptions
-    from selenium.webdriver.edge.service import Service
-
-    edge_options = EdgeOptions()
-
-    # 基础配置
-    edge_options.add_argument('--no-sandbox')
-    edge_options.add_argument('--disable-dev-shm-usage')
-    edge_options.add_argument('--disable-gpu')
-    edge_options.add_argument('--disable-web-security')
-    edge_options.add_argument('--allow-running-insecure-content')
-    edge_options.add_argument('--disable-blink-features=AutomationControlled')
-    edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    edge_options.add_experimental_option('useAutomationExtension', False)
-
-    if headless:
-        edge_options.add_argument('--headless')
-
-    # 设置窗口大小
-    edge_options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
-
-    # 禁用图片加载以提高速度（可选）
-    prefs = {
-        'profile.managed_default_content_settings.images': 2,
-        'profile.managed_default_content_settings.javascript': 1
-    }
-    edge_options.add_experimental_option('prefs', prefs)
-
-    # 创建 Edge 驱动（使用内置驱动管理）
-    driver = webdriver.Edge(options=edge_options)
-    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-
-    # 移除 navigator.webdriver 属性以避免被检测
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
+        browser, driver = create_driver(headless=headless, window_size=window_size)
+    except Exception:
+        total_elapsed = time.time() - start_time
+        logging.error(f"所有候选浏览器驱动都创建失败 (总耗时: {total_elapsed:.1f}秒)")
+
+        # 提供详细的错误信息和解决方案
+        logging.error("=" * 50)
+        logging.error("浏览器驱动创建失败，请尝试以下解决方案:")
+        logging.error("1. 确保 Chrome 或 Edge 浏览器已正确安装")
+        logging.error("2. 检查系统是否支持图形界面（headless模式可能需要X11）")
+        logging.error("3. 更新 Selenium 和 webdriver-manager:")
+        logging.error("   pip install --upgrade selenium webdriver-manager")
+        logging.error("4. 手动下载 ChromeDriver: https://chromedriver.chromium.org/")
+        logging.error("5. 将 ChromeDriver 放到系统 PATH，或在 config.py 中设置 CHROME_DRIVER_PATH")
+        logging.error("6. 如果在网络受限环境中，确保网络连接正常")
+        logging.error("7. 驱动路径缓存过期时可删除 driver_cache.json 后重试")
+        logging.error("=" * 50)
+        raise
+
+    logging.info(f"使用 {BROWSER_NAMES.get(browser, browser)} 浏览器 (总耗时: {time.time() - start_time:.1f}秒)")
     return driver
 
 def wait_for_element(driver, selector, timeout=ELEMENT_WAIT_TIMEOUT):
     """等待元素出现"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     try:
         element = WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, selector))
@@ -288,6 +93,77 @@ def scroll_to_bottom(driver, pause_time=2):
 
         last_height = new_height
 
+# 安装 MutationObserver，滚动到底部后等待列表追加新条目或出现"没有更多"标记
+_LIST_GROWTH_SCRIPT = """
+var itemSelectors = arguments[0], noMoreSelectors = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+
+function countItems() {
+    for (var i = 0; i < itemSelectors.length; i++) {
+        var n = document.querySelectorAll(itemSelectors[i]).length;
+        if (n) return n;
+    }
+    return 0;
+}
+
+function noMoreVisible() {
+    for (var i = 0; i < noMoreSelectors.length; i++) {
+        var el = document.querySelector(noMoreSelectors[i]);
+        if (el && el.getClientRects().length && getComputedStyle(el).visibility !== 'hidden') return true;
+    }
+    return false;
+}
+
+var initial = countItems();
+if (noMoreVisible()) {
+    done({count: initial, grew: false, no_more: true, timed_out: false});
+    return;
+}
+
+var finished = false, timer = null;
+var observer = new MutationObserver(function () {
+    if (countItems() > initial || noMoreVisible()) finish(false);
+});
+
+function finish(timedOut) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    var count = countItems();
+    done({count: count, grew: count > initial, no_more: noMoreVisible(), timed_out: timedOut});
+}
+
+observer.observe(document.body, {childList: true, subtree: true, attributes: true,
+                                 attributeFilter: ['style', 'class']});
+timer = setTimeout(function () { finish(true); }, timeoutMs);
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+def scroll_and_wait_for_growth(driver, item_selectors, no_more_selectors, timeout=10):
+    """
+    滚动到页面底部，并通过 MutationObserver 等待列表追加新条目或出现"没有更多"标记，
+    一旦满足条件立即返回，不做固定时长的等待
+
+    Args:
+        driver: Selenium WebDriver实例
+        item_selectors (list): 列表条目的候选选择器
+        no_more_selectors (list): "没有更多"标记的候选选择器
+        timeout (float): 最长等待时间（秒）
+
+    Returns:
+        dict: {'count': 当前条目数, 'grew': 是否有新条目, 'no_more': 是否已到底,
+               'timed_out': 是否超时}，脚本执行失败返回None
+    """
+    try:
+        driver.set_script_timeout(timeout + 5)
+        return driver.execute_async_script(
+            _LIST_GROWTH_SCRIPT, list(item_selectors), list(no_more_selectors), int(timeout * 1000)
+        )
+    except Exception as e:
+        logging.warning(f"等待列表加载失败: {e}")
+        return None
+
 def clean_filename(filename):
     """清理文件名，移除非法字符"""
     # 移除或替换非法字符
@@ -355,16 +231,53 @@ def save_article_content(index, title, content, output_dir, album_title=None):
         return None
 
 def load_json_state(json_file):
-    """加载JSON状态文件"""
+    """
+    加载状态文件（自动识别 JSON / json.gz / msgpack 格式，文章列表转换为紧凑的 ArticleRecord）
+
+    JSON 格式的状态文件逐篇流式解析，峰值内存接近转换后的记录本身
+
+    文件存在但无法解码（版本过新、缺少 msgpack）时抛出 StateFormatError，
+    避免被当作没有状态而重新开始抓取、覆盖原有状态
+    """
+    from state_stream import iter_state_articles
+
     if os.path.exists(json_file):
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # 逐篇读取并立即转换为 ArticleRecord，不会同时保留整份 dict 形式的文章列表
+            header = {}
+            articles = to_article_records(iter_state_articles(json_file, header, use_ijson=False))
+            return dict(header, articles=articles)
+        except StateFormatError:
+            raise
         except Exception as e:
             logging.error(f"加载JSON文件失败: {e}")
             return None
     return None
 
+def write_file_atomic(path, content):
+    """
+    原子写入文件：先写同目录下的临时文件再替换，中断时不会留下写了一半的文件
+
+    Args:
+        path (str): 文件路径
+        content (str or bytes): 文件内容
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    if isinstance(content, bytes):
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+    else:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    os.replace(temp_path, path)
+
+def get_date_counter_file(output_dir, album_title):
+    """日期计数器文件路径"""
+    return os.path.join(output_dir, f"{clean_filename(album_title)}_date_counter.json")
+
 def load_date_counter(output_dir, album_title):
     """
     加载或创建日期计数器文件
@@ -376,7 +289,7 @@ def load_date_counter(output_dir, album_title):
     Returns:
         dict: 日期计数器字典 {日期: 计数}
     """
-    counter_file = os.path.join(output_dir, f"{clean_filename(album_title)}_date_counter.json")
+    counter_file = get_date_counter_file(output_dir, album_title)
 
     if os.path.exists(counter_file):
         try:
@@ -387,7 +300,7 @@ def load_date_counter(output_dir, album_title):
 
     return {}
 
-def save_date_counter(output_dir, album_title, counter_data):
+def save_date_counter(output_dir, album_title, counter_data, writer=None):
     """
     保存日期计数器文件
 
@@ -395,12 +308,15 @@ def save_date_counter(output_dir, album_title, counter_data):
         output_dir (str): 输出目录
         album_title (str): 专辑标题
         counter_data (dict): 日期计数器字典
+        writer (AtomicFileWriter): 后台写入器，传入时只提交快照
     """
-    counter_file = os.path.join(output_dir, f"{clean_filename(album_title)}_date_counter.json")
-
     try:
-        with open(counter_file, 'w', encoding='utf-8') as f:
-            json.dump(counter_data, f, ensure_ascii=False, indent=2)
+        counter_file = get_date_counter_file(output_dir, album_title)
+        text = json.dumps(counter_data, ensure_ascii=False, indent=2)
+        if writer is not None:
+            writer.submit(counter_file, text)
+        else:
+            write_file_atomic(counter_file, text)
     except Exception as e:
         logging.warning(f"保存日期计数器失败: {e}")
 
@@ -425,17 +341,31 @@ def increment_date_counter(counter_data, publish_date):
 
     return count, need_suffix, suffix_number
 
-def save_json_state(data, json_file):
-    """保存JSON状态文件"""
+def dump_json_state(data):
+    """把状态编码为文件内容（格式由 config.py 中的 STATE_FORMAT 决定，ArticleRecord 在此转换为 dict）"""
+    return encode_state(data)
+
+def save_json_state(data, json_file, writer=None):
+    """
+    保存JSON状态文件（原子写入）
+
+    Args:
+        data (dict): 状态数据
+        json_file (str): 状态文件
+        writer (AtomicFileWriter): 后台写入器，传入时只提交快照，由后台线程写入
+    """
     try:
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if writer is not None:
+            writer.submit(json_file, dump_json_state(data))
+            logging.debug(f"JSON状态快照已提交后台写入: {json_file}")
+            return
+        write_file_atomic(json_file, dump_json_state(data))
         logging.info(f"JSON状态文件保存成功: {json_file}")
     except Exception as e:
         logging.error(f"保存JSON文件失败: {e}")
 
 def retry_operation(func, max_retries=MAX_RETRY_TIMES, delay=RETRY_DELAY):
-    """重试装饰器"""
+    """重试装饰器（指数退避 + 随机抖动，delay 为退避基数）"""
     def wrapper(*args, **kwargs):
         last_exception = None
 
@@ -445,8 +375,9 @@ def retry_operation(func, max_retries=MAX_RETRY_TIMES, delay=RETRY_DELAY):
             except Exception as e:
                 last_exception = e
                 if attempt < max_retries - 1:
-                    logging.warning(f"操作失败，第{attempt + 1}次重试: {e}")
-                    time.sleep(delay)
+                    wait_time = backoff_delay(attempt, delay)
+                    logging.warning(f"操作失败，{wait_time:.1f}秒后第{attempt + 1}次重试: {e}")
+                    time.sleep(wait_time)
                 else:
                     logging.error(f"操作失败，已达到最大重试次数: {e}")
 
@@ -530,6 +461,27 @@ def update_article_status(articles_data, index, status=None, file_path=None, err
         articles_data['failed_count'] = failed_count
         articles_data['pending_count'] = pending_count
 
+# 各文章状态在状态文件中对应的统计字段
+STATUS_COUNT_KEYS = {'completed': 'processed_count', 'failed': 'failed_count', 'pending': 'pending_count'}
+
+def change_article_status(articles_data, article, status):
+    """
+    修改文章状态并增量更新状态统计（不重新遍历全部文章）
+
+    Args:
+        articles_data (dict): 文章数据
+        article (dict): 状态中的文章记录
+        status (str): 新状态
+    """
+    old_status = article.get('status')
+    if old_status == status:
+        return
+    article['status'] = status
+    for changed_status, delta in ((old_status, -1), (status, 1)):
+        count_key = STATUS_COUNT_KEYS.get(changed_status)
+        if count_key:
+            articles_data[count_key] = max(0, articles_data.get(count_key, 0) + delta)
+
 def format_progress_bar(current, total, prefix='', suffix='', length=50):
     """格式化进度条"""
     percent = ("{0:.1f}").format(100 * (current / float(total)))
@@ -537,34 +489,59 @@ def format_progress_bar(current, total, prefix='', suffix='', length=50):
     bar = '█' * filled_length + '-' * (length - filled_length)
     return f'{prefix} |{bar}| {percent}% {suffix}'
 
-def extract_url_hash(url):
-    """从URL提取唯一标识"""
-    if not url:
-        return ""
+# 一次读取页面脚本中的发布时间戳变量（微信文章页面在内联脚本中定义 ct / create_time）
+PUBLISH_TIME_SCRIPT = """
+var values = [];
+try { if (typeof ct !== 'undefined') { values.push(String(ct)); } } catch (e) {}
+try { if (typeof create_time !== 'undefined') { values.push(String(create_time)); } } catch (e) {}
+return values;
+"""
 
-    # 提取URL中的关键部分（去除参数和hash）
-    import re
-    url_pattern = r'https?://mp\.weixin\.qq\.com/s\?.*?(sn=[^&#]+)'
-    match = re.search(url_pattern, url)
+def extract_publish_time_from_script_vars(driver):
+    """
+    通过一次 execute_script 读取页面脚本变量中的发布时间
 
-    if match:
-        key_part = match.group(1)  # 使用sn参数作为唯一标识
-    else:
-        # 如果没有sn参数，使用整个URL的MD5哈希
-        key_part = hashlib.md5(url.encode()).hexdigest()[:8]
+    Args:
+        driver: Selenium WebDriver实例
+
+    Returns:
+        str: 发布时间字符串，格式如 "2024-01-15 10:30:00" 或 None
+    """
+    from selenium.common.exceptions import WebDriverException
 
-    return key_part
+    try:
+        values = driver.execute_script(PUBLISH_TIME_SCRIPT) or []
+    except WebDriverException as e:
+        logging.debug(f"读取发布时间脚本变量失败: {e}")
+        return None
 
-def extract_publish_time_from_article(driver):
+    for value in values:
+        parsed_time = parse_wechat_time_text(value) if value else None
+        if parsed_time:
+            return parsed_time
+    return None
+
+def extract_publish_time_from_article(driver, page_source=None):
     """
     从微信文章页面提取发布时间
 
+    依次尝试：页面脚本变量（一次 execute_script）、DOM元素文本、页面源码中的时间文本，
+    每次的命中策略计入 get_publish_time_stats()
+
     Args:
         driver: Selenium WebDriver实例
+        page_source (str): 已获取的页面源码，传入时最后一步不再重新读取
 
     Returns:
         str: 发布时间字符串，格式如 "2024-01-15 10:30:00" 或 None
     """
+    from selenium.webdriver.common.by import By
+
+    publish_time = extract_publish_time_from_script_vars(driver)
+    if publish_time:
+        record_publish_time_strategy('script')
+        return publish_time
+
     try:
         # 微信文章发布时间的常见选择器
         time_selectors = [
@@ -585,81 +562,21 @@ def extract_publish_time_from_article(driver):
                         # 尝试解析时间文本
                         parsed_time = parse_wechat_time_text(text)
                         if parsed_time:
+                            record_publish_time_strategy('dom')
                             return parsed_time
             except:
                 continue
 
         # 如果上述方法都失败，尝试从页面源码中查找时间信息
-        page_source = driver.page_source
-        import re
-
-        # 查找常见的时间格式
-        time_patterns = [
-            r'(\d{4}年\d{1,2}月\d{1,2}日\s*\d{1,2}:\d{2})',
-            r'(\d{4}-\d{1,2}-\d{1,2}\s*\d{1,2}:\d{2})',
-            r'"ct":"(\d+)"',  # 微信文章中的时间戳
-            r'time.*?(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})',
-        ]
-
-        for pattern in time_patterns:
-            match = re.search(pattern, page_source)
-            if match:
-                time_text = match.group(1)
-                parsed_time = parse_wechat_time_text(time_text)
-                if parsed_time:
-                    return parsed_time
-
-        return None
+        publish_time = extract_publish_time_from_html(page_source or driver.page_source)
+        record_publish_time_strategy('html' if publish_time else 'miss')
+        return publish_time
 
     except Exception as e:
         logging.warning(f"提取发布时间失败: {e}")
+        record_publish_time_strategy('miss')
         return None
 
-def parse_wechat_time_text(time_text):
-    """
-    解析微信文章的时间文本为标准格式
-
-    Args:
-        time_text (str): 时间文本
-
-    Returns:
-        str: 标准格式的时间字符串，如 "2024-01-15 10:30:00"
-    """
-    import re
-    from datetime import datetime
-
-    # 清理时间文本
-    time_text = time_text.strip()
-
-    # 多种时间格式的正则表达式
-    patterns = [
-        # 2024年1月15日 10:30
-        r'(\d{4})年(\d{1,2})月(\d{1,2})日\s*(\d{1,2}):(\d{2})',
-        # 2024-01-15 10:30
-        r'(\d{4})-(\d{1,2})-(\d{1,2})\s*(\d{1,2}):(\d{2})',
-        # 时间戳格式
-        r'^(\d{10,13})$'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, time_text)
-        if match:
-            try:
-                if pattern == patterns[2]:  # 时间戳
-                    timestamp = int(match.group(1))
-                    if timestamp > 10**12:  # 毫秒时间戳
-                        timestamp = timestamp // 1000
-                    dt = datetime.fromtimestamp(timestamp)
-                else:  # 标准日期格式
-                    year, month, day, hour, minute = map(int, match.groups())
-                    dt = datetime(year, month, day, hour, minute)
-
-                return dt.strftime('%Y-%m-%d %H:%M:%S')
-            except Exception:
-                continue
-
-    return None
-
 def generate_smart_filename(url, title, index, album_title=None, publish_time=None,
                           counter_data=None):
     """
@@ -715,6 +632,51 @@ def generate_smart_filename(url, title, index, album_title=None, publish_time=No
 
     return filename, counter_data
 
+def get_article_path(output_dir, filename, album_title=None, layout=OUTPUT_LAYOUT):
+    """
+    按目录布局生成文章文件路径
+
+    album_date 布局的年月取自文件名中的发布日期戳（{专辑}_{YYYYMMDD}[_NN]），
+    这样只凭文件名就能确定所在目录，保存和迁移使用同一规则
+
+    Args:
+        output_dir (str): 文章目录
+        filename (str): 不含扩展名的文件名
+        album_title (str): 专辑标题
+        layout (str): 'flat' / 'album_date' / 'hash'
+
+    Returns:
+        str: 文件路径
+    """
+    if layout == 'album_date':
+        match = re.search(r'_(\d{4})(\d{2})\d{2}(?:_\d+)?$', filename)
+        date_parts = [match.group(1), match.group(2)] if match else ['misc']
+        shard_dir = os.path.join(output_dir, clean_filename(album_title) if album_title else 'unknown_album',
+                                 *date_parts)
+    elif layout == 'hash':
+        shard_dir = os.path.join(output_dir, hashlib.md5(filename.encode('utf-8')).hexdigest()[:2])
+    else:
+        shard_dir = output_dir
+    return os.path.join(shard_dir, f"{filename}.md")
+
+def iter_article_files(output_dir):
+    """
+    遍历文章目录（包括 album_date / hash 布局的子目录）中的 .md 文件
+
+    索引、日期计数器等元数据文件不是 .md 文件，隐藏目录（如 .git）不遍历
+
+    Args:
+        output_dir (str): 文章目录
+
+    Yields:
+        str: 文章文件的绝对路径
+    """
+    for dir_path, dir_names, file_names in os.walk(output_dir):
+        dir_names[:] = sorted(name for name in dir_names if not name.startswith('.'))
+        for name in sorted(file_names):
+            if name.endswith('.md'):
+                yield os.path.abspath(os.path.join(dir_path, name))
+
 def check_article_exists_by_url(articles_data, url):
     """
     根据URL检查文章是否已经处理过
@@ -742,10 +704,17 @@ def check_article_exists_by_url(articles_data, url):
     return False, None
 
 def smart_save_article_content(url, title, content, output_dir, album_title=None,
-                             index=0, publish_time=None, counter_data=None):
+                             index=0, publish_time=None, counter_data=None,
+                             content_index=None, dedup_mode=CONTENT_DEDUP_MODE,
+                             layout=OUTPUT_LAYOUT, writer=None):
     """
     智能保存文章内容，使用发布时间命名 + 自增编号
 
+    生成的文件名已存在时比较正文哈希：正文相同视为同一篇文章跳过保存，
+    不同则顺延编号，避免覆盖或漏存其他文章。
+    传入 content_index 时还会检测其他文件名下的相同正文（如同一文章出现在多个专辑），
+    按 dedup_mode 创建硬链接或直接引用已保存的文件。
+
     Args:
         url (str): 文章URL
         title (str): 文章标题
@@ -755,28 +724,78 @@ def smart_save_article_content(url, title, content, output_dir, album_title=None
         index (int): 文章序号
         publish_time (str): 发布时间，格式如 "2024-01-15 10:30:00"
         counter_data (dict): 日期计数器字典
+        content_index (ContentIndex): 正文哈希索引，可选
+        dedup_mode (str): 重复文章处理方式，'hardlink' / 'reference' / 'off'
+        layout (str): 文章目录布局，见 get_article_path
+        writer (AtomicFileWriter): 后台写入器，传入时文件交给后台线程写入
 
     Returns:
         tuple: (保存的文件路径, 更新后的计数器数据)，失败返回(None, None)
     """
     try:
+        content_hash = compute_content_hash(content)
+        exists = writer.exists if writer is not None else os.path.exists
+
+        # 其他文件名下已保存过相同正文
+        duplicate = None
+        if content_index is not None and dedup_mode != 'off':
+            duplicate = content_index.lookup(content_hash, exists=exists)
+            if duplicate and dedup_mode == 'reference':
+                logging.info(f"文章内容重复，引用已保存的文件: {os.path.basename(duplicate['file_path'])} "
+                             f"(原文: {duplicate['url']})")
+                return duplicate['file_path'], counter_data
+
         # 生成文件名和更新的计数器
         filename, updated_counter = generate_smart_filename(
             url, title, index, album_title, publish_time, counter_data
         )
-        file_path = os.path.join(output_dir, f"{filename}.md")
+        base_filename = filename
+        file_path = get_article_path(output_dir, filename, album_title, layout)
+
+        # 文件名已存在：正文相同则跳过，不同则顺延编号
+        collisions = 0
+        while exists(file_path):
+            if writer is not None:
+                existing_hash = compute_content_hash(writer.read(file_path))
+            else:
+                existing_hash = compute_file_hash(file_path)
+            if existing_hash == content_hash:
+                logging.info(f"文章已存在，跳过保存: {os.path.basename(file_path)}")
+                if content_index is not None and not duplicate:
+                    content_index.add(content_hash, file_path, url)
+                return file_path, updated_counter
+
+            collisions += 1
+            logging.warning(f"文件名冲突（内容不同）: {os.path.basename(file_path)}，顺延编号")
+            if counter_data is not None:
+                filename, updated_counter = generate_smart_filename(
+                    url, title, index, album_title, publish_time, counter_data
+                )
+            else:
+                filename = f"{base_filename}_{collisions + 1:02d}"
+            file_path = get_article_path(output_dir, filename, album_title, layout)
 
         # 确保目录存在
-        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        # 如果文件已存在，跳过保存（基于发布时间去重）
-        if os.path.exists(file_path):
-            logging.info(f"文章已存在，跳过保存: {os.path.basename(file_path)}")
-            return file_path, updated_counter
+        if duplicate:
+            try:
+                if writer is not None:
+                    writer.flush()  # 硬链接需要源文件已经落盘
+                os.link(duplicate['file_path'], file_path)
+                logging.info(f"文章内容重复，已硬链接到: {os.path.basename(duplicate['file_path'])}")
+                return file_path, updated_counter
+            except OSError as e:
+                logging.debug(f"创建硬链接失败，写入副本: {e}")
 
         # 只保存文章正文内容，不添加元数据
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content.strip())
+        if writer is not None:
+            writer.submit(file_path, content.strip())
+        else:
+            write_file_atomic(file_path, content.strip())
+
+        if content_index is not None and not duplicate:
+            content_index.add(content_hash, file_path, url)
 
         logging.info(f"文章保存成功: {os.path.basename(file_path)}")
         return file_path, updated_counter
@@ -785,43 +804,22 @@ def smart_save_article_content(url, title, content, output_dir, album_title=None
         logging.error(f"保存文章失败: {title}, 错误: {e}")
         return None, None
 
-def extract_real_title_from_content(content):
+def read_article_content(file_path):
     """
-    从文章内容中提取真实标题
+    读取已保存文章的正文（支持打包归档中的 "packed:<URL哈希>" 路径）
 
     Args:
-        content (str): 文章内容
+        file_path (str): 状态中的 file_path
 
     Returns:
-        str: 提取的标题，失败返回空字符串
+        str: 文章正文
     """
-    if not content:
-        return ""
-
-    # 尝试多种标题提取策略
-    lines = content.split('\n')
-
-    # 策略1: 寻找第一个非空行，通常可能是标题
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if line and len(line) > 5 and len(line) < 100:
-            # 排除明显不是标题的行
-            if not re.match(r'^[0-9\s,\.，。、]+$', line) and not line.startswith('http'):
-                return line
-
-    # 策略2: 寻找包含特殊字符的标题行
-    for line in lines[:10]:  # 只检查前10行
-        line = line.strip()
-        if line and any(char in line for char in '【】「」《》""'''):
-            return line
-
-    # 策略3: 返回第一个较长的非空行
-    for line in lines[:5]:
-        line = line.strip()
-        if line and len(line) > 10:
-            return line[:50] + "..." if len(line) > 50 else line
-
-    return ""
+    if file_path.startswith('packed:'):
+        from packed_store import read_packed_article
+        return read_packed_article(file_path)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 def update_articles_with_url_matching(articles_data, new_articles):
     """
@@ -892,9 +890,177 @@ def update_articles_with_url_matching(articles_data, new_articles):
 
     return articles_data
 
-def find_element_with_fallback(driver, selector_key, timeout=ELEMENT_WAIT_TIMEOUT):
+# 当前页面的版本（'original' 或 'alternative'）及其所属专辑的缓存键
+_layout_state = {'variant': None, 'album_key': None}
+
+# 用于判断页面版本的页面级选择器键；只有这些键的匹配结果会改变页面版本和缓存，
+# 单个文章元素上的链接、标题提取方式在混合版本页面上可能不同，不参与判断
+LAYOUT_SELECTOR_KEYS = ('album_items', 'album_container')
+
+def get_album_cache_key(album_url):
+    """
+    生成专辑的缓存键
+
+    Args:
+        album_url (str): 专辑链接
+
+    Returns:
+        str: 形如 "{__biz}_{album_id}" 的键，无法解析时使用URL的MD5
+    """
+    query = parse_qs(urlparse(album_url).query)
+    album_id = query.get('album_id', [''])[0]
+    if album_id:
+        biz = query.get('__biz', [''])[0]
+        return f"{biz}_{album_id}" if biz else album_id
+    return hashlib.md5(album_url.encode()).hexdigest()
+
+def load_layout_cache(cache_file=LAYOUT_CACHE_FILE):
+    """加载页面版本缓存 {专辑缓存键: {'variant': 版本, 'detected_time': 时间}}"""
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"加载页面版本缓存失败: {e}")
+    return {}
+
+def save_layout_cache(cache_data, cache_file=LAYOUT_CACHE_FILE):
+    """保存页面版本缓存"""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        logging.warning(f"保存页面版本缓存失败: {e}")
+
+def _update_layout_cache(album_key, variant):
+    """更新（variant为None时删除）某个专辑的页面版本缓存"""
+    if not album_key:
+        return
+    cache_data = load_layout_cache()
+    if variant:
+        cache_data[album_key] = {'variant': variant, 'detected_time': datetime.now().isoformat()}
+    else:
+        cache_data.pop(album_key, None)
+    save_layout_cache(cache_data)
+
+def _get_layout_selectors(variant):
+    """页面版本对应的选择器字典"""
+    return SELECTORS if variant == 'original' else SELECTORS.get('alternative', {})
+
+def _variant_matches_page(driver, variant):
+    """检查页面版本的页面级选择器在当前页面上是否有匹配（不等待）"""
+    from selenium.webdriver.common.by import By
+
+    selectors = _get_layout_selectors(variant)
+    for selector_key in LAYOUT_SELECTOR_KEYS:
+        selector = selectors.get(selector_key)
+        if selector and driver.find_elements(By.CSS_SELECTOR, selector):
+            return True
+    return False
+
+def detect_layout_variant(driver):
+    """
+    检测当前专辑页面使用的是哪一版选择器（不等待，只检查一次）
+
+    Args:
+        driver: Selenium WebDriver实例
+
+    Returns:
+        str: 'original'、'alternative'，无法判断时返回None
+    """
+    from selenium.webdriver.common.by import By
+
+    for selector_key in LAYOUT_SELECTOR_KEYS:
+        for variant in ('original', 'alternative'):
+            selector = _get_layout_selectors(variant).get(selector_key)
+            if selector and driver.find_elements(By.CSS_SELECTOR, selector):
+                return variant
+    return None
+
+def set_layout_variant(variant, album_key=None):
+    """设置当前页面版本，之后的选择器查找直接使用该版本"""
+    _layout_state['variant'] = variant
+    _layout_state['album_key'] = album_key
+
+def resolve_layout_variant(driver, album_url):
+    """
+    确定专辑页面版本：优先使用磁盘缓存（先确认其页面级选择器在当前页面上有匹配），
+    没有缓存或缓存与页面不符时检测一次并写入缓存
+
+    Args:
+        driver: Selenium WebDriver实例
+        album_url (str): 专辑链接
+
+    Returns:
+        str: 页面版本，无法判断时返回None
     """
-    使用向后兼容的方式查找单个元素
+    album_key = get_album_cache_key(album_url)
+    cached = load_layout_cache().get(album_key)
+    if cached and cached.get('variant'):
+        if _variant_matches_page(driver, cached['variant']):
+            set_layout_variant(cached['variant'], album_key)
+            logging.info(f"使用缓存的页面版本: {cached['variant']}")
+            return cached['variant']
+        logging.info(f"缓存的页面版本 {cached['variant']} 与页面不符，重新检测")
+
+    variant = detect_layout_variant(driver)
+    set_layout_variant(variant, album_key)
+    if variant:
+        _update_layout_cache(album_key, variant)
+        logging.info(f"检测到页面版本: {variant}")
+    else:
+        logging.info("无法判断页面版本，将同时尝试所有选择器")
+    return variant
+
+def _note_variant_match(variant):
+    """
+    记录某个版本的页面级选择器（LAYOUT_SELECTOR_KEYS）匹配成功；与当前页面版本不一致时
+    说明缓存已失效，改用实际匹配到的版本并更新缓存
+    """
+    active_variant = _layout_state['variant']
+    if active_variant and variant != active_variant:
+        logging.info(f"页面版本缓存失效: {active_variant} -> {variant}")
+        _layout_state['variant'] = variant
+        _matched_variants.clear()
+        _update_layout_cache(_layout_state['album_key'], variant)
+
+# 各选择器键最近一次匹配到的页面版本（'original' 或 'alternative'），本次运行内有效
+_matched_variants = {}
+
+# 选择器等待统计
+_selector_stats = {'waits': 0, 'alternative_hits': 0, 'misses': 0, 'time_saved': 0.0}
+
+def _get_variant_selectors(selector_key, active_only=True):
+    """
+    获取选择器键在各页面版本下的选择器
+
+    Args:
+        selector_key (str): 选择器键名
+        active_only (bool): 为True时，已确定页面版本后只返回该版本的选择器；
+            为False时返回全部版本，最近匹配过的页面版本排在前面（用于同时等待多个版本）
+
+    Returns:
+        list: [(页面版本, 选择器)]
+    """
+    candidates = []
+    original_selector = SELECTORS.get(selector_key)
+    if original_selector:
+        candidates.append(('original', original_selector))
+    alternative_selector = SELECTORS.get('alternative', {}).get(selector_key)
+    if alternative_selector and alternative_selector != original_selector:
+        candidates.append(('alternative', alternative_selector))
+
+    if active_only:
+        active = [candidate for candidate in candidates if candidate[0] == _layout_state['variant']]
+        return active or candidates
+
+    remembered = _matched_variants.get(selector_key) or _layout_state['variant']
+    candidates.sort(key=lambda candidate: candidate[0] != remembered)
+    return candidates
+
+def _wait_for_any_selector(driver, selector_key, timeout):
+    """
+    同时轮询所有候选选择器，返回最先匹配的结果
 
     Args:
         driver: Selenium WebDriver实例
@@ -902,40 +1068,81 @@ def find_element_with_fallback(driver, selector_key, timeout=ELEMENT_WAIT_TIMEOU
         timeout (int): 超时时间
 
     Returns:
-        WebElement: 找到的元素，失败返回None
+        tuple: (页面版本, 选择器, 元素列表)，超时返回 (None, None, [])
     """
-    try:
-        # 首先尝试原有选择器
-        original_selector = SELECTORS.get(selector_key)
-        if original_selector:
-            element = WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, original_selector))
-            )
-            if element:
-                logging.debug(f"使用原有选择器找到元素: {selector_key} -> {original_selector}")
-                return element
-    except:
-        pass
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    candidates = _get_variant_selectors(selector_key, active_only=False)
+    if not candidates:
+        return None, None, []
 
+    def any_selector_matched(d):
+        for variant, selector in candidates:
+            elements = d.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return variant, selector, elements
+        return False
+
+    _selector_stats['waits'] += 1
     try:
-        # 尝试备选选择器
-        alternative_selector = SELECTORS.get('alternative', {}).get(selector_key)
-        if alternative_selector:
-            element = WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, alternative_selector))
-            )
-            if element:
-                logging.debug(f"使用备选选择器找到元素: {selector_key} -> {alternative_selector}")
-                return element
-    except:
-        pass
+        variant, selector, elements = WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            any_selector_matched
+        )
+    except TimeoutException:
+        # 原实现会依次在每个选择器上等待满超时时间
+        _selector_stats['misses'] += 1
+        _selector_stats['time_saved'] += timeout * (len(candidates) - 1)
+        return None, None, []
+
+    _matched_variants[selector_key] = variant
+    if len(candidates) > 1 and selector_key in LAYOUT_SELECTOR_KEYS:
+        _note_variant_match(variant)
+    if variant == 'alternative':
+        # 原实现会先在原有选择器上等待满超时时间才尝试备选选择器
+        _selector_stats['alternative_hits'] += 1
+        if SELECTORS.get(selector_key):
+            _selector_stats['time_saved'] += timeout
+
+    return variant, selector, elements
+
+def get_selector_stats():
+    """
+    获取选择器等待统计
+
+    Returns:
+        dict: 等待次数、备选选择器命中次数、未命中次数、相比逐个等待节省的时间（秒）
+              以及各选择器键匹配到的页面版本
+    """
+    stats = dict(_selector_stats)
+    stats['layout_variant'] = _layout_state['variant']
+    stats['matched_variants'] = dict(_matched_variants)
+    return stats
+
+def find_element_with_fallback(driver, selector_key, timeout=ELEMENT_WAIT_TIMEOUT):
+    """
+    使用向后兼容的方式查找单个元素（同时等待原有和备选选择器）
+
+    Args:
+        driver: Selenium WebDriver实例
+        selector_key (str): 选择器键名
+        timeout (int): 超时时间
+
+    Returns:
+        WebElement: 找到的元素，失败返回None
+    """
+    variant, selector, elements = _wait_for_any_selector(driver, selector_key, timeout)
+    if elements:
+        logging.debug(f"使用{'备选' if variant == 'alternative' else '原有'}选择器找到元素: {selector_key} -> {selector}")
+        return elements[0]
 
     logging.warning(f"无法找到元素: {selector_key}")
     return None
 
 def find_elements_with_fallback(driver, selector_key, timeout=ELEMENT_WAIT_TIMEOUT):
     """
-    使用向后兼容的方式查找多个元素
+    使用向后兼容的方式查找多个元素（同时等待原有和备选选择器）
 
     Args:
         driver: Selenium WebDriver实例
@@ -945,42 +1152,37 @@ def find_elements_with_fallback(driver, selector_key, timeout=ELEMENT_WAIT_TIMEO
     Returns:
         list: 找到的元素列表，失败返回空列表
     """
-    elements = []
-
-    try:
-        # 首先尝试原有选择器
-        original_selector = SELECTORS.get(selector_key)
-        if original_selector:
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, original_selector))
-            )
-            elements = driver.find_elements(By.CSS_SELECTOR, original_selector)
-            if elements:
-                logging.debug(f"使用原有选择器找到 {len(elements)} 个元素: {selector_key} -> {original_selector}")
-                return elements
-    except:
-        pass
-
-    try:
-        # 尝试备选选择器
-        alternative_selector = SELECTORS.get('alternative', {}).get(selector_key)
-        if alternative_selector:
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, alternative_selector))
-            )
-            elements = driver.find_elements(By.CSS_SELECTOR, alternative_selector)
-            if elements:
-                logging.debug(f"使用备选选择器找到 {len(elements)} 个元素: {selector_key} -> {alternative_selector}")
-                return elements
-    except:
-        pass
+    variant, selector, elements = _wait_for_any_selector(driver, selector_key, timeout)
+    if elements:
+        logging.debug(f"使用{'备选' if variant == 'alternative' else '原有'}选择器找到 {len(elements)} 个元素: {selector_key} -> {selector}")
+        return elements
 
     logging.warning(f"无法找到任何元素: {selector_key}")
     return []
 
+def _link_from_data_attribute(article_element):
+    """原有页面：从 data-link 属性提取链接"""
+    link = article_element.get_attribute('data-link')
+    return link if link and link.startswith('http') else None
+
+def _link_from_anchor(article_element):
+    """新页面：从a标签的href提取链接"""
+    from selenium.webdriver.common.by import By
+
+    for link_element in article_element.find_elements(By.TAG_NAME, 'a'):
+        link = link_element.get_attribute('href')
+        if link and link.startswith('http'):
+            return link
+    return None
+
+def _ordered_by_layout(strategies):
+    """将当前页面版本对应的策略排在前面"""
+    active_variant = _layout_state['variant']
+    return sorted(strategies, key=lambda strategy: strategy[0] != active_variant)
+
 def extract_article_link_with_fallback(article_element, driver):
     """
-    使用向后兼容的方式从文章元素中提取链接
+    使用向后兼容的方式从文章元素中提取链接（优先使用当前页面版本的提取方式）
 
     Args:
         article_element: WebElement 文章元素
@@ -989,22 +1191,14 @@ def extract_article_link_with_fallback(article_element, driver):
     Returns:
         str: 文章链接URL，失败返回None
     """
-    # 尝试原有页面的链接提取方式 (data-link属性)
-    try:
-        link = article_element.get_attribute('data-link')
-        if link and link.startswith('http'):
-            return link
-    except:
-        pass
-
-    # 尝试新页面的链接提取方式 (查找a标签)
-    try:
-        link_element = article_element.find_element(By.TAG_NAME, 'a')
-        link = link_element.get_attribute('href')
-        if link and link.startswith('http'):
-            return link
-    except:
-        pass
+    strategies = [('original', _link_from_data_attribute), ('alternative', _link_from_anchor)]
+    for variant, strategy in _ordered_by_layout(strategies):
+        try:
+            link = strategy(article_element)
+            if link:
+                return link
+        except:
+            pass
 
     # 尝试通过点击获取链接（新页面可能需要点击）
     try:
@@ -1023,9 +1217,21 @@ def extract_article_link_with_fallback(article_element, driver):
     logging.warning("无法提取文章链接")
     return None
 
+def _title_from_selector(article_element, selector):
+    """从文章元素内指定选择器的文本提取标题"""
+    from selenium.webdriver.common.by import By
+
+    if not selector:
+        return None
+    for title_element in article_element.find_elements(By.CSS_SELECTOR, selector):
+        title = title_element.text.strip()
+        if title:
+            return title
+    return None
+
 def extract_article_title_with_fallback(article_element):
     """
-    使用向后兼容的方式从文章元素中提取标题
+    使用向后兼容的方式从文章元素中提取标题（优先使用当前页面版本的提取方式）
 
     Args:
         article_element: WebElement 文章元素
@@ -1033,43 +1239,84 @@ def extract_article_title_with_fallback(article_element):
     Returns:
         str: 文章标题，失败返回"未知标题"
     """
-    # 尝试原有页面的标题提取方式
-    try:
-        title_element = article_element.find_element(By.CSS_SELECTOR, SELECTORS['article_title'])
-        title = title_element.text.strip()
-        if title:
-            return title
-    except:
-        pass
+    from selenium.webdriver.common.by import By
 
-    # 尝试新页面的标题提取方式
-    try:
-        title_selector = SELECTORS.get('alternative', {}).get('article_title_text')
-        if title_selector:
-            title_element = article_element.find_element(By.CSS_SELECTOR, title_selector)
-            title = title_element.text.strip()
+    strategies = [
+        ('original', SELECTORS.get('article_title')),
+        ('alternative', SELECTORS.get('alternative', {}).get('article_title_text')),
+    ]
+    for variant, selector in _ordered_by_layout(strategies):
+        try:
+            title = _title_from_selector(article_element, selector)
             if title:
                 return title
-    except:
-        pass
+        except:
+            pass
 
     # 尝试通过a标签的title属性或文本获取
     try:
-        link_element = article_element.find_element(By.TAG_NAME, 'a')
-        # 先尝试title属性
-        title = link_element.get_attribute('title')
-        if title:
-            return title.strip()
-        # 再尝试链接文本
-        title = link_element.text.strip()
-        if title:
-            return title
+        for link_element in article_element.find_elements(By.TAG_NAME, 'a'):
+            # 先尝试title属性
+            title = link_element.get_attribute('title')
+            if title and title.strip():
+                return title.strip()
+            # 再尝试链接文本
+            title = link_element.text.strip()
+            if title:
+                return title
     except:
         pass
 
     logging.warning("无法提取文章标题")
     return "未知标题"
 
+def extract_article_list_time_with_fallback(article_element):
+    """
+    从专辑列表项中提取发布时间（优先使用当前页面版本的选择器）
+
+    列表中通常只显示日期，用于在抓取文章页面之前按发布时间调度
+
+    Args:
+        article_element: WebElement 文章元素
+
+    Returns:
+        str: 标准格式的时间字符串，失败返回None
+    """
+    from selenium.webdriver.common.by import By
+
+    strategies = [
+        ('original', SELECTORS.get('article_time')),
+        ('alternative', SELECTORS.get('alternative', {}).get('article_time')),
+    ]
+    for variant, selector in _ordered_by_layout(strategies):
+        if not selector:
+            continue
+        try:
+            for time_element in article_element.find_elements(By.CSS_SELECTOR, selector):
+                list_time = parse_list_time_text(time_element.text)
+                if list_time:
+                    return list_time
+        except:
+            pass
+    return None
+
+def _any_element_displayed(driver, selector_key):
+    """检查选择器键（当前页面版本）对应的元素是否有可见的"""
+    from selenium.webdriver.common.by import By
+
+    for variant, selector in _get_variant_selectors(selector_key):
+        try:
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                if element.is_displayed():
+                    return True
+        except:
+            pass
+    return False
+
+def get_variant_selector_list(selector_key):
+    """获取选择器键在当前页面版本下的候选选择器列表"""
+    return [selector for variant, selector in _get_variant_selectors(selector_key)]
+
 def check_loading_with_fallback(driver):
     """
     使用向后兼容的方式检查页面是否还在加载
@@ -1080,27 +1327,7 @@ def check_loading_with_fallback(driver):
     Returns:
         bool: True表示还在加载，False表示加载完成
     """
-    # 检查原有加载指示器
-    try:
-        loading_selector = SELECTORS.get('loading_element')
-        if loading_selector:
-            loading_element = driver.find_element(By.CSS_SELECTOR, loading_selector)
-            if loading_element and loading_element.is_displayed():
-                return True
-    except:
-        pass
-
-    # 检查备选加载指示器
-    try:
-        loading_selector = SELECTORS.get('alternative', {}).get('loading_element')
-        if loading_selector:
-            loading_element = driver.find_element(By.CSS_SELECTOR, loading_selector)
-            if loading_element and loading_element.is_displayed():
-                return True
-    except:
-        pass
-
-    return False
+    return _any_element_displayed(driver, 'loading_element')
 
 def check_no_more_with_fallback(driver):
     """
@@ -1112,24 +1339,4 @@ def check_no_more_with_fallback(driver):
     Returns:
         bool: True表示已加载全部，False表示还有更多
     """
-    # 检查原有"没有更多"指示器
-    try:
-        no_more_selector = SELECTORS.get('no_more_element')
-        if no_more_selector:
-            no_more_element = driver.find_element(By.CSS_SELECTOR, no_more_selector)
-            if no_more_element and no_more_element.is_displayed():
-                return True
-    except:
-        pass
-
-    # 检查备选"没有更多"指示器
-    try:
-        no_more_selector = SELECTORS.get('alternative', {}).get('no_more_element')
-        if no_more_selector:
-            no_more_element = driver.find_element(By.CSS_SELECTOR, no_more_selector)
-            if no_more_element and no_more_element.is_displayed():
-                return True
-    except:
-        pass
-
-    return False
\ No newline at end of file
+    return _any_element_displayed(driver, 'no_more_element')